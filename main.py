@@ -6,6 +6,7 @@ from psycopg2.extras import RealDictCursor
 from pymongo import MongoClient
 
 from measurements.runner import MeasurementRunner
+from setup.dual_sink_pipeline import create_databases_single_pass
 from setup.save_to_local_mongo import create_mongo_db
 from setup.save_to_local_sql import create_sql_db
 
@@ -95,15 +96,24 @@ def check_sql_db():
         print(f"Error checking PostgreSQL database: {e}")
 
 
-def run_measurements():
-    """Run database performance measurements."""
+def run_measurements(compare_indexes: bool = False):
+    """Run database performance measurements.
+
+    With compare_indexes=True the suite runs without and with the secondary
+    indexes of the index catalog.
+    """
     print("\n" + "=" * 60)
     print("RUNNING DATABASE MEASUREMENTS")
     print("=" * 60)
 
     runner = MeasurementRunner()
-    results = runner.run_all_tests(iterations=3)
-    report = runner.generate_report(results)
+    if compare_indexes:
+        report = runner.generate_index_report(
+            runner.run_index_comparison(iterations=10, warmup=2)
+        )
+    else:
+        results = runner.run_all_tests(iterations=10, warmup=2)
+        report = runner.generate_report(results, storage=runner.measure_storage())
     runner.save_report(report)
 
     return report
@@ -111,11 +121,20 @@ def run_measurements():
 
 def main():
     limit_products = None  # Set to None for no limit
+    incremental = False  # Set to True to only ingest new snapshots
+    sync = False  # Set to True to upsert into the existing MongoDB products
+    single_pass = True  # Read the corpus once and load both databases together
     print("Setting up databases...")
-    print("Creating database MongoDB...")
-    create_mongo_db(limit_products=limit_products)
-    print("Creating database SQL...")
-    create_sql_db(limit_products=limit_products)
+    if single_pass and not (incremental or sync):
+        print("Creating databases MongoDB and SQL in a single pass...")
+        create_databases_single_pass(limit_products=limit_products)
+    else:
+        print("Creating database MongoDB...")
+        create_mongo_db(
+            limit_products=limit_products, incremental=incremental, sync=sync
+        )
+        print("Creating database SQL...")
+        create_sql_db(limit_products=limit_products, incremental=incremental)
     check_sql_db()
     check_mongo_db()
 
@@ -1,10 +1,13 @@
 import logging
+import re
 import statistics
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from typing import Any, Dict, List
 
+from measurements.latency_stats import ALPHA, mann_whitney_u, summarize, u_statistic
 from setup.database_config import DatabaseConfig
 from setup.mongodb_manager import MongoDBManager
 from setup.postgresql_manager import PostgreSQLManager
@@ -21,8 +24,13 @@ class MeasurementResult:
     postgresql_time: float
     mongodb_result: Any
     postgresql_result: Any
-    mongodb_error: str = None
+    mongodb_error: str = None  # the last error, if any run failed
     postgresql_error: str = None
+    details: Dict[str, Any] = None  # test-specific observations for the report
+    mongodb_samples: List[float] = field(default_factory=list)
+    postgresql_samples: List[float] = field(default_factory=list)
+    mongodb_errors: int = 0  # failed timed runs, not in the samples
+    postgresql_errors: int = 0
 
     @property
     def performance_ratio(self) -> float:
@@ -31,28 +39,138 @@ class MeasurementResult:
             return self.mongodb_time / self.postgresql_time
         return float("inf")
 
+    @property
+    def p_value(self) -> float:
+        """Mann-Whitney p-value of the two sample sets (nan without samples)."""
+        return mann_whitney_u(self.mongodb_samples, self.postgresql_samples)
+
+    @property
+    def mongodb_stats(self) -> Dict[str, float]:
+        return summarize(self.mongodb_samples)
+
+    @property
+    def postgresql_stats(self) -> Dict[str, float]:
+        return summarize(self.postgresql_samples)
+
     @property
     def winner(self) -> str:
-        """Which database performed better."""
-        if self.mongodb_error and not self.postgresql_error:
+        """Which database performed better, if the difference is significant.
+
+        Decided by the Mann-Whitney U test that gives the p-value: the
+        database whose samples rank lower wins, not the lower mean, which a
+        few slow outliers can flip. A database without a single successful
+        run loses to one with samples.
+        """
+        if self.postgresql_samples and not self.mongodb_samples:
             return "PostgreSQL"
-        elif self.postgresql_error and not self.mongodb_error:
+        elif self.mongodb_samples and not self.postgresql_samples:
             return "MongoDB"
-        elif self.mongodb_time < self.postgresql_time:
+        elif not self.p_value < ALPHA:  # also when there are no samples (nan)
+            return "Inconclusive"
+        pairs = len(self.mongodb_samples) * len(self.postgresql_samples)
+        if u_statistic(self.mongodb_samples, self.postgresql_samples) < pairs / 2:
             return "MongoDB"
-        else:
-            return "PostgreSQL"
+        return "PostgreSQL"
 
 
 class BaseMeasurement(ABC):
-    """Base class for all database measurements."""
+    """Base class for all database measurements.
 
-    def __init__(self):
+    Tests share a long-lived MongoDB client and PostgreSQL connection pool,
+    opened before the timed runs, so the timings cover only the queries.
+    Use the measurement as a context manager (or call close_connections())
+    to release them. pool_size overrides the configured pool sizes, e.g. to
+    serve one connection per concurrent worker.
+    """
+
+    def __init__(self, pool_size: int = None):
         self.config = DatabaseConfig()
         self.mongo_manager = MongoDBManager(
             self.config.MONGO_DB_URI, self.config.MONGO_DB_NAME
         )
         self.postgres_manager = PostgreSQLManager(self.config)
+        self.postgres_pool = None
+        self.pool_size = pool_size
+
+    def __enter__(self):
+        self.open_connections()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close_connections()
+
+    def open_connections(self):
+        """Connect the MongoDB client and the PostgreSQL pool, if not yet open.
+
+        A database that cannot be reached is left closed, so its tests fail
+        (and are reported) on their own while the other database still runs.
+        """
+        if self.mongo_manager.db is None:
+            try:
+                self._connect_mongodb()
+            except Exception as e:
+                logger.error(f"MongoDB unavailable: {e}")
+        if self.postgres_pool is None:
+            try:
+                self._connect_postgresql()
+            except Exception as e:
+                logger.error(f"PostgreSQL unavailable: {e}")
+
+    def _connect_mongodb(self):
+        try:
+            self.mongo_manager.connect(
+                max_pool_size=self.pool_size or self.config.MONGO_POOL_SIZE
+            )
+        except Exception:
+            self._close_mongodb()  # do not leak the unreachable client
+            raise
+
+    def _connect_postgresql(self):
+        self.postgres_pool = self.postgres_manager.create_pool(maxconn=self.pool_size)
+
+    def close_connections(self):
+        self._close_mongodb()
+        if self.postgres_pool is not None:
+            self.postgres_pool.closeall()
+            self.postgres_pool = None
+
+    def _close_mongodb(self):
+        if self.mongo_manager.client is not None:
+            self.mongo_manager.disconnect()
+        self.mongo_manager.client = None
+        self.mongo_manager.db = None
+
+    @property
+    def mongo_db(self):
+        """The shared MongoDB database handle."""
+        if self.mongo_manager.db is None:
+            self._connect_mongodb()
+        return self.mongo_manager.db
+
+    def mongo_category_filter(self, fragment: str) -> Dict[str, Any]:
+        """Product filter on the categories whose name contains fragment.
+
+        The substring match runs on the small categories collection; products
+        are then matched on those exact names, which the category_name_ci
+        index serves when the query passes the CASE_INSENSITIVE collation.
+        """
+        names = self.mongo_db.categories.distinct(
+            "name", {"name": {"$regex": re.escape(fragment), "$options": "i"}}
+        )
+        return {"categories.name": {"$in": names}}
+
+    @contextmanager
+    def postgres_connection(self):
+        """Borrow a pooled PostgreSQL connection, rolled back when returned."""
+        if self.postgres_pool is None:
+            self._connect_postgresql()
+        conn = self.postgres_pool.getconn()
+        try:
+            yield conn
+        finally:
+            if not conn.closed:
+                conn.rollback()
+            self.postgres_pool.putconn(conn, close=bool(conn.closed))
 
     def measure_execution_time(self, func, *args, **kwargs) -> tuple[Any, float, str]:
         """Measure execution time of a function."""
@@ -65,6 +183,9 @@ class BaseMeasurement(ABC):
             end_time = time.perf_counter()
             return None, end_time - start_time, str(e)
 
+    def prepare(self):
+        """Look up test parameters before the timed runs (nothing by default)."""
+
     @abstractmethod
     def run_mongodb_test(self) -> Any:
         """Run test on MongoDB - must be implemented by subclasses."""
@@ -75,50 +196,31 @@ class BaseMeasurement(ABC):
         """Run test on PostgreSQL - must be implemented by subclasses."""
         pass
 
-    def run_comparison(self, iterations: int = 5) -> MeasurementResult:
-        """Run comparison between MongoDB and PostgreSQL."""
-        logger.info(f"Running measurement: {self.__class__.__name__}")
+    def run_comparison(self, iterations: int = 5, warmup: int = 1) -> MeasurementResult:
+        """Run comparison between MongoDB and PostgreSQL.
 
-        # MongoDB test
-        mongo_times = []
-        mongo_result = None
-        mongo_error = None
+        Connections are opened first, outside the timed region. Each test
+        then runs `warmup` untimed times (caches, query plans), then
+        `iterations` timed times, keeping every successful sample and
+        counting the failed runs.
+        """
+        logger.info(f"Running measurement: {self.__class__.__name__}")
+        self.open_connections()
+        self.prepare()
 
-        for i in range(iterations):
-            result, exec_time, error = self.measure_execution_time(
-                self.run_mongodb_test
-            )
-            if error:
-                mongo_error = error
-                logger.error(f"MongoDB test failed: {error}")
-                break
-            else:
-                mongo_times.append(exec_time)
-                if i == 0:  # Store first result
-                    mongo_result = result
-
-        # PostgreSQL test
-        postgres_times = []
-        postgres_result = None
-        postgres_error = None
-
-        for i in range(iterations):
-            result, exec_time, error = self.measure_execution_time(
-                self.run_postgresql_test
-            )
-            if error:
-                postgres_error = error
-                logger.error(f"PostgreSQL test failed: {error}")
-                break
-            else:
-                postgres_times.append(exec_time)
-                if i == 0:  # Store first result
-                    postgres_result = result
+        mongo_result, mongo_samples, mongo_error, mongo_errors = self._sample(
+            "MongoDB", self.run_mongodb_test, iterations, warmup
+        )
+        postgres_result, postgres_samples, postgres_error, postgres_errors = (
+            self._sample("PostgreSQL", self.run_postgresql_test, iterations, warmup)
+        )
 
         # Calculate average times
-        avg_mongo_time = statistics.mean(mongo_times) if mongo_times else float("inf")
+        avg_mongo_time = (
+            statistics.mean(mongo_samples) if mongo_samples else float("inf")
+        )
         avg_postgres_time = (
-            statistics.mean(postgres_times) if postgres_times else float("inf")
+            statistics.mean(postgres_samples) if postgres_samples else float("inf")
         )
 
         return MeasurementResult(
@@ -129,4 +231,37 @@ class BaseMeasurement(ABC):
             postgresql_result=postgres_result,
             mongodb_error=mongo_error,
             postgresql_error=postgres_error,
+            mongodb_samples=mongo_samples,
+            postgresql_samples=postgres_samples,
+            mongodb_errors=mongo_errors,
+            postgresql_errors=postgres_errors,
         )
+
+    def _sample(self, database: str, test, iterations: int, warmup: int):
+        """Return the first result, timed samples, last error and failed-run count.
+
+        A failed run is logged and counted, and sampling goes on. If the
+        first attempt fails, the test is given up: it cannot run at all
+        (e.g. the database is down), and every retry would only wait for
+        the same failure.
+        """
+        first_result = None
+        samples = []
+        last_error = None
+        errors = 0
+        for i in range(warmup + iterations):
+            result, exec_time, error = self.measure_execution_time(test)
+            if error:
+                logger.error(f"{database} test failed: {error}")
+                last_error = error
+                if i >= warmup:
+                    errors += 1
+                if i == 0:
+                    return None, [], error, iterations
+                continue
+            if i < warmup:
+                continue
+            if not samples:
+                first_result = result
+            samples.append(exec_time)
+        return first_result, samples, last_error, errors
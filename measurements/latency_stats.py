@@ -0,0 +1,108 @@
+import math
+import statistics
+from functools import lru_cache
+from typing import Dict, List, Sequence
+
+# Two-sided significance level for declaring a winner
+ALPHA = 0.05
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """The q-th percentile (0-100), linearly interpolated between samples."""
+    ordered = sorted(samples)
+    if not ordered:
+        return float("nan")
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """min/p50/p95/p99/max, mean and stdev of latency samples in seconds."""
+    if not samples:
+        return {}
+    return {
+        "count": len(samples),
+        "min": min(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "max": max(samples),
+        "mean": statistics.mean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def mann_whitney_u(a: Sequence[float], b: Sequence[float]) -> float:
+    """Two-sided p-value of the Mann-Whitney U test for samples a and b.
+
+    Makes no normality assumption, which suits skewed latency samples. Small
+    samples without ties use the exact distribution of U, otherwise the
+    tie-corrected normal approximation. Note that with three samples each the
+    smallest possible p-value is 0.1, so a winner needs more iterations.
+    """
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return float("nan")
+
+    u1 = u_statistic(a, b)
+    u = min(u1, n1 * n2 - u1)
+
+    values = list(a) + list(b)
+    has_ties = len(set(values)) < len(values)
+    if not has_ties and n1 + n2 <= 40:
+        total = math.comb(n1 + n2, n1)
+        at_most = sum(_u_count(n1, n2, k) for k in range(int(u) + 1))
+        return min(1.0, 2 * at_most / total)
+
+    n = n1 + n2
+    tie_term = sum(t**3 - t for t in _tie_sizes(values))
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / math.sqrt(variance)
+    return min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+
+
+def u_statistic(a: Sequence[float], b: Sequence[float]) -> float:
+    """Mann-Whitney U of a: the pairs (x from a, y from b) with x > y, ties half.
+
+    Below len(a) * len(b) / 2, a tends to be smaller (faster) than b.
+    """
+    n1 = len(a)
+    ranks = _ranks(list(a) + list(b))
+    return sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+
+
+def _ranks(values: List[float]) -> List[float]:
+    """1-based ranks, ties getting the average of their ranks."""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    return ranks
+
+
+def _tie_sizes(values: List[float]) -> List[int]:
+    counts: Dict[float, int] = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return [count for count in counts.values() if count > 1]
+
+
+@lru_cache(maxsize=None)
+def _u_count(n1: int, n2: int, u: int) -> int:
+    """Number of orderings of n1 + n2 distinct values with U statistic u."""
+    if u < 0:
+        return 0
+    if n1 == 0 or n2 == 0:
+        return 1 if u == 0 else 0
+    # The largest value belongs to the first sample (adding n2) or the second
+    return _u_count(n1 - 1, n2, u - n2) + _u_count(n1, n2 - 1, u)
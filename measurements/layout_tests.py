@@ -0,0 +1,83 @@
+import logging
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from setup.database_config import DatabaseConfig
+from setup.mongo_history import BucketHistory
+from setup.mongodb_manager import MongoDBManager
+
+logger = logging.getLogger(__name__)
+
+
+class MongoLayoutComparison:
+    """Compare the flat (one document per snapshot) and bucket MongoDB layouts.
+
+    Both layouts must be loaded (create_mongo_db(bucket_history=True)).
+    Reports the storage of each collection and the mean time of history and
+    current-state lookups over a fixed sample of products.
+    """
+
+    SAMPLE_PRODUCTS = 100
+
+    def __init__(self):
+        self.config = DatabaseConfig()
+        self.mongo_manager = MongoDBManager(
+            self.config.MONGO_DB_URI, self.config.MONGO_DB_NAME
+        )
+
+    def run(self, iterations: int = 5) -> Dict:
+        self.mongo_manager.connect()
+        try:
+            db = self.mongo_manager.db
+            flat = db[self.config.MONGO_PRODUCT_COLLECTION]
+            buckets = BucketHistory(db, self.config.MONGO_HISTORY_COLLECTION)
+            migros_ids = sorted(flat.distinct("migrosId"))[: self.SAMPLE_PRODUCTS]
+
+            queries = {
+                "history": (
+                    lambda i: list(flat.find({"migrosId": i}).sort("scraped_at", 1)),
+                    buckets.history,
+                ),
+                "current": (
+                    lambda i: flat.find_one({"migrosId": i}, sort=[("scraped_at", -1)]),
+                    buckets.current,
+                ),
+            }
+            report = {
+                "sample_products": len(migros_ids),
+                "storage": {
+                    "flat": self.mongo_manager.collection_stats(
+                        self.config.MONGO_PRODUCT_COLLECTION
+                    ),
+                    "bucket": self.mongo_manager.collection_stats(
+                        self.config.MONGO_HISTORY_COLLECTION
+                    ),
+                },
+                "queries": {},
+            }
+            for name, (flat_query, bucket_query) in queries.items():
+                report["queries"][name] = {
+                    "flat": self._time(flat_query, migros_ids, iterations),
+                    "bucket": self._time(bucket_query, migros_ids, iterations),
+                }
+                logger.info(
+                    f"{name} lookup: flat {report['queries'][name]['flat']:.6f}s, "
+                    f"bucket {report['queries'][name]['bucket']:.6f}s per product"
+                )
+            return report
+        finally:
+            self.mongo_manager.disconnect()
+
+    @staticmethod
+    def _time(query: Callable, migros_ids: List[str], iterations: int) -> float:
+        """Mean seconds per product lookup."""
+        if not migros_ids:
+            return float("inf")
+        per_lookup = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            for migros_id in migros_ids:
+                query(migros_id)
+            per_lookup.append((time.perf_counter() - start) / len(migros_ids))
+        return statistics.mean(per_lookup)
@@ -0,0 +1,159 @@
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Type
+
+from measurements.base_measurement import BaseMeasurement
+from measurements.latency_stats import summarize
+
+logger = logging.getLogger(__name__)
+
+DATABASES = ("MongoDB", "PostgreSQL")
+EXECUTORS = ("thread", "process")
+
+
+@dataclass
+class LoadResult:
+    """Outcome of running one test's query from concurrent workers."""
+
+    name: str
+    database: str
+    executor: str
+    concurrency: int
+    elapsed: float  # seconds, the slowest worker's timed loop
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    last_error: str = None
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies) + self.errors
+
+    @property
+    def qps(self) -> float:
+        """Successful requests per second across all workers."""
+        return len(self.latencies) / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        return summarize(self.latencies)
+
+
+def run_load(
+    test_class: Type[BaseMeasurement],
+    database: str,
+    concurrency: int,
+    duration: Optional[float] = None,
+    requests: Optional[int] = None,
+    executor: str = "thread",
+) -> LoadResult:
+    """Run a test's query for one database from `concurrency` workers.
+
+    Workers run for `duration` seconds or, if given, split `requests` between
+    them. Thread workers share one measurement whose pools hold a connection
+    per worker; process workers each open their own. Every worker sends one
+    untimed request first, so connection setup is not part of the latencies.
+    """
+    if database not in DATABASES:
+        raise ValueError(f"Unknown database: {database}")
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor: {executor}")
+    if duration is None and requests is None:
+        raise ValueError("Give a duration or a request count")
+
+    quotas = _quotas(requests, concurrency)
+    if executor == "thread":
+        with test_class(pool_size=concurrency) as measurement:
+            measurement.prepare()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                outcomes = list(
+                    pool.map(
+                        lambda quota: _drive(measurement, database, duration, quota),
+                        quotas,
+                    )
+                )
+    else:
+        with ProcessPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(
+                pool.map(
+                    _process_worker,
+                    [test_class] * concurrency,
+                    [database] * concurrency,
+                    [duration] * concurrency,
+                    quotas,
+                )
+            )
+
+    result = LoadResult(
+        name=test_class.__name__,
+        database=database,
+        executor=executor,
+        concurrency=concurrency,
+        elapsed=max(elapsed for _, _, _, elapsed in outcomes),
+    )
+    for latencies, errors, last_error, _ in outcomes:
+        result.latencies.extend(latencies)
+        result.errors += errors
+        result.last_error = last_error or result.last_error
+    return result
+
+
+def _quotas(requests: Optional[int], concurrency: int) -> List[Optional[int]]:
+    """Requests per worker, spread as evenly as possible (None: run for a duration)."""
+    if requests is None:
+        return [None] * concurrency
+    share, extra = divmod(requests, concurrency)
+    return [share + (1 if i < extra else 0) for i in range(concurrency)]
+
+
+def _process_worker(
+    test_class: Type[BaseMeasurement],
+    database: str,
+    duration: Optional[float],
+    quota: Optional[int],
+) -> Tuple[List[float], int, str, float]:
+    with test_class(pool_size=1) as measurement:
+        measurement.prepare()
+        return _drive(measurement, database, duration, quota)
+
+
+def _drive(
+    measurement: BaseMeasurement,
+    database: str,
+    duration: Optional[float],
+    quota: Optional[int],
+) -> Tuple[List[float], int, str, float]:
+    """Send requests until the quota is used up or the duration has passed.
+
+    Returns the successful latencies, the error count, the last error and the
+    elapsed seconds.
+    """
+    test = (
+        measurement.run_mongodb_test
+        if database == "MongoDB"
+        else measurement.run_postgresql_test
+    )
+    measurement.measure_execution_time(test)  # warm up this worker's connection
+
+    latencies = []
+    errors = 0
+    last_error = None
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+    sent = 0
+    while (quota is None or sent < quota) and (
+        deadline is None or time.perf_counter() < deadline
+    ):
+        _, exec_time, error = measurement.measure_execution_time(test)
+        sent += 1
+        if error:
+            errors += 1
+            last_error = error
+        else:
+            latencies.append(exec_time)
+    return latencies, errors, last_error, time.perf_counter() - start
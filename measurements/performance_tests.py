@@ -1,25 +1,42 @@
 import logging
 
 from measurements.base_measurement import BaseMeasurement
+from setup.index_catalog import CASE_INSENSITIVE
+from setup.mongodb_manager import MongoDBManager
 
 logger = logging.getLogger(__name__)
 
 
+class ConnectionSetupTest(BaseMeasurement):
+    """Test establishing a new connection, which the other tests reuse.
+
+    Each run opens (and closes) a fresh connection instead of the shared one:
+    a MongoClient with its server handshake, a psycopg2 connection with its
+    authentication.
+    """
+
+    def run_mongodb_test(self):
+        """Connect a new MongoDB client."""
+        manager = MongoDBManager(self.config.MONGO_DB_URI, self.config.MONGO_DB_NAME)
+        manager.connect()
+        manager.disconnect()
+
+    def run_postgresql_test(self):
+        """Open a new PostgreSQL connection."""
+        self.postgres_manager.connect().close()
+
+
 class SimpleCountTest(BaseMeasurement):
     """Test simple counting operations."""
 
     def run_mongodb_test(self):
         """Count all products in MongoDB."""
-        self.mongo_manager.connect()
-        try:
-            count = self.mongo_manager.db.products.count_documents({})
-            return count
-        finally:
-            self.mongo_manager.disconnect()
+        count = self.mongo_db.products.count_documents({})
+        return count
 
     def run_postgresql_test(self):
         """Count all products in PostgreSQL."""
-        with self.postgres_manager.connect() as conn:
+        with self.postgres_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("SELECT COUNT(*) FROM product")
                 return cur.fetchone()[0]
@@ -30,17 +47,13 @@ class SingleProductRetrievalTest(BaseMeasurement):
 
     def run_mongodb_test(self):
         """Get product with embedded data from MongoDB."""
-        self.mongo_manager.connect()
-        try:
-            # Get first product with all embedded data
-            product = self.mongo_manager.db.products.find_one({})
-            return product
-        finally:
-            self.mongo_manager.disconnect()
+        # Get first product with all embedded data
+        product = self.mongo_db.products.find_one({})
+        return product
 
     def run_postgresql_test(self):
         """Get product with joins from PostgreSQL."""
-        with self.postgres_manager.connect() as conn:
+        with self.postgres_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     """
@@ -65,21 +78,14 @@ class CategoryFilterTest(BaseMeasurement):
 
     def run_mongodb_test(self):
         """Filter products by category in MongoDB."""
-        self.mongo_manager.connect()
-        try:
-            # Find products in a specific category
-            products = list(
-                self.mongo_manager.db.products.find(
-                    {"categories.name": {"$regex": "Snacks", "$options": "i"}}
-                )
-            )
-            return len(products)
-        finally:
-            self.mongo_manager.disconnect()
+        # Find products in a specific category
+        query = self.mongo_category_filter("Snacks")
+        products = list(self.mongo_db.products.find(query).collation(CASE_INSENSITIVE))
+        return len(products)
 
     def run_postgresql_test(self):
         """Filter products by category in PostgreSQL."""
-        with self.postgres_manager.connect() as conn:
+        with self.postgres_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     """
@@ -1,6 +1,11 @@
+import json
 import logging
+from typing import Any, Dict
 
-from measurements.base_measurement import BaseMeasurement
+from measurements.base_measurement import BaseMeasurement, MeasurementResult
+from setup.index_catalog import CASE_INSENSITIVE
+from setup.temporal_queries import MongoAsOf, PostgresAsOf
+from setup.time_partitions import month_start, next_month
 
 logger = logging.getLogger(__name__)
 
@@ -10,27 +15,23 @@ class AggregationTest(BaseMeasurement):
 
     def run_mongodb_test(self):
         """MongoDB aggregation pipeline."""
-        self.mongo_manager.connect()
-        try:
-            pipeline = [
-                {
-                    "$group": {
-                        "_id": "$brand",
-                        "product_count": {"$sum": 1},
-                        "avg_price": {"$avg": "$offer.price"},
-                    }
-                },
-                {"$sort": {"product_count": -1}},
-                {"$limit": 10},
-            ]
-            results = list(self.mongo_manager.db.products.aggregate(pipeline))
-            return len(results)
-        finally:
-            self.mongo_manager.disconnect()
+        pipeline = [
+            {
+                "$group": {
+                    "_id": "$brand",
+                    "product_count": {"$sum": 1},
+                    "avg_price": {"$avg": "$offer.price"},
+                }
+            },
+            {"$sort": {"product_count": -1}},
+            {"$limit": 10},
+        ]
+        results = list(self.mongo_db.products.aggregate(pipeline))
+        return len(results)
 
     def run_postgresql_test(self):
         """PostgreSQL aggregation query."""
-        with self.postgres_manager.connect() as conn:
+        with self.postgres_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     """
@@ -54,26 +55,24 @@ class ComplexSearchTest(BaseMeasurement):
 
     def run_mongodb_test(self):
         """MongoDB complex search."""
-        self.mongo_manager.connect()
-        try:
-            results = list(
-                self.mongo_manager.db.products.find(
-                    {
-                        "$and": [
-                            {"nutrition.protein": {"$gte": 10}},
-                            {"offer.price": {"$lte": 5.0}},
-                            {"categories.name": {"$regex": "dairy", "$options": "i"}},
-                        ]
-                    }
-                ).limit(50)
+        results = list(
+            self.mongo_db.products.find(
+                {
+                    "$and": [
+                        {"nutrition.protein": {"$gte": 10}},
+                        {"offer.price": {"$lte": 5.0}},
+                        self.mongo_category_filter("dairy"),
+                    ]
+                }
             )
-            return len(results)
-        finally:
-            self.mongo_manager.disconnect()
+            .collation(CASE_INSENSITIVE)
+            .limit(50)
+        )
+        return len(results)
 
     def run_postgresql_test(self):
         """PostgreSQL complex search."""
-        with self.postgres_manager.connect() as conn:
+        with self.postgres_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     """
@@ -83,9 +82,276 @@ class ComplexSearchTest(BaseMeasurement):
                     JOIN offer o ON p.offer_id = o.id
                     JOIN product_category pc ON (p.migros_id = pc.product_id AND p.scraped_at = pc.scraped_at)
                     JOIN category c ON pc.category_id = c.id
-                    WHERE CAST(n.protein AS FLOAT) >= 10
+                    WHERE n.protein >= 10
                     AND o.price <= 5.0
                     AND c.name ILIKE '%dairy%'
                 """
                 )
                 return cur.fetchone()[0]
+
+
+class TimeWindowTest(BaseMeasurement):
+    """Test a time-bounded query over the most recent month of snapshots.
+
+    On the partitioned schema the scraped_at bounds let the planner prune
+    every other monthly partition; the scanned relations are recorded from
+    EXPLAIN, outside the timed runs.
+    """
+
+    QUERY = """
+        SELECT COUNT(DISTINCT p.migros_id)
+        FROM product p
+        JOIN product_category pc ON (p.migros_id = pc.product_id AND p.scraped_at = pc.scraped_at)
+        WHERE p.scraped_at >= %(start)s AND p.scraped_at < %(end)s
+        AND pc.scraped_at >= %(start)s AND pc.scraped_at < %(end)s
+    """
+
+    def prepare(self):
+        with self.postgres_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT MAX(scraped_at) FROM product")
+                latest = cur.fetchone()[0]
+        # Literal bounds (not a subquery), so partitions are pruned at plan time
+        self.start = month_start(latest)
+        self.end = next_month(self.start)
+
+    def run_comparison(self, iterations: int = 5, warmup: int = 1) -> MeasurementResult:
+        result = super().run_comparison(iterations, warmup)
+        scanned = self.scanned_relations()
+        result.details = {
+            "window": [self.start.isoformat(), self.end.isoformat()],
+            "postgresql_relations_scanned": scanned,
+        }
+        logger.info(f"{self.__class__.__name__} scanned {', '.join(scanned)}")
+        return result
+
+    def run_mongodb_test(self):
+        """Count products scraped in the window in MongoDB."""
+        return len(
+            self.mongo_db.products.distinct(
+                "migrosId", {"scraped_at": {"$gte": self.start, "$lt": self.end}}
+            )
+        )
+
+    def run_postgresql_test(self):
+        """Count products scraped in the window in PostgreSQL."""
+        with self.postgres_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(self.QUERY, {"start": self.start, "end": self.end})
+                return cur.fetchone()[0]
+
+    def scanned_relations(self):
+        """Tables and partitions the PostgreSQL plan reads."""
+        with self.postgres_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "EXPLAIN (FORMAT JSON) " + self.QUERY,
+                    {"start": self.start, "end": self.end},
+                )
+                plan = cur.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return sorted(_relation_names(plan[0]["Plan"]))
+
+
+class CurrentProductTest(BaseMeasurement):
+    """Test looking up the current state of the product with the most history.
+
+    Reads product_current / products_current by key, so the cost does not
+    grow with the number of snapshots kept.
+    """
+
+    def prepare(self):
+        self.migros_id = _per_database(self, _most_snapshotted_product)
+
+    def run_mongodb_test(self):
+        """Get the current product document from MongoDB."""
+        return self.mongo_db.products_current.find_one(
+            {"migrosId": self.migros_id["MongoDB"]}
+        )
+
+    def run_postgresql_test(self):
+        """Get the current product with joins from PostgreSQL."""
+        with self.postgres_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT
+                        p.migros_id,
+                        p.name,
+                        p.brand,
+                        p.scraped_at,
+                        n.kcal, n.kj, n.fat, n.protein,
+                        o.price, o.quantity, o.unit_price
+                    FROM product_current p
+                    LEFT JOIN nutrients n ON p.nutrient_id = n.id
+                    LEFT JOIN offer o ON p.offer_id = o.id
+                    WHERE p.migros_id = %s
+                """,
+                    (self.migros_id["PostgreSQL"],),
+                )
+                return cur.fetchone()
+
+
+class CurrentCatalogTest(BaseMeasurement):
+    """Test counting current products under a price, one row per product."""
+
+    def run_mongodb_test(self):
+        """Count current products in MongoDB."""
+        return self.mongo_db.products_current.count_documents(
+            {"offer.price": {"$lte": 5.0}}
+        )
+
+    def run_postgresql_test(self):
+        """Count current products in PostgreSQL."""
+        with self.postgres_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT COUNT(*)
+                    FROM product_current p
+                    JOIN offer o ON p.offer_id = o.id
+                    WHERE o.price <= 5.0
+                """
+                )
+                return cur.fetchone()[0]
+
+
+class AsOfProductTest(BaseMeasurement):
+    """Test a point-in-time lookup: one product as of the middle of the history."""
+
+    def prepare(self):
+        self.migros_id = _per_database(self, _most_snapshotted_product)
+        self.as_of = _per_database(self, _history_midpoint)
+
+    def run_mongodb_test(self):
+        """Get the product as of the time from MongoDB."""
+        return MongoAsOf(self.mongo_db, self.config.MONGO_PRODUCT_COLLECTION).product(
+            self.migros_id["MongoDB"], self.as_of["MongoDB"]
+        )
+
+    def run_postgresql_test(self):
+        """Get the product as of the time from PostgreSQL."""
+        with self.postgres_connection() as conn:
+            return PostgresAsOf.product(
+                conn, self.migros_id["PostgreSQL"], self.as_of["PostgreSQL"]
+            )
+
+
+class AsOfBulkTest(BaseMeasurement):
+    """Test a bulk point-in-time lookup of many products in one round trip."""
+
+    PRODUCTS = 100
+
+    def prepare(self):
+        self.migros_ids = _per_database(self, _first_current_products)
+        self.as_of = _per_database(self, _history_midpoint)
+
+    def run_mongodb_test(self):
+        """Get the products as of the time from MongoDB."""
+        return len(
+            MongoAsOf(self.mongo_db, self.config.MONGO_PRODUCT_COLLECTION).products(
+                self.migros_ids["MongoDB"], self.as_of["MongoDB"]
+            )
+        )
+
+    def run_postgresql_test(self):
+        """Get the products as of the time from PostgreSQL."""
+        with self.postgres_connection() as conn:
+            return len(
+                PostgresAsOf.products(
+                    conn, self.migros_ids["PostgreSQL"], self.as_of["PostgreSQL"]
+                )
+            )
+
+
+def _per_database(measurement: BaseMeasurement, lookup) -> Dict[str, Any]:
+    """Look up a test target in each database from its own data.
+
+    A database whose lookup fails gets None, so only its own test fails and
+    a single-database run still works. Differing targets mean the two
+    databases hold different loads, so their timings are not comparable.
+    """
+    targets = {}
+    for database in ("MongoDB", "PostgreSQL"):
+        try:
+            targets[database] = lookup(measurement, database)
+        except Exception as e:
+            logger.error(
+                f"{measurement.__class__.__name__}: {database} lookup failed: {e}"
+            )
+            targets[database] = None
+    if None not in targets.values() and len(set(map(repr, targets.values()))) > 1:
+        logger.warning(
+            f"{measurement.__class__.__name__}: MongoDB and PostgreSQL hold "
+            f"different loads (targets {targets}), results are not comparable"
+        )
+    return targets
+
+
+def _most_snapshotted_product(measurement: BaseMeasurement, database: str) -> str:
+    """The product with the longest history, a stable lookup target."""
+    if database == "MongoDB":
+        [top] = measurement.mongo_db.products.aggregate(
+            [
+                {"$group": {"_id": "$migrosId", "snapshots": {"$sum": 1}}},
+                {"$sort": {"snapshots": -1, "_id": 1}},
+                {"$limit": 1},
+            ],
+            allowDiskUse=True,
+        )
+        return top["_id"]
+    with measurement.postgres_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT migros_id FROM product
+                GROUP BY migros_id
+                ORDER BY COUNT(*) DESC, migros_id
+                LIMIT 1
+            """
+            )
+            return cur.fetchone()[0]
+
+
+def _first_current_products(measurement: BaseMeasurement, database: str):
+    """The first products by ID, measurement.PRODUCTS of them."""
+    if database == "MongoDB":
+        current = measurement.mongo_db.products_current.find(
+            {}, {"migrosId": 1, "_id": 0}
+        )
+        limited = current.sort("migrosId", 1).limit(measurement.PRODUCTS)
+        return [document["migrosId"] for document in limited]
+    with measurement.postgres_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT migros_id FROM product_current ORDER BY migros_id LIMIT %s",
+                (measurement.PRODUCTS,),
+            )
+            return [row[0] for row in cur.fetchall()]
+
+
+def _history_midpoint(measurement: BaseMeasurement, database: str):
+    if database == "MongoDB":
+        products = measurement.mongo_db.products
+        first, last = (
+            products.find_one({}, {"scraped_at": 1}, sort=[("scraped_at", order)])[
+                "scraped_at"
+            ]
+            for order in (1, -1)
+        )
+        return first + (last - first) / 2
+    with measurement.postgres_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT MIN(scraped_at) + (MAX(scraped_at) - MIN(scraped_at)) / 2 "
+                "FROM product"
+            )
+            return cur.fetchone()[0]
+
+
+def _relation_names(node):
+    names = {node["Relation Name"]} if "Relation Name" in node else set()
+    for child in node.get("Plans", []):
+        names |= _relation_names(child)
+    return names
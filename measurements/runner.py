@@ -1,14 +1,34 @@
+import argparse
+import json
 import logging
-from typing import List, Dict
+import math
+from datetime import datetime
+from typing import Dict, List
+
 from measurements.base_measurement import MeasurementResult
+from measurements.latency_stats import ALPHA
+from measurements.layout_tests import MongoLayoutComparison
+from measurements.load_tests import DATABASES, EXECUTORS, LoadResult, run_load
 from measurements.performance_tests import (
+    CategoryFilterTest,
+    ConnectionSetupTest,
     SimpleCountTest,
     SingleProductRetrievalTest,
-    CategoryFilterTest,
 )
-from measurements.query_tests import AggregationTest, ComplexSearchTest
-import json
-from datetime import datetime
+from measurements.query_tests import (
+    AggregationTest,
+    AsOfBulkTest,
+    AsOfProductTest,
+    ComplexSearchTest,
+    CurrentCatalogTest,
+    CurrentProductTest,
+    TimeWindowTest,
+)
+from measurements.scalability_tests import DEFAULT_SIZES, ScalabilityTest
+from measurements.storage_tests import StorageTest
+from setup.database_config import DatabaseConfig
+from setup.mongodb_manager import MongoDBManager
+from setup.postgresql_manager import PostgreSQLManager
 
 logger = logging.getLogger(__name__)
 
@@ -17,30 +37,48 @@ class MeasurementRunner:
     """Runs all measurements and generates reports."""
 
     def __init__(self):
+        self.config = DatabaseConfig()
         self.test_classes = [
+            ConnectionSetupTest,
             SimpleCountTest,
             SingleProductRetrievalTest,
             CategoryFilterTest,
             AggregationTest,
             ComplexSearchTest,
+            TimeWindowTest,
+            CurrentProductTest,
+            CurrentCatalogTest,
+            AsOfProductTest,
+            AsOfBulkTest,
         ]
 
-    def run_all_tests(self, iterations: int = 5) -> List[MeasurementResult]:
+    def run_all_tests(
+        self, iterations: int = 5, warmup: int = 1
+    ) -> List[MeasurementResult]:
         """Run all measurement tests."""
         results = []
 
-        logger.info(f"Starting measurement suite with {iterations} iterations per test")
+        logger.info(
+            f"Starting measurement suite with {warmup} warmup and "
+            f"{iterations} timed iterations per test"
+        )
 
         for test_class in self.test_classes:
             try:
-                test_instance = test_class()
-                result = test_instance.run_comparison(iterations)
+                with test_class() as test_instance:
+                    result = test_instance.run_comparison(iterations, warmup)
                 results.append(result)
 
+                outcome = (
+                    "no significant difference"
+                    if result.winner == "Inconclusive"
+                    else f"{result.winner} wins"
+                )
                 logger.info(
-                    f"✅ {result.name}: {result.winner} wins "
+                    f"✅ {result.name}: {outcome} "
                     f"(MongoDB: {result.mongodb_time:.4f}s, "
-                    f"PostgreSQL: {result.postgresql_time:.4f}s)"
+                    f"PostgreSQL: {result.postgresql_time:.4f}s, "
+                    f"p={result.p_value:.3f})"
                 )
 
             except Exception as e:
@@ -48,17 +86,166 @@ class MeasurementRunner:
 
         return results
 
-    def generate_report(self, results: List[MeasurementResult]) -> Dict:
-        """Generate comprehensive report."""
+    def set_indexes(self, enabled: bool):
+        """Create or drop the index catalog's secondary indexes in both databases.
+
+        Keys (primary, foreign, unique) are never dropped, so the data stays
+        consistent either way.
+        """
+        postgres_manager = PostgreSQLManager(self.config)
+        try:
+            if enabled:
+                postgres_manager.create_indexes()
+            else:
+                postgres_manager.drop_indexes()
+        except Exception as e:
+            logger.error(f"Could not change PostgreSQL indexes: {e}")
+
+        mongo_manager = MongoDBManager(
+            self.config.MONGO_DB_URI, self.config.MONGO_DB_NAME
+        )
+        try:
+            mongo_manager.connect()
+            if enabled:
+                mongo_manager.create_index_catalog()
+            else:
+                mongo_manager.drop_index_catalog()
+        except Exception as e:
+            logger.error(f"Could not change MongoDB indexes: {e}")
+        finally:
+            mongo_manager.disconnect()
+
+    def run_index_comparison(
+        self, iterations: int = 5, warmup: int = 1
+    ) -> Dict[str, List[MeasurementResult]]:
+        """Run the suite without, then with the secondary indexes.
+
+        The indexes are rebuilt at the end, so the databases are left as loaded.
+        """
+        results = {}
+        for mode, enabled in (("without_indexes", False), ("with_indexes", True)):
+            logger.info(f"Running measurement suite {mode.replace('_', ' ')}")
+            self.set_indexes(enabled)
+            results[mode] = self.run_all_tests(iterations, warmup)
+        return results
+
+    def generate_index_report(
+        self, results_by_mode: Dict[str, List[MeasurementResult]]
+    ) -> Dict:
+        """Report both runs and the speedup (time without / time with) per test."""
+        report = {
+            "timestamp": datetime.now().isoformat(),
+            "modes": {
+                mode: self.generate_report(results)
+                for mode, results in results_by_mode.items()
+            },
+            "index_speedup": [],
+        }
+
+        with_indexes = {r.name: r for r in results_by_mode.get("with_indexes", [])}
+        for without in results_by_mode.get("without_indexes", []):
+            indexed = with_indexes.get(without.name)
+            if indexed is None:
+                continue
+            report["index_speedup"].append(
+                {
+                    "test_name": without.name,
+                    "mongodb_speedup": _speedup(
+                        without.mongodb_time, indexed.mongodb_time
+                    ),
+                    "postgresql_speedup": _speedup(
+                        without.postgresql_time, indexed.postgresql_time
+                    ),
+                }
+            )
+
+        return report
+
+    def run_load_tests(
+        self,
+        concurrency_levels: List[int] = (1, 4, 16, 64),
+        duration: float = 5.0,
+        requests: int = None,
+        executor: str = "thread",
+    ) -> List[LoadResult]:
+        """Run every test's query under load at each concurrency level."""
+        results = []
+        for test_class in self.test_classes:
+            for database in DATABASES:
+                for concurrency in concurrency_levels:
+                    try:
+                        result = run_load(
+                            test_class,
+                            database,
+                            concurrency,
+                            duration=None if requests else duration,
+                            requests=requests,
+                            executor=executor,
+                        )
+                    except Exception as e:
+                        logger.error(
+                            f"❌ {test_class.__name__} on {database} "
+                            f"x{concurrency} failed: {e}"
+                        )
+                        continue
+                    results.append(result)
+                    logger.info(
+                        f"{result.name} on {database} x{concurrency}: "
+                        f"{result.qps:.1f} qps, "
+                        f"p95 {result.stats.get('p95', float('nan')):.4f}s, "
+                        f"{result.error_rate:.1%} errors"
+                    )
+        return results
+
+    def generate_load_report(self, results: List[LoadResult]) -> Dict:
+        """Saturation curves per test and database, one row per concurrency level."""
+        report = {"timestamp": datetime.now().isoformat(), "load_results": {}}
+        for result in results:
+            curve = report["load_results"].setdefault(result.name, {})
+            curve.setdefault(result.database, []).append(
+                {
+                    "concurrency": result.concurrency,
+                    "executor": result.executor,
+                    "requests": result.requests,
+                    "elapsed": result.elapsed,
+                    "qps": result.qps,
+                    "error_rate": result.error_rate,
+                    "latency_stats": result.stats,
+                    "last_error": result.last_error,
+                }
+            )
+        return report
+
+    def run_scalability_tests(
+        self, sizes: List[int] = DEFAULT_SIZES, iterations: int = 5, warmup: int = 1
+    ) -> Dict:
+        """Reload both databases at growing sizes and report the scaling series."""
+        return {
+            "timestamp": datetime.now().isoformat(),
+            **ScalabilityTest(self, sizes).run(iterations, warmup),
+        }
+
+    def measure_storage(self) -> Dict:
+        """Table and collection sizes, bytes per snapshot and index overhead."""
+        return StorageTest().run()
+
+    def generate_report(
+        self, results: List[MeasurementResult], storage: Dict = None
+    ) -> Dict:
+        """Generate comprehensive report, with the storage footprint if given."""
         report = {
             "timestamp": datetime.now().isoformat(),
             "summary": {
                 "total_tests": len(results),
                 "mongodb_wins": sum(1 for r in results if r.winner == "MongoDB"),
                 "postgresql_wins": sum(1 for r in results if r.winner == "PostgreSQL"),
+                "inconclusive": sum(1 for r in results if r.winner == "Inconclusive"),
+                "significance_level": ALPHA,
             },
             "detailed_results": [],
         }
+        if storage is not None:
+            report["storage"] = storage
 
         for result in results:
             report["detailed_results"].append(
@@ -68,8 +255,16 @@ class MeasurementRunner:
                     "mongodb_time": result.mongodb_time,
                     "postgresql_time": result.postgresql_time,
                     "performance_ratio": result.performance_ratio,
+                    "p_value": _finite(result.p_value),
+                    "mongodb_stats": result.mongodb_stats,
+                    "postgresql_stats": result.postgresql_stats,
+                    "mongodb_samples": result.mongodb_samples,
+                    "postgresql_samples": result.postgresql_samples,
                     "mongodb_error": result.mongodb_error,
                     "postgresql_error": result.postgresql_error,
+                    "mongodb_errors": result.mongodb_errors,
+                    "postgresql_errors": result.postgresql_errors,
+                    **({"details": result.details} if result.details else {}),
                 }
             )
 
@@ -88,14 +283,131 @@ class MeasurementRunner:
         return filename
 
 
+def _finite(value: float):
+    """JSON has no NaN or Infinity, so report them as null."""
+    return value if value is not None and math.isfinite(value) else None
+
+
+def _speedup(time_without: float, time_with: float) -> float:
+    if time_with > 0 and time_with != float("inf"):
+        return time_without / time_with
+    return None
+
+
 def main():
     """Main execution function."""
     logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Run the measurement suite")
+    parser.add_argument(
+        "--compare-indexes",
+        action="store_true",
+        help="run the suite without and with the secondary indexes",
+    )
+    parser.add_argument(
+        "--compare-layouts",
+        action="store_true",
+        help="compare the flat and bucket MongoDB history layouts",
+    )
+    parser.add_argument(
+        "--load",
+        action="store_true",
+        help="run each test's query from concurrent workers",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[1, 4, 16, 64],
+        help="concurrency levels of the load mode",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=5.0,
+        help="seconds per load level",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        help="requests per load level, instead of a duration",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=EXECUTORS,
+        default="thread",
+        help="run load workers as threads or processes",
+    )
+    parser.add_argument(
+        "--scalability",
+        action="store_true",
+        help="reload the databases at growing corpus sizes and run the suite at each",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: None if value == "all" else int(value),
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        help="snapshot files per scalability step ('all' for the whole corpus)",
+    )
+    args = parser.parse_args()
 
     runner = MeasurementRunner()
-    results = runner.run_all_tests(iterations=3)
+    if args.compare_indexes:
+        report = runner.generate_index_report(
+            runner.run_index_comparison(iterations=10, warmup=2)
+        )
+        filename = runner.save_report(report)
+        print("\n" + "=" * 60)
+        print("INDEX SPEEDUP (time without / time with indexes)")
+        print("=" * 60)
+        for row in report["index_speedup"]:
+            print(
+                f"{row['test_name']}: MongoDB {row['mongodb_speedup']}, "
+                f"PostgreSQL {row['postgresql_speedup']}"
+            )
+        print(f"Full report saved to: {filename}")
+        return
+    if args.load:
+        report = runner.generate_load_report(
+            runner.run_load_tests(
+                args.concurrency, args.duration, args.requests, args.executor
+            )
+        )
+        filename = runner.save_report(report)
+        print("\n" + "=" * 60)
+        print("LOAD RESULTS (queries per second by concurrency)")
+        print("=" * 60)
+        for name, curves in report["load_results"].items():
+            for database, rows in curves.items():
+                levels = ", ".join(f"x{r['concurrency']}: {r['qps']:.1f}" for r in rows)
+                print(f"{name} {database}: {levels}")
+        print(f"Full report saved to: {filename}")
+        return
+    if args.scalability:
+        report = runner.run_scalability_tests(args.sizes, iterations=10, warmup=2)
+        filename = runner.save_report(report)
+        print("\n" + "=" * 60)
+        print("SCALABILITY (growth exponent: 1 is linear in the snapshot count)")
+        print("=" * 60)
+        for database, series in report["load"].items():
+            print(f"load {database}: {series['growth_exponent']}")
+        for name, by_database in report["tests"].items():
+            print(
+                f"{name}: MongoDB {by_database['MongoDB']['growth_exponent']}, "
+                f"PostgreSQL {by_database['PostgreSQL']['growth_exponent']}"
+            )
+        print(f"Full report saved to: {filename}")
+        return
+    if args.compare_layouts:
+        report = MongoLayoutComparison().run(iterations=3)
+        filename = runner.save_report(report)
+        print(json.dumps(report, indent=2))
+        print(f"Full report saved to: {filename}")
+        return
+
+    results = runner.run_all_tests(iterations=10, warmup=2)
 
-    report = runner.generate_report(results)
+    report = runner.generate_report(results, storage=runner.measure_storage())
     filename = runner.save_report(report)
 
     # Print summary
@@ -104,6 +416,15 @@ def main():
     print("=" * 60)
     print(f"MongoDB wins: {report['summary']['mongodb_wins']}")
     print(f"PostgreSQL wins: {report['summary']['postgresql_wins']}")
+    print(f"Inconclusive: {report['summary']['inconclusive']}")
+    for database, storage in report["storage"].items():
+        if "totals" in storage:
+            totals = storage["totals"]
+            print(
+                f"{database} storage: {totals['total_bytes'] / 2**20:.1f} MiB, "
+                f"{totals['bytes_per_snapshot']} bytes per snapshot, "
+                f"index overhead {totals['index_overhead']}"
+            )
     print(f"Full report saved to: {filename}")
 
 
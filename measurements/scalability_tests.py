@@ -0,0 +1,122 @@
+import logging
+import math
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from measurements.base_measurement import MeasurementResult
+from setup.database_config import DatabaseConfig
+from setup.dataloader import DataLoader
+from setup.save_to_local_mongo import create_mongo_db
+from setup.save_to_local_sql import create_sql_db
+
+logger = logging.getLogger(__name__)
+
+# Snapshot files loaded per step; None loads the whole corpus
+DEFAULT_SIZES = (1000, 5000, 10000, 20000, None)
+# Growth exponents above this are reported as super-linear
+SUPER_LINEAR = 1.1
+
+
+def growth_exponent(sizes: Sequence[float], values: Sequence[float]) -> float:
+    """Slope of the least-squares line through (log size, log value).
+
+    A cost growing like size**k has exponent k: about 0 for constant, 1 for
+    linear and 2 for quadratic growth. Points without a positive value are
+    left out; fewer than two distinct sizes give nan.
+    """
+    points = [
+        (math.log(size), math.log(value))
+        for size, value in zip(sizes, values)
+        if size and value is not None and value > 0 and math.isfinite(value)
+    ]
+    if len({x for x, _ in points}) < 2:
+        return float("nan")
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    return covariance / variance
+
+
+class ScalabilityTest:
+    """Load both databases at growing corpus sizes and run the suite at each.
+
+    Every step recreates the databases from the first `size` snapshot files,
+    timing each load, then runs the measurement suite. The databases are left
+    loaded at the last size (the whole corpus by default).
+    """
+
+    def __init__(self, runner, sizes: Sequence[Optional[int]] = DEFAULT_SIZES):
+        self.config = DatabaseConfig()
+        self.runner = runner
+        self.sizes = sizes
+
+    def run(self, iterations: int = 5, warmup: int = 1) -> Dict:
+        snapshot_index = DataLoader.snapshot_index(self.config.PRODUCTS_PATH)
+        steps = []
+        results_by_step: List[List[MeasurementResult]] = []
+        for size in self.sizes:
+            snapshots = len(snapshot_index.head(size))
+            logger.info(f"Scalability step: {snapshots} snapshots")
+            step = {
+                "limit": size,
+                "snapshots": snapshots,
+                "mongodb_load_seconds": self._load(
+                    "MongoDB", create_mongo_db, size, snapshot_index
+                ),
+                "postgresql_load_seconds": self._load(
+                    "PostgreSQL", create_sql_db, size, snapshot_index
+                ),
+            }
+            steps.append(step)
+            results_by_step.append(self.runner.run_all_tests(iterations, warmup))
+        return self.report(steps, results_by_step)
+
+    @staticmethod
+    def _load(database: str, create: Callable, size, snapshot_index) -> float:
+        start = time.perf_counter()
+        try:
+            create(limit_products=size, snapshot_index=snapshot_index)
+        except Exception as e:
+            logger.error(f"{database} load of {size} snapshots failed: {e}")
+            return None
+        return time.perf_counter() - start
+
+    @staticmethod
+    def report(steps: List[Dict], results_by_step: List[List[MeasurementResult]]):
+        """Series of load times and median latencies with growth exponents."""
+        sizes = [step["snapshots"] for step in steps]
+        report = {"steps": steps, "load": {}, "tests": {}}
+        for database, key in (
+            ("MongoDB", "mongodb_load_seconds"),
+            ("PostgreSQL", "postgresql_load_seconds"),
+        ):
+            report["load"][database] = _series(sizes, [step[key] for step in steps])
+
+        names = []
+        for results in results_by_step:
+            names += [r.name for r in results if r.name not in names]
+        for name in names:
+            by_step = [
+                {r.name: r for r in results}.get(name) for results in results_by_step
+            ]
+            report["tests"][name] = {
+                "MongoDB": _series(
+                    sizes, [r.mongodb_stats.get("p50") if r else None for r in by_step]
+                ),
+                "PostgreSQL": _series(
+                    sizes,
+                    [r.postgresql_stats.get("p50") if r else None for r in by_step],
+                ),
+            }
+        return report
+
+
+def _series(sizes: List[int], values: List[Optional[float]]) -> Dict:
+    exponent = growth_exponent(sizes, values)
+    finite = math.isfinite(exponent)
+    return {
+        "values": values,
+        "growth_exponent": exponent if finite else None,
+        "super_linear": finite and exponent > SUPER_LINEAR,
+    }
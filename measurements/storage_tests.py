@@ -0,0 +1,98 @@
+import logging
+from typing import Dict
+
+from setup.database_config import DatabaseConfig
+from setup.mongodb_manager import MongoDBManager
+from setup.postgresql_manager import PostgreSQLManager
+
+logger = logging.getLogger(__name__)
+
+
+class StorageTest:
+    """Compare the on-disk footprint of the MongoDB and PostgreSQL schemas.
+
+    Reports every PostgreSQL table and MongoDB collection, the totals, the
+    bytes per product snapshot and the index overhead (index bytes per byte
+    of table or collection storage). MongoDB storage is WiredTiger-compressed,
+    PostgreSQL heap storage is not (apart from TOASTed values).
+    """
+
+    def __init__(self):
+        self.config = DatabaseConfig()
+        self.mongo_manager = MongoDBManager(
+            self.config.MONGO_DB_URI, self.config.MONGO_DB_NAME
+        )
+        self.postgres_manager = PostgreSQLManager(self.config)
+
+    def run(self) -> Dict:
+        report = {}
+        for database, measure in (
+            ("PostgreSQL", self.postgresql_storage),
+            ("MongoDB", self.mongodb_storage),
+        ):
+            try:
+                report[database] = measure()
+            except Exception as e:
+                logger.error(f"{database} storage measurement failed: {e}")
+                report[database] = {"error": str(e)}
+                continue
+            totals = report[database]["totals"]
+            logger.info(
+                f"{database}: {totals['total_bytes'] / 2**20:.1f} MiB, "
+                f"{totals['bytes_per_snapshot']} bytes per snapshot, "
+                f"index overhead {totals['index_overhead']}"
+            )
+        return report
+
+    def postgresql_storage(self) -> Dict:
+        tables = self.postgres_manager.relation_sizes(self.config.PG_DB_NAME)
+        with self.postgres_manager.connect(self.config.PG_DB_NAME) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT COUNT(*) FROM product")
+                snapshots = cur.fetchone()[0]
+        conn.close()
+
+        storage_bytes = sum(sizes["table_bytes"] for sizes in tables.values())
+        index_bytes = sum(sizes["index_bytes"] for sizes in tables.values())
+        return {
+            "tables": tables,
+            "totals": _totals(snapshots, storage_bytes, index_bytes),
+        }
+
+    def mongodb_storage(self) -> Dict:
+        self.mongo_manager.connect()
+        try:
+            collections = {
+                name: self.mongo_manager.collection_stats(name)
+                for name in sorted(self.mongo_manager.db.list_collection_names())
+            }
+            snapshots = collections.get(self.config.MONGO_PRODUCT_COLLECTION, {}).get(
+                "documents", 0
+            )
+        finally:
+            self.mongo_manager.disconnect()
+
+        storage_bytes = sum(stats["storage_bytes"] for stats in collections.values())
+        index_bytes = sum(stats["index_bytes"] for stats in collections.values())
+        return {
+            "collections": collections,
+            "totals": _totals(snapshots, storage_bytes, index_bytes),
+        }
+
+
+def _totals(snapshots: int, storage_bytes: int, index_bytes: int) -> Dict:
+    """Totals over a database; storage_bytes is on disk, without indexes."""
+    total_bytes = storage_bytes + index_bytes
+    return {
+        "snapshots": snapshots,
+        "storage_bytes": storage_bytes,
+        "index_bytes": index_bytes,
+        "total_bytes": total_bytes,
+        "bytes_per_snapshot": round(total_bytes / snapshots) if snapshots else None,
+        "storage_bytes_per_snapshot": (
+            round(storage_bytes / snapshots) if snapshots else None
+        ),
+        "index_overhead": (
+            round(index_bytes / storage_bytes, 3) if storage_bytes else None
+        ),
+    }
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import uuid
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+
+def content_hash(*values) -> str:
+    """MD5 of a row payload in canonical form, formatted as a UUID.
+
+    Numbers hash by value (7.2, 7.20 and "7.2" are equal), so a payload read
+    back from the database hashes like the one that was loaded. The UUID
+    format matches how PostgreSQL returns the 16-byte uuid column.
+    """
+    canonical = [_canonical(value) for value in values]
+    digest = hashlib.md5(json.dumps(canonical).encode("utf-8")).digest()
+    return str(uuid.UUID(bytes=digest))
+
+
+def rounded(value, places: int):
+    """Round a number like a NUMERIC(_, places) or INT column stores it."""
+    if isinstance(value, float):
+        text = _plain_repr(value)
+        if text is not None and len(text.partition(".")[2].rstrip("0")) <= places:
+            return value  # nothing to round (the common case, and much cheaper)
+    number = _as_decimal(value)
+    if number is None:
+        return value
+    return number.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+
+
+def _canonical(value):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        text = _plain_repr(value)
+        if text is not None:
+            return text[:-2] if text.endswith(".0") else text
+    number = _as_decimal(value)
+    if number is not None:
+        return format(number.normalize(), "f")
+    return str(value).strip()
+
+
+def _as_decimal(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float, Decimal)):
+        return Decimal(str(value))
+    if isinstance(value, str):
+        try:
+            number = Decimal(value.strip())
+        except InvalidOperation:
+            return None
+        return number if number.is_finite() else None
+    return None
+
+
+def _plain_repr(value: float):
+    """Shortest repr of a float, or None if it uses an exponent or is not finite."""
+    text = repr(value)
+    if "e" in text or "n" in text:
+        return None
+    return text
@@ -1,6 +1,8 @@
 import logging
 from dataclasses import dataclass, field
 
+from models.content_hash import content_hash, rounded
+
 
 @dataclass
 class Nutrition:
@@ -8,23 +10,44 @@ class Nutrition:
     quantity: int = None
     kcal: int = None
     kJ: int = None
-    fat: str = None
-    saturates: str = None
-    carbohydrate: str = None
-    sugars: str = None
-    fibre: str = None
-    protein: str = None
-    salt: str = None
+    fat: float = None
+    saturates: float = None
+    carbohydrate: float = None
+    sugars: float = None
+    fibre: float = None
+    protein: float = None
+    salt: float = None
     id: int = field(init=False, default=None)
 
+    def content_hash(self) -> str:
+        """Hash of the nutrient values as stored, shared by identical rows."""
+        return content_hash(
+            self.unit,
+            rounded(self.quantity, 0),
+            rounded(self.kcal, 0),
+            rounded(self.kJ, 0),
+            self.fat,
+            self.saturates,
+            self.carbohydrate,
+            self.sugars,
+            self.fibre,
+            self.protein,
+            self.salt,
+        )
+
     def save_to_db(self, cursor):
-        """Insert nutrients data into PostgreSQL and return the nutrient ID."""
+        """Insert nutrients data into PostgreSQL and return the nutrient ID.
+
+        An identical existing row (same content_hash) is reused instead.
+        """
         try:
             cursor.execute(
                 """
                 INSERT INTO nutrients (
-                    unit, quantity, kcal, kJ, fat, saturates, carbohydrate, sugars, fibre, protein, salt
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    unit, quantity, kcal, kJ, fat, saturates, carbohydrate, sugars, fibre, protein, salt,
+                    content_hash
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (content_hash) DO UPDATE SET content_hash = EXCLUDED.content_hash
                 RETURNING id;
                 """,
                 (
@@ -39,6 +62,7 @@ class Nutrition:
                     self.fibre,
                     self.protein,
                     self.salt,
+                    self.content_hash(),
                 ),
             )
             result = cursor.fetchone()
@@ -1,6 +1,8 @@
 import logging
 from dataclasses import dataclass, field
 
+from models.content_hash import content_hash, rounded
+
 
 @dataclass
 class Offer:
@@ -11,14 +13,29 @@ class Offer:
     promotion_unit_price: float = None
     id: int = field(init=False, default=None)
 
+    def content_hash(self) -> str:
+        """Hash of the offer values as stored, shared by identical rows."""
+        return content_hash(
+            rounded(self.price, 2),
+            self.quantity,
+            rounded(self.unit_price, 2),
+            rounded(self.promotion_price, 2),
+            rounded(self.promotion_unit_price, 2),
+        )
+
     def save_to_db(self, cursor):
-        """Insert offer data into PostgreSQL and return the offer ID."""
+        """Insert offer data into PostgreSQL and return the offer ID.
+
+        An identical existing row (same content_hash) is reused instead.
+        """
         try:
             cursor.execute(
                 """
                 INSERT INTO offer (
-                    price, quantity, unit_price, promotion_price, promotion_unit_price
-                ) VALUES (%s, %s, %s, %s, %s)
+                    price, quantity, unit_price, promotion_price, promotion_unit_price,
+                    content_hash
+                ) VALUES (%s, %s, %s, %s, %s, %s)
+                ON CONFLICT (content_hash) DO UPDATE SET content_hash = EXCLUDED.content_hash
                 RETURNING id;
                 """,
                 (
@@ -27,6 +44,7 @@ class Offer:
                     self.unit_price,
                     self.promotion_price,
                     self.promotion_unit_price,
+                    self.content_hash(),
                 ),
             )
             result = cursor.fetchone()
@@ -23,16 +23,19 @@ class Product:
     nutrition: Nutrition = None
 
     def save_to_db(self, cursor):
-        """Insert product data and related offer and nutrition into PostgreSQL."""
+        """Insert product data and related offer and nutrition into PostgreSQL.
+
+        Offer and nutrition rows that already have an ID are referenced as is.
+        """
         try:
             # Save Offer and Nutrition first, if they exist
             offer_id = None
             if self.offer:
-                offer_id = self.offer.save_to_db(cursor)
+                offer_id = self.offer.id or self.offer.save_to_db(cursor)
 
             nutrient_id = None
             if self.nutrition:
-                nutrient_id = self.nutrition.save_to_db(cursor)
+                nutrient_id = self.nutrition.id or self.nutrition.save_to_db(cursor)
 
             # Insert Product
             cursor.execute(
@@ -36,9 +36,18 @@ class ProductFactory:
 
     @staticmethod
     def create_product_from_json(product_json, cursor):
-        nutrient_id = None
-        offer_id = None
+        """Build a Product from raw JSON and save it with the given cursor."""
+        product = ProductFactory.build_product_from_json(product_json)
+        try:
+            product.save_to_db(cursor)
+        except Exception as e:
+            logging.error(f"Error processing product: {e}")
 
+        return product
+
+    @staticmethod
+    def build_product_from_json(product_json):
+        """Build a Product with its Offer and Nutrition without touching the DB."""
         # Extract nutrients
         nutrition = None
         offer = None
@@ -194,8 +203,8 @@ class ProductFactory:
                 gtins=gtins_str,
                 scraped_at=scraped_at,
             )
-            product.save_to_db(cursor)
         except Exception as e:
             logging.error(f"Error processing product: {e}")
+            raise
 
         return product
@@ -0,0 +1,46 @@
+import io
+from datetime import datetime
+from typing import Any, Iterable, Sequence
+
+from psycopg2 import sql
+
+_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def format_copy_value(value: Any) -> str:
+    """Format a Python value for COPY ... FROM STDIN in text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return str(value).translate(_ESCAPES)
+
+
+def to_int(value: Any) -> Any:
+    """Round numeric values bound for INTEGER columns, like an INSERT cast would."""
+    if isinstance(value, float):
+        return int(value + 0.5) if value >= 0 else int(value - 0.5)
+    return value
+
+
+def copy_rows(
+    cur, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]
+) -> int:
+    """Stream rows into a table with a single COPY FROM STDIN round trip."""
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write("\t".join(format_copy_value(value) for value in row))
+        buffer.write("\n")
+        count += 1
+    if count == 0:
+        return 0
+
+    buffer.seek(0)
+    statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(table), sql.SQL(", ").join(map(sql.Identifier, columns))
+    )
+    cur.copy_expert(statement.as_string(cur), buffer)
+    return count
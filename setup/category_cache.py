@@ -0,0 +1,104 @@
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class CategoryCache:
+    """In-memory category lookup by ID and slug, shared by both loaders.
+
+    Product-category links are validated against this cache instead of the
+    database. Links to unknown categories are counted and reported in one
+    summary via report_missing().
+    """
+
+    def __init__(self, category_documents: Iterable[Dict]):
+        self.by_id: Dict[int, Dict] = {}
+        self.by_slug: Dict[str, Dict] = {}
+        self.missing: Counter = Counter()
+        self._lock = threading.Lock()
+
+        for document in category_documents:
+            if document.get("id") is None:
+                continue
+            category = {
+                "id": document.get("id"),
+                "name": document.get("name"),
+                "slug": document.get("slug"),
+                "path": document.get("path"),
+            }
+            self.by_id[int(category["id"])] = category
+            if category["slug"]:
+                self.by_slug[category["slug"]] = category
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, category_id) -> bool:
+        return _as_int(category_id) in self.by_id
+
+    @classmethod
+    def from_postgres(cls, conn) -> "CategoryCache":
+        """Build the cache from the category table of an existing database."""
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, name, slug, path FROM category")
+            rows = cur.fetchall()
+        return cls(
+            (
+                row
+                if isinstance(row, dict)
+                else dict(zip(("id", "name", "slug", "path"), row))
+            )
+            for row in rows
+        )
+
+    def resolve_id(self, category_id) -> Optional[int]:
+        """Return the category ID as stored, or None (and count it) if unknown."""
+        normalized = _as_int(category_id)
+        if normalized in self.by_id:
+            return normalized
+        self._record_missing(category_id)
+        return None
+
+    def mongo_category(self, category_id, slug: Optional[str]) -> Optional[Dict]:
+        """Return the embedded category document for MongoDB, by slug then ID."""
+        category = self.by_slug.get(slug) or self.by_id.get(_as_int(category_id))
+        if category is None:
+            self._record_missing(category_id)
+            return None
+        return {
+            "id": category["id"],
+            "name": category["name"],
+            "slug": category["slug"],
+        }
+
+    def report_missing(self, context: str):
+        """Log all unknown categories seen since the last report, then reset."""
+        with self._lock:
+            missing, self.missing = self.missing, Counter()
+        if not missing:
+            return
+        sample = ", ".join(
+            str(category_id) for category_id, _ in missing.most_common(20)
+        )
+        logger.warning(
+            f"{context}: {sum(missing.values())} links to "
+            f"{len(missing)} unknown categories (most frequent: {sample})"
+        )
+
+    def _record_missing(self, category_id):
+        with self._lock:
+            self.missing[category_id] += 1
+
+
+def _as_int(category_id) -> Optional[int]:
+    """Breadcrumb IDs are strings while category documents use integers."""
+    try:
+        return int(category_id)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,43 @@
+from collections import defaultdict
+from typing import Dict, Optional
+
+
+class ContentHashCache:
+    """In-memory content_hash -> id map per table, for rows shared by products.
+
+    IDs learned inside a transaction are staged and only become visible after
+    commit(), so a rolled back batch never leaves IDs of rows that do not
+    exist in the database.
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.pending: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, table: str, content_hash: str) -> Optional[int]:
+        """Return the row ID for a hash, including IDs staged in this transaction."""
+        row_id = self.ids[table].get(content_hash) or self.pending[table].get(
+            content_hash
+        )
+        if row_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return row_id
+
+    def stage(self, table: str, content_hash: str, row_id: int):
+        """Remember an ID written in the current transaction."""
+        self.pending[table][content_hash] = row_id
+
+    def commit(self):
+        for table, ids in self.pending.items():
+            self.ids[table].update(ids)
+        self.pending.clear()
+
+    def rollback(self):
+        self.pending.clear()
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self.ids.values())
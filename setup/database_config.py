@@ -8,7 +8,14 @@ class DatabaseConfig:
     MONGO_DB_URI: str = "mongodb://localhost:27017/"
     MONGO_DB_NAME: str = "productdb"
     MONGO_PRODUCT_COLLECTION: str = "products"
+    MONGO_CURRENT_COLLECTION: str = "products_current"  # newest snapshot per product
+    # Bucket layout: one document per product and up to BUCKET_SIZE snapshots
+    MONGO_HISTORY_COLLECTION: str = "product_history"
+    MONGO_HISTORY_BUCKET_SIZE: int = int(os.getenv("MONGO_HISTORY_BUCKET_SIZE", "50"))
+    MONGO_BUCKET_HISTORY: bool = os.getenv("MONGO_BUCKET_HISTORY", "0") == "1"
     MONGO_CATEGORY_COLLECTION: str = "categories"
+    MONGO_MANIFEST_COLLECTION: str = "load_manifest"
+    MONGO_POOL_SIZE: int = int(os.getenv("MONGO_POOL_SIZE", "100"))  # per client
 
     # PostgreSQL Configuration
     PG_DB_NAME: str = os.getenv("PG_DB_NAME", "productsandcategories")
@@ -17,11 +24,31 @@ class DatabaseConfig:
     PG_DB_PASSWORD: str = os.getenv("PG_DB_PASSWORD", "password")
     PG_DB_HOST: str = os.getenv("PG_DB_HOST", "localhost")
     PG_DB_PORT: str = os.getenv("PG_DB_PORT", "5432")
+    PG_POOL_SIZE: int = int(os.getenv("PG_POOL_SIZE", "10"))  # max pooled connections
 
     # Data Paths
     PRODUCTS_PATH: str = "data/product/"
     CATEGORIES_PATH: str = "data/categorie/"
     SQL_INIT_SCRIPT: str = "setup/sql/createdb.sql"
+    SQL_DEFERRED_SCRIPT: str = "setup/sql/createdb_deferred.sql"
+    SQL_PARTITIONED_SCRIPT: str = "setup/sql/createdb_partitioned.sql"
+    SQL_POST_LOAD_SCRIPT: str = "setup/sql/post_load.sql"
+    REJECT_FILE: str = os.getenv("REJECT_FILE", "logs/rejected_snapshots.jsonl")
 
     # Processing Configuration
     BATCH_SIZE: int = 1000
+    LOADER_WORKERS: int = int(os.getenv("LOADER_WORKERS", os.cpu_count() or 1))
+    LOADER_CHUNK_SIZE: int = int(os.getenv("LOADER_CHUNK_SIZE", "64"))
+    PG_BULK_LOAD: bool = os.getenv("PG_BULK_LOAD", "1") == "1"  # COPY-based loads
+    # Build keys and indexes after fresh bulk loads, optionally into UNLOGGED tables
+    PG_DEFER_CONSTRAINTS: bool = os.getenv("PG_DEFER_CONSTRAINTS", "1") == "1"
+    PG_UNLOGGED_LOAD: bool = os.getenv("PG_UNLOGGED_LOAD", "0") == "1"
+    PG_LOAD_WORKERS: int = int(os.getenv("PG_LOAD_WORKERS", "1"))  # >1: parallel
+    # Monthly scraped_at range partitions for product and product_category
+    PG_PARTITIONED: bool = os.getenv("PG_PARTITIONED", "0") == "1"
+    PIPELINE_QUEUE_SIZE: int = 8  # batches buffered per sink
+    # Pipelined MongoDB loader: bounded queue depth (batches) and thread counts.
+    # Transforms hold the GIL, so one thread is enough to overlap them with inserts
+    MONGO_QUEUE_SIZE: int = int(os.getenv("MONGO_QUEUE_SIZE", "4"))
+    MONGO_TRANSFORM_THREADS: int = int(os.getenv("MONGO_TRANSFORM_THREADS", "1"))
+    MONGO_INSERT_WORKERS: int = int(os.getenv("MONGO_INSERT_WORKERS", "2"))
@@ -1,7 +1,15 @@
 import json
 import logging
 import os
-from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from setup.snapshot_archive import (
+    SnapshotArchive,
+    archive_is_stale,
+    archive_path_for,
+)
+from setup.snapshot_index import SnapshotIndex
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -14,41 +22,208 @@ class DataLoader:
 
     @staticmethod
     def load_documents_from_folder(
-        folder_path: str, limit: Optional[int] = None
+        folder_path: str,
+        limit: Optional[int] = None,
+        workers: int = 1,
+        chunk_size: int = 64,
+        use_archive: bool = True,
     ) -> List[Dict]:
         """Load and validate JSON documents from folder."""
-        if not os.path.exists(folder_path):
-            logger.error(f"Folder does not exist: {folder_path}")
-            return []
+        documents = list(
+            DataLoader.iter_documents_from_folder(
+                folder_path,
+                limit,
+                workers=workers,
+                chunk_size=chunk_size,
+                use_archive=use_archive,
+            )
+        )
+        logger.info(f"Successfully loaded {len(documents)} valid documents")
+        return documents
 
-        documents = []
-        json_files = [f for f in os.listdir(folder_path) if f.endswith(".json")]
+    @staticmethod
+    def iter_documents_from_folder(
+        folder_path: str,
+        limit: Optional[int] = None,
+        workers: int = 1,
+        chunk_size: int = 64,
+        use_archive: bool = True,
+    ) -> Iterator[Dict]:
+        """Lazily load and validate JSON documents from folder.
 
-        if not json_files:
-            logger.warning(f"No JSON files found in {folder_path}")
-            return []
+        If an up-to-date packed archive exists next to the folder (see
+        snapshot_archive), documents are streamed from it instead of the
+        individual files. With workers > 1, reading, parsing and validation of
+        the files are fanned out across a process pool; documents are still
+        yielded in file order. Archives are always read sequentially.
+        """
+        archive_path = DataLoader._current_archive(folder_path, use_archive)
+        if archive_path:
+            DataLoader._log_ignored_workers(workers)
+            yield from DataLoader._iter_archive(archive_path, limit)
+            return
 
-        # Apply limit to number of files to process
         if limit and limit > 0:
-            json_files = json_files[:limit]
             logger.info(f"Processing limited to {limit} files")
+        index = SnapshotIndex.from_folder(folder_path).head(limit)
+        yield from DataLoader.iter_documents_from_index(
+            index, workers=workers, chunk_size=chunk_size, use_archive=False
+        )
 
-        logger.info(f"Loading {len(json_files)} JSON files from {folder_path}")
+    @staticmethod
+    def snapshot_index(folder_path: str, use_archive: bool = True) -> SnapshotIndex:
+        """Build a SnapshotIndex, from the archive's key index when it is current.
 
-        for filename in json_files:
-            file_path = os.path.join(folder_path, filename)
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    document = json.load(f)
-                    if DataLoader._validate_document(document, filename):
-                        documents.append(document)
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON in {filename}: {e}")
-            except Exception as e:
-                logger.error(f"Error loading {filename}: {e}")
+        The archive is checked here, once per load: an index built from it
+        carries its archive_path, and its snapshots are then read from it.
+        """
+        archive_path = DataLoader._current_archive(folder_path, use_archive)
+        if archive_path:
+            with SnapshotArchive(archive_path) as archive:
+                return SnapshotIndex.from_keys(
+                    folder_path, archive.keys(), archive_path
+                )
+        return SnapshotIndex.from_folder(folder_path)
 
-        logger.info(f"Successfully loaded {len(documents)} valid documents")
-        return documents
+    @staticmethod
+    def iter_documents_from_index(
+        index: SnapshotIndex,
+        workers: int = 1,
+        chunk_size: int = 64,
+        use_archive: bool = True,
+    ) -> Iterator[Dict]:
+        """Lazily load only the snapshots selected by a SnapshotIndex.
+
+        Files that were filtered out of the index are never opened. When the
+        index was built from a packed archive (see snapshot_index), entries
+        are fetched from it by key via random access.
+        """
+        if use_archive and index.archive_path:
+            DataLoader._log_ignored_workers(workers)
+            yield from DataLoader._iter_archive_entries(index.archive_path, index)
+            return
+
+        logger.info(f"Loading {len(index)} JSON files from {index.folder_path}")
+        file_paths = index.paths()
+        if workers and workers > 1:
+            documents = DataLoader._iter_files_parallel(file_paths, workers, chunk_size)
+        else:
+            documents = map(DataLoader._load_file, file_paths)
+
+        for document in documents:
+            if document is not None:
+                yield document
+
+    @staticmethod
+    def _current_archive(folder_path: str, use_archive: bool) -> Optional[str]:
+        """The folder's archive path if it should be read instead of the folder.
+
+        A stale archive is skipped with a warning, so snapshots added after
+        packing are still loaded.
+        """
+        archive_path = archive_path_for(folder_path)
+        if not use_archive or not os.path.exists(archive_path):
+            return None
+        if archive_is_stale(folder_path, archive_path):
+            logger.warning(
+                f"Archive {archive_path} is older than {folder_path}, loading "
+                "the folder instead (re-pack with: python -m "
+                "setup.snapshot_archive pack)"
+            )
+            return None
+        return archive_path
+
+    @staticmethod
+    def _log_ignored_workers(workers: int):
+        if workers and workers > 1:
+            logger.info(f"Reading archive sequentially, workers={workers} ignored")
+
+    @staticmethod
+    def _iter_files_parallel(
+        file_paths: List[str], workers: int, chunk_size: int
+    ) -> Iterator[Optional[Dict]]:
+        """Load files in a process pool, preserving order.
+
+        Files are submitted in windows of a few chunks per worker so that
+        parsed documents never pile up faster than the consumer drains them.
+        """
+        chunk_size = max(1, chunk_size)
+        window_size = workers * chunk_size * 4
+        logger.info(
+            f"Parallel loading with {workers} workers (chunk size {chunk_size})"
+        )
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for start in range(0, len(file_paths), window_size):
+                window = file_paths[start : start + window_size]
+                yield from executor.map(
+                    DataLoader._load_file, window, chunksize=chunk_size
+                )
+
+    @staticmethod
+    def _iter_archive(archive_path: str, limit: Optional[int]) -> Iterator[Dict]:
+        """Stream and validate documents from a packed snapshot archive."""
+        logger.info(f"Loading documents from archive {archive_path}")
+        with SnapshotArchive(archive_path) as archive:
+            for document in archive.iter_documents(limit):
+                if DataLoader._validate_document(document, archive_path):
+                    yield document
+
+    @staticmethod
+    def _iter_archive_entries(
+        archive_path: str, index: SnapshotIndex
+    ) -> Iterator[Dict]:
+        """Fetch the indexed snapshots from a packed archive by key."""
+        logger.info(f"Loading {len(index)} documents from archive {archive_path}")
+        with SnapshotArchive(archive_path) as archive:
+            for entry in index:
+                document = archive.get(entry.migros_id, entry.scraped_at)
+                if document is None:
+                    logger.warning(f"Snapshot {entry.path} missing from archive")
+                elif DataLoader._validate_document(document, entry.path):
+                    yield document
+
+    @staticmethod
+    def iter_batches_from_folder(
+        folder_path: str,
+        batch_size: int,
+        limit: Optional[int] = None,
+        workers: int = 1,
+        chunk_size: int = 64,
+    ) -> Iterator[List[Dict]]:
+        """Lazily load documents from folder in batches of at most batch_size."""
+        yield from DataLoader.batched(
+            DataLoader.iter_documents_from_folder(
+                folder_path, limit, workers=workers, chunk_size=chunk_size
+            ),
+            batch_size,
+        )
+
+    @staticmethod
+    def batched(documents: Iterable[Dict], batch_size: int) -> Iterator[List[Dict]]:
+        """Group an iterable of documents into lists of at most batch_size."""
+        batch = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _load_file(file_path: str) -> Optional[Dict]:
+        """Load and validate a single JSON file, returning None on failure."""
+        filename = os.path.basename(file_path)
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                document = json.load(f)
+            if DataLoader._validate_document(document, filename):
+                return document
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in {filename}: {e}")
+        except Exception as e:
+            logger.error(f"Error loading {filename}: {e}")
+        return None
 
     @staticmethod
     def _validate_document(document: Dict, filename: str) -> bool:
@@ -0,0 +1,57 @@
+import logging
+import time
+
+from psycopg2 import sql
+
+from setup.database_config import DatabaseConfig
+from setup.postgresql_manager import PostgreSQLManager
+
+config = DatabaseConfig()
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Tables created without keys for bulk loads, in foreign key dependency order
+DEFERRED_TABLES = ("nutrients", "offer", "product", "product_category")
+
+
+def create_deferred_schema(
+    db_manager: PostgreSQLManager, dbname: str, unlogged: bool = False
+):
+    """Create the bare bulk-load tables, optionally UNLOGGED (no WAL writes)."""
+    db_manager.execute_script(dbname, config.SQL_DEFERRED_SCRIPT)
+    if unlogged:
+        _set_logged(db_manager, dbname, logged=False)
+
+
+def build_deferred_constraints(
+    db_manager: PostgreSQLManager, dbname: str, unlogged: bool = False
+) -> float:
+    """Restore logging, then build all primary and foreign keys in one pass.
+
+    Tables are set back to LOGGED first, because a logged table may not
+    reference an unlogged one. Returns the elapsed seconds.
+    """
+    start = time.perf_counter()
+    if unlogged:
+        _set_logged(db_manager, dbname, logged=True)
+    db_manager.execute_script(dbname, config.SQL_POST_LOAD_SCRIPT)
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Built deferred keys in {elapsed:.2f}s")
+    return elapsed
+
+
+def _set_logged(db_manager: PostgreSQLManager, dbname: str, logged: bool):
+    mode = sql.SQL("LOGGED" if logged else "UNLOGGED")
+    with db_manager.connect(dbname) as conn:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            for table in DEFERRED_TABLES:
+                cur.execute(
+                    sql.SQL("ALTER TABLE {} SET {}").format(sql.Identifier(table), mode)
+                )
+    conn.close()
+    logger.info(f"Set {', '.join(DEFERRED_TABLES)} to {mode.string}")
@@ -0,0 +1,293 @@
+import itertools
+import logging
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from models.product_factory import ProductFactory
+from setup.category_cache import CategoryCache
+from setup.database_config import DatabaseConfig
+from setup.dataloader import DataLoader
+from setup.deferred_schema import build_deferred_constraints
+from setup.index_catalog import MONGO_INDEXES
+from setup.load_manifest import (
+    MongoLoadManifest,
+    fingerprint_index,
+    snapshot_file_name,
+)
+from setup.mongo_history import append_to_buckets
+from setup.mongodb_manager import MongoDBManager
+from setup.postgresql_manager import PostgreSQLManager
+from setup.save_to_local_mongo import ProductProcessor as MongoProductProcessor
+from setup.save_to_local_mongo import insert_categories
+from setup.save_to_local_sql import ProductProcessor as SqlProductProcessor
+from setup.save_to_local_sql import initialize_database
+from setup.snapshot_index import SnapshotIndex
+from setup.time_partitions import MonthlyPartitions
+
+config = DatabaseConfig()
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class SinkWriter(threading.Thread):
+    """Writer thread draining a bounded queue of snapshot batches into one sink."""
+
+    def __init__(self, name: str, batches: queue.Queue, write):
+        super().__init__(name=name, daemon=True)
+        self.batches = batches
+        self.write = write
+        self.error = None
+        self.elapsed = 0.0
+        self.counts = (0, 0)  # (stored, failed) snapshots
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            self.counts = self.write(self._iter_batches())
+        except Exception as e:
+            self.error = e
+            logger.error(f"{self.name} writer failed: {e}")
+            # Keep draining so the reader never blocks on a dead sink
+            for _ in self._iter_batches():
+                pass
+        finally:
+            self.elapsed = time.perf_counter() - start
+
+    def _iter_batches(self) -> Iterator[List[Dict]]:
+        while True:
+            batch = self.batches.get()
+            if batch is _END:
+                return
+            yield batch
+
+
+class DualSinkPipeline:
+    """Reads every snapshot once and loads MongoDB and PostgreSQL concurrently.
+
+    The reader (main thread) parses each file once and hands the batches of
+    parsed documents to two bounded queues. A writer thread per database
+    drains its queue, transforming each document for its schema and storing
+    it, so neither transform holds up the reader or the other sink, and
+    wall-clock time approaches the slower sink instead of the sum of both
+    passes. The two transforms share no parsing: the loaders read the
+    nutrition table and offer differently (column choice, unit price), so
+    each sink keeps its own. Snapshots either sink fails to transform go to
+    the shared reject log, and both load manifests record the files each
+    sink stored.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = config.BATCH_SIZE,
+        queue_size: int = config.PIPELINE_QUEUE_SIZE,
+    ):
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.mongo_manager = MongoDBManager(config.MONGO_DB_URI, config.MONGO_DB_NAME)
+        self.postgres_manager = PostgreSQLManager(config)
+        self.sql_processor = SqlProductProcessor(
+            self.postgres_manager, ProductFactory()
+        )
+        self.categories = CategoryCache([])
+        self.deferred = (
+            config.PG_BULK_LOAD
+            and config.PG_DEFER_CONSTRAINTS
+            and not config.PG_PARTITIONED
+        )
+        if config.PG_PARTITIONED:
+            self.sql_processor.partitions = MonthlyPartitions(
+                self.postgres_manager, config.PG_DB_NAME
+            )
+        self.reject_log = self.sql_processor.reject_log
+        self.fingerprints = {}
+
+    def mongo_document(self, document: Dict) -> Optional[Dict]:
+        """Transform a parsed snapshot for MongoDB; None (and rejected) on failure."""
+        try:
+            return MongoProductProcessor.process_product(document, self.categories)
+        except Exception as e:
+            file_name = snapshot_file_name(document)
+            logger.error(f"MongoDB transform failed for {file_name}: {e}")
+            self.reject_log.reject(
+                file_name, "mongo_transform", e, migros_id=document.get("migrosId")
+            )
+            return None
+
+    def run(
+        self,
+        limit_products: Optional[int] = None,
+        snapshot_index: Optional[SnapshotIndex] = None,
+    ) -> Dict[str, Dict[str, int]]:
+        """Recreate both databases and load them in a single pass.
+
+        Returns the stored and failed snapshot counts of each sink.
+        """
+        start = time.perf_counter()
+        self._prepare_databases()
+
+        if snapshot_index is None:
+            snapshot_index = DataLoader.snapshot_index(config.PRODUCTS_PATH)
+        snapshot_index = snapshot_index.head(limit_products)
+        self.fingerprints = fingerprint_index(snapshot_index)
+        documents = DataLoader.iter_documents_from_index(
+            snapshot_index,
+            workers=config.LOADER_WORKERS,
+            chunk_size=config.LOADER_CHUNK_SIZE,
+        )
+
+        writers = [
+            SinkWriter("MongoDB", queue.Queue(self.queue_size), self._write_mongo),
+            SinkWriter("PostgreSQL", queue.Queue(self.queue_size), self._write_sql),
+        ]
+        for writer in writers:
+            writer.start()
+
+        read_count = 0
+        try:
+            for batch in DataLoader.batched(documents, self.batch_size):
+                read_count += len(batch)
+                for writer in writers:
+                    writer.batches.put(batch)
+        finally:
+            for writer in writers:
+                writer.batches.put(_END)
+            for writer in writers:
+                writer.join()
+
+        try:
+            errors = [writer.error for writer in writers if writer.error]
+            if errors:
+                raise RuntimeError(f"Pipeline sink failed: {errors[0]}") from errors[0]
+            self._finalize_databases()
+        finally:
+            self.mongo_manager.disconnect()
+
+        self.categories.report_missing("Single-pass category links")
+        counts = {}
+        for writer in writers:
+            stored, failed = writer.counts
+            counts[writer.name] = {"stored": stored, "failed": failed}
+            logger.info(
+                f"{writer.name} sink finished in {writer.elapsed:.2f}s: "
+                f"{stored} stored, {failed} failed"
+            )
+        logger.info(
+            f"Single-pass load of {read_count} snapshots took "
+            f"{time.perf_counter() - start:.2f}s"
+        )
+        return counts
+
+    def _prepare_databases(self):
+        """Reset both databases and load categories, read once for both."""
+        category_documents = DataLoader.load_documents_from_folder(
+            config.CATEGORIES_PATH
+        )
+
+        initialize_database(
+            self.postgres_manager,
+            config.PG_DB_NAME,
+            deferred=self.deferred,
+            unlogged=self.deferred and config.PG_UNLOGGED_LOAD,
+            partitioned=config.PG_PARTITIONED,
+        )
+        if category_documents:
+            self.sql_processor.process_categories(
+                category_documents, config.PG_DB_NAME, self.batch_size
+            )
+
+        self.mongo_manager.connect()
+        self.mongo_manager.clear_collections(
+            [
+                config.MONGO_PRODUCT_COLLECTION,
+                config.MONGO_CURRENT_COLLECTION,
+                config.MONGO_HISTORY_COLLECTION,
+                config.MONGO_CATEGORY_COLLECTION,
+                config.MONGO_MANIFEST_COLLECTION,
+            ]
+        )
+        self.mongo_manager.drop_indexes(config.MONGO_PRODUCT_COLLECTION)
+        for collection in (
+            config.MONGO_CURRENT_COLLECTION,
+            config.MONGO_HISTORY_COLLECTION,
+        ):
+            self.mongo_manager.create_indexes(collection, MONGO_INDEXES[collection])
+        # Copies, since insert_many adds an _id to every inserted document
+        self.categories = insert_categories(
+            self.mongo_manager, [dict(doc) for doc in category_documents]
+        )
+        # One lookup shared by the Mongo transform and the SQL link validation
+        self.sql_processor.category_cache = self.categories
+
+    def _finalize_databases(self):
+        """Build the indexes (and keys) deferred until both sinks are loaded."""
+        self.mongo_manager.create_index_catalog()
+        if self.deferred:
+            build_deferred_constraints(
+                self.postgres_manager,
+                config.PG_DB_NAME,
+                unlogged=config.PG_UNLOGGED_LOAD,
+            )
+        self.postgres_manager.create_indexes(dbname=config.PG_DB_NAME)
+
+    def _write_mongo(self, batches: Iterator[List[Dict]]):
+        manifest = MongoLoadManifest(
+            self.mongo_manager.db, config.MONGO_MANIFEST_COLLECTION
+        )
+        stored = failed = 0
+        for batch in batches:
+            documents, file_names = [], []
+            for raw in batch:
+                document = self.mongo_document(raw)
+                if document is not None:
+                    documents.append(document)
+                    file_names.append(snapshot_file_name(raw))
+            failed += len(batch) - len(documents)
+            if documents:
+                inserted = self.mongo_manager.insert_batch(
+                    config.MONGO_PRODUCT_COLLECTION, documents, self.batch_size
+                )
+                stored += inserted
+                failed += len(documents) - inserted
+                # Only fully inserted batches, so partial failures are retried
+                if inserted == len(documents):
+                    manifest.record(file_names, self.fingerprints)
+                self.mongo_manager.upsert_latest(
+                    config.MONGO_CURRENT_COLLECTION,
+                    documents,
+                    "migrosId",
+                    "scraped_at",
+                    self.batch_size,
+                )
+                if config.MONGO_BUCKET_HISTORY:
+                    append_to_buckets(
+                        self.mongo_manager, config.MONGO_HISTORY_COLLECTION, documents
+                    )
+        return stored, failed
+
+    def _write_sql(self, batches: Iterator[List[Dict]]):
+        prepared = (
+            self.sql_processor.prepare_product(document)
+            for document in itertools.chain.from_iterable(batches)
+        )
+        return self.sql_processor.store_products(
+            prepared,
+            config.PG_DB_NAME,
+            self.batch_size,
+            fingerprints=self.fingerprints,
+            bulk=config.PG_BULK_LOAD,
+        )
+
+
+def create_databases_single_pass(
+    limit_products: Optional[int] = None,
+    snapshot_index: Optional[SnapshotIndex] = None,
+):
+    """Load MongoDB and PostgreSQL from one read of the snapshot corpus."""
+    return DualSinkPipeline().run(limit_products, snapshot_index)
@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from psycopg2 import sql
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from setup.database_config import DatabaseConfig
+
+config = DatabaseConfig()
+
+
+@dataclass(frozen=True)
+class PostgresIndex:
+    """A secondary PostgreSQL index, a plain B-tree unless method says otherwise.
+
+    opclass applies to every column (e.g. gin_trgm_ops); indexes that need
+    an extension name it, so it can be created first.
+    """
+
+    name: str
+    table: str
+    columns: Tuple[str, ...]
+    method: str = "btree"
+    opclass: Optional[str] = None
+    extension: Optional[str] = None
+
+    def create_statement(self) -> sql.Composed:
+        columns = [sql.Identifier(column) for column in self.columns]
+        if self.opclass:
+            columns = [
+                sql.SQL("{} {}").format(column, sql.SQL(self.opclass))
+                for column in columns
+            ]
+        return sql.SQL("CREATE INDEX IF NOT EXISTS {} ON {} USING {} ({})").format(
+            sql.Identifier(self.name),
+            sql.Identifier(self.table),
+            sql.SQL(self.method),
+            sql.SQL(", ").join(columns),
+        )
+
+    def drop_statement(self) -> sql.Composed:
+        return sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(self.name))
+
+
+# Secondary indexes only: primary keys, foreign keys and the content_hash
+# unique keys belong to the schema and are never dropped with the catalog.
+POSTGRES_INDEXES: List[PostgresIndex] = [
+    PostgresIndex("idx_product_brand", "product", ("brand",)),
+    PostgresIndex("idx_offer_price", "offer", ("price",)),
+    PostgresIndex("idx_category_name", "category", ("name",)),
+    PostgresIndex(
+        "idx_product_category_category_id", "product_category", ("category_id",)
+    ),
+    # Commonly filtered nutrients, for index-driven range queries
+    PostgresIndex("idx_nutrients_protein", "nutrients", ("protein",)),
+    PostgresIndex("idx_nutrients_fat", "nutrients", ("fat",)),
+    PostgresIndex("idx_nutrients_sugars", "nutrients", ("sugars",)),
+    PostgresIndex("idx_nutrients_kcal", "nutrients", ("kcal",)),
+    # Serves the unanchored ILIKE '%...%' category filters, which a B-tree cannot
+    PostgresIndex(
+        "idx_category_name_trgm",
+        "category",
+        ("name",),
+        method="gin",
+        opclass="gin_trgm_ops",
+        extension="pg_trgm",
+    ),
+]
+
+# Case-insensitive comparison (strength 2 ignores case, not accents); queries
+# only use a collated index when they pass the same collation.
+CASE_INSENSITIVE = {"locale": "en", "strength": 2}
+
+# The unique product key mirrors the PostgreSQL primary key and backs sync
+# upserts, so it is kept when the secondary indexes are dropped.
+MONGO_INDEXES: Dict[str, List[IndexModel]] = {
+    config.MONGO_PRODUCT_COLLECTION: [
+        IndexModel(
+            [("migrosId", ASCENDING), ("scraped_at", DESCENDING)],
+            name="product_key",
+            unique=True,
+        ),
+        # Multikey: one entry per element of the embedded categories array
+        IndexModel([("categories.id", ASCENDING)], name="category_id"),
+        # Serves exact category names matched with the CASE_INSENSITIVE
+        # collation (see BaseMeasurement.mongo_category_filter); a $regex
+        # substring match cannot use it
+        IndexModel(
+            [("categories.name", ASCENDING)],
+            name="category_name_ci",
+            collation=CASE_INSENSITIVE,
+        ),
+        IndexModel([("brand", ASCENDING)], name="brand"),
+        IndexModel(
+            [("offer.price", ASCENDING), ("nutrition.protein", ASCENDING)],
+            name="price_protein",
+        ),
+    ],
+    # Upserts on migrosId need the unique key, also while a load is running
+    config.MONGO_CURRENT_COLLECTION: [
+        IndexModel([("migrosId", ASCENDING)], name="migros_id", unique=True),
+    ],
+    # Buckets of a product, newest first; appends match the single open bucket
+    config.MONGO_HISTORY_COLLECTION: [
+        IndexModel(
+            [("migrosId", ASCENDING), ("last_scraped_at", DESCENDING)],
+            name="bucket_key",
+        ),
+        IndexModel(
+            [("migrosId", ASCENDING)],
+            name="open_bucket",
+            unique=True,
+            partialFilterExpression={"open": True},
+        ),
+    ],
+}
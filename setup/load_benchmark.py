@@ -0,0 +1,47 @@
+import argparse
+import logging
+from typing import Dict, Optional
+
+from setup.save_to_local_sql import create_sql_db
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# (label, create_sql_db keyword arguments)
+LOAD_MODES = [
+    ("immediate", {"defer_constraints": False, "unlogged": False}),
+    ("deferred", {"defer_constraints": True, "unlogged": False}),
+    ("deferred+unlogged", {"defer_constraints": True, "unlogged": True}),
+]
+
+
+def benchmark(limit_products: Optional[int] = None) -> Dict[str, float]:
+    """Recreate the SQL database once per load mode and compare load times."""
+    timings = {}
+    for label, options in LOAD_MODES:
+        logger.info(f"Benchmarking {label} constraint mode...")
+        timings[label] = create_sql_db(
+            limit_products=limit_products, bulk_load=True, **options
+        )
+
+    baseline = timings["immediate"]
+    for label, elapsed in timings.items():
+        logger.info(
+            f"{label:>18}: {elapsed:.2f}s ({baseline / elapsed:.2f}x vs immediate)"
+        )
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare SQL bulk load times with and without deferred keys"
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Max snapshots")
+    args = parser.parse_args()
+    benchmark(args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+
+from psycopg2.extras import execute_values
+from pymongo import ReplaceOne
+
+from setup.snapshot_index import SnapshotIndex
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# (file size in bytes, modification time in ns)
+Fingerprint = Tuple[int, int]
+
+
+def snapshot_file_name(document: Dict) -> str:
+    """Reconstruct the snapshot file name of a raw product document."""
+    return f"{document.get('migrosId')}-{document.get('dateAdded')}.json"
+
+
+def fingerprint_index(index: SnapshotIndex) -> Dict[str, Fingerprint]:
+    """Stat every file in the index, keyed by file name.
+
+    Files missing on disk (an index read from a packed archive whose folder
+    is gone) have no fingerprint and are not recorded in the manifest.
+    """
+    fingerprints = {}
+    for entry in index:
+        try:
+            stat = os.stat(entry.path)
+        except FileNotFoundError:
+            continue
+        fingerprints[os.path.basename(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+    return fingerprints
+
+
+def pending_snapshots(
+    index: SnapshotIndex,
+    fingerprints: Dict[str, Fingerprint],
+    loaded: Dict[str, Fingerprint],
+) -> SnapshotIndex:
+    """Return the part of the index that has not been ingested yet.
+
+    Files that were ingested but changed on disk since (different size or
+    mtime) are reported; their snapshot already exists in the database, so
+    they need a full reload rather than an incremental one. Files without a
+    fingerprint were deleted after the index was built and are skipped.
+    """
+    pending = []
+    changed = missing = 0
+    for entry in index:
+        file_name = os.path.basename(entry.path)
+        fingerprint = fingerprints.get(file_name)
+        if fingerprint is None:
+            missing += 1
+            logger.warning(f"{file_name} is no longer on disk, skipping")
+        elif file_name not in loaded:
+            pending.append(entry)
+        elif loaded[file_name] != fingerprint:
+            changed += 1
+            logger.warning(f"{file_name} changed since it was ingested, skipping")
+
+    logger.info(
+        f"Manifest: {len(index) - len(pending) - missing} snapshots already "
+        f"ingested, {len(pending)} new, {changed} changed, {missing} missing"
+    )
+    return SnapshotIndex(index.folder_path, pending, index.archive_path)
+
+
+class PostgresLoadManifest:
+    """Manifest of ingested snapshot files stored in the load_manifest table."""
+
+    @staticmethod
+    def fetch(conn) -> Dict[str, Fingerprint]:
+        """Return the fingerprints of all ingested files."""
+        with conn.cursor() as cur:
+            cur.execute("SELECT file_name, file_size, file_mtime_ns FROM load_manifest")
+            return {name: (size, mtime) for name, size, mtime in cur.fetchall()}
+
+    @staticmethod
+    def record(cur, file_names: Iterable[str], fingerprints: Dict[str, Fingerprint]):
+        """Record ingested files using the caller's cursor and transaction."""
+        rows = [
+            (name, *fingerprints[name]) for name in file_names if name in fingerprints
+        ]
+        if not rows:
+            return
+        execute_values(
+            cur,
+            """
+            INSERT INTO load_manifest (file_name, file_size, file_mtime_ns)
+            VALUES %s
+            ON CONFLICT (file_name) DO UPDATE
+            SET file_size = EXCLUDED.file_size,
+                file_mtime_ns = EXCLUDED.file_mtime_ns,
+                loaded_at = NOW()
+            """,
+            rows,
+        )
+
+
+class MongoLoadManifest:
+    """Manifest of ingested snapshot files stored in a MongoDB collection."""
+
+    def __init__(self, db, collection: str):
+        self.collection = db[collection]
+
+    def fetch(self) -> Dict[str, Fingerprint]:
+        """Return the fingerprints of all ingested files."""
+        return {
+            doc["_id"]: (doc["file_size"], doc["file_mtime_ns"])
+            for doc in self.collection.find({})
+        }
+
+    def record(self, file_names: Iterable[str], fingerprints: Dict[str, Fingerprint]):
+        """Record ingested files."""
+        operations = [
+            ReplaceOne(
+                {"_id": name},
+                {
+                    "file_size": fingerprints[name][0],
+                    "file_mtime_ns": fingerprints[name][1],
+                    "loaded_at": datetime.now(),
+                },
+                upsert=True,
+            )
+            for name in file_names
+            if name in fingerprints
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
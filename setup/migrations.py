@@ -0,0 +1,211 @@
+import logging
+from typing import Callable, Dict, List, Tuple
+
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor, execute_values
+
+from models.nutrition import Nutrition
+from models.offer import Offer
+from setup.postgresql_manager import PostgreSQLManager
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def _add_content_hashes(cur):
+    """Hash existing offer and nutrient rows and merge identical ones."""
+    for table, product_column, build in (
+        ("offer", "offer_id", lambda row: Offer(**row)),
+        ("nutrients", "nutrient_id", _nutrition_from_row),
+    ):
+        identifier = sql.Identifier(table)
+        cur.execute(
+            sql.SQL("ALTER TABLE {} ADD COLUMN IF NOT EXISTS content_hash UUID").format(
+                identifier
+            )
+        )
+        cur.execute(
+            sql.SQL("SELECT * FROM {} WHERE content_hash IS NULL ORDER BY id").format(
+                identifier
+            )
+        )
+        keep: Dict[str, int] = {}
+        hashes: List[Tuple[int, str]] = []
+        duplicates: List[Tuple[int, int]] = []
+        for row in cur.fetchall():
+            row_id = row.pop("id")
+            row.pop("content_hash")
+            content_hash = build(row).content_hash()
+            if content_hash in keep:
+                duplicates.append((row_id, keep[content_hash]))
+            else:
+                keep[content_hash] = row_id
+                hashes.append((row_id, content_hash))
+
+        execute_values(
+            cur,
+            sql.SQL(
+                "UPDATE {} AS t SET content_hash = v.content_hash::uuid "
+                "FROM (VALUES %s) AS v(id, content_hash) WHERE t.id = v.id"
+            )
+            .format(identifier)
+            .as_string(cur),
+            hashes,
+        )
+        if duplicates:
+            execute_values(
+                cur,
+                sql.SQL(
+                    "UPDATE product SET {column} = v.keep_id "
+                    "FROM (VALUES %s) AS v(duplicate_id, keep_id) "
+                    "WHERE product.{column} = v.duplicate_id"
+                )
+                .format(column=sql.Identifier(product_column))
+                .as_string(cur),
+                duplicates,
+            )
+            cur.execute(
+                sql.SQL("DELETE FROM {} WHERE id = ANY(%s)").format(identifier),
+                ([duplicate_id for duplicate_id, _ in duplicates],),
+            )
+
+        cur.execute(
+            sql.SQL("ALTER TABLE {} ALTER COLUMN content_hash SET NOT NULL").format(
+                identifier
+            )
+        )
+        cur.execute(
+            sql.SQL("CREATE UNIQUE INDEX IF NOT EXISTS {} ON {} (content_hash)").format(
+                sql.Identifier(f"{table}_content_hash_key"), identifier
+            )
+        )
+        logger.info(
+            f"Hashed {len(hashes)} {table} rows, merged {len(duplicates)} duplicates"
+        )
+
+
+NUMERIC_NUTRIENTS = (
+    "fat",
+    "saturates",
+    "carbohydrate",
+    "sugars",
+    "fibre",
+    "protein",
+    "salt",
+)
+
+
+def _numeric_nutrients(cur):
+    """Convert VARCHAR nutrient columns to NUMERIC.
+
+    Each value is cast from its first number, the same pattern ProductFactory
+    extracts; values without a number become NULL. The range indexes on them
+    are part of the index catalog.
+    """
+    cur.execute(
+        """
+        SELECT column_name FROM information_schema.columns
+        WHERE table_name = 'nutrients' AND data_type = 'character varying'
+        """
+    )
+    text_columns = {row["column_name"] for row in cur.fetchall()}
+    alterations = [
+        sql.SQL(
+            "ALTER COLUMN {column} TYPE NUMERIC USING "
+            "substring({column} from '[0-9]+(?:\\.[0-9]+)?')::numeric"
+        ).format(column=sql.Identifier(column))
+        for column in NUMERIC_NUTRIENTS
+        if column in text_columns
+    ]
+    if alterations:
+        # One ALTER TABLE, so the table and its indexes are rewritten once
+        cur.execute(
+            sql.SQL("ALTER TABLE nutrients {}").format(sql.SQL(", ").join(alterations))
+        )
+    logger.info(f"Converted {len(alterations)} nutrient columns to NUMERIC")
+
+
+def _product_current(cur):
+    """Create product_current and fill it with the newest snapshot per product."""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS product_current (
+            migros_id VARCHAR(30) PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            brand VARCHAR(255),
+            title VARCHAR(255),
+            origin VARCHAR(255),
+            description TEXT,
+            ingredients TEXT,
+            nutrient_id INT,
+            offer_id INT,
+            gtins TEXT,
+            scraped_at TIMESTAMP NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        INSERT INTO product_current
+        SELECT DISTINCT ON (migros_id)
+            migros_id, name, brand, title, origin, description, ingredients,
+            nutrient_id, offer_id, gtins, scraped_at
+        FROM product
+        ORDER BY migros_id, scraped_at DESC
+        ON CONFLICT (migros_id) DO NOTHING
+        """
+    )
+    logger.info(f"Filled product_current with {cur.rowcount} products")
+
+
+def _nutrition_from_row(row: Dict) -> Nutrition:
+    row["kJ"] = row.pop("kj")
+    return Nutrition(**row)
+
+
+# Applied in order to existing databases; every step must be idempotent, since
+# fresh databases are created with the latest schema and then migrated too.
+MIGRATIONS: List[Tuple[str, Callable]] = [
+    ("001_content_hash", _add_content_hashes),
+    ("002_numeric_nutrients", _numeric_nutrients),
+    ("003_product_current", _product_current),
+]
+
+
+def apply_migrations(db_manager: PostgreSQLManager, dbname: str) -> List[str]:
+    """Apply pending migrations, each in its own transaction."""
+    applied_now = []
+    with db_manager.connect(dbname) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    name VARCHAR(100) PRIMARY KEY,
+                    applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+                )
+                """
+            )
+            cur.execute("SELECT name FROM schema_migrations")
+            applied = {row["name"] for row in cur.fetchall()}
+        conn.commit()
+
+        for name, migrate in MIGRATIONS:
+            if name in applied:
+                continue
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    migrate(cur)
+                    cur.execute(
+                        "INSERT INTO schema_migrations (name) VALUES (%s)", (name,)
+                    )
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Migration {name} failed: {e}")
+                raise
+            logger.info(f"Applied migration {name}")
+            applied_now.append(name)
+    conn.close()
+    return applied_now
@@ -0,0 +1,146 @@
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from setup.database_config import DatabaseConfig
+from setup.mongodb_manager import MongoDBManager
+
+config = DatabaseConfig()
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Stored once per bucket; everything else changes between scrapes
+STATIC_FIELDS = (
+    "name",
+    "brand",
+    "title",
+    "description",
+    "origin",
+    "ingredients",
+    "gtins",
+    "categories",
+)
+DELTA_FIELDS = ("scraped_at", "offer", "nutrition")
+
+
+def snapshot_delta(document: Dict) -> Dict:
+    """The per-scrape part of a product document."""
+    return {field: document[field] for field in DELTA_FIELDS if field in document}
+
+
+def bucket_updates(documents: List[Dict], bucket_size: int) -> List[UpdateOne]:
+    """Updates appending snapshots to the open bucket of each product.
+
+    Every product has at most one open bucket, its newest. A product's
+    snapshots are chunked in time order, and each chunk comes as a pair of
+    updates: the first closes the open bucket if the chunk does not fit, the
+    second pushes the chunk to the open bucket with $each, kept time ordered
+    with $sort, or upserts a new open bucket. Static fields are set from the
+    newest snapshot on every append, so a renamed or recategorised product
+    does not keep its old values in the open bucket.
+    """
+    by_product: Dict[str, List[Dict]] = defaultdict(list)
+    for document in documents:
+        by_product[document["migrosId"]].append(document)
+
+    requests = []
+    for migros_id in sorted(by_product):
+        snapshots = sorted(
+            by_product[migros_id], key=lambda document: document["scraped_at"]
+        )
+        for i in range(0, len(snapshots), bucket_size):
+            chunk = snapshots[i : i + bucket_size]
+            deltas = [snapshot_delta(document) for document in chunk]
+            times = [delta["scraped_at"] for delta in deltas]
+            static = {
+                field: chunk[-1][field] for field in STATIC_FIELDS if field in chunk[-1]
+            }
+            open_bucket = {"migrosId": migros_id, "open": True}
+            requests.append(
+                UpdateOne(
+                    {
+                        **open_bucket,
+                        "snapshot_count": {"$gt": bucket_size - len(chunk)},
+                    },
+                    {"$set": {"open": False}},
+                )
+            )
+            requests.append(
+                UpdateOne(
+                    open_bucket,
+                    {
+                        "$push": {
+                            "snapshots": {"$each": deltas, "$sort": {"scraped_at": 1}}
+                        },
+                        "$inc": {"snapshot_count": len(chunk)},
+                        "$min": {"first_scraped_at": min(times)},
+                        "$max": {"last_scraped_at": max(times)},
+                        "$set": static,
+                    },
+                    upsert=True,
+                )
+            )
+    return requests
+
+
+def append_to_buckets(
+    db_manager: MongoDBManager,
+    collection: str,
+    documents: List[Dict],
+    bucket_size: int = config.MONGO_HISTORY_BUCKET_SIZE,
+) -> int:
+    """Append product snapshots to their history buckets; returns the buckets written.
+
+    The updates run in order, as each close must precede its append.
+    Callers must append from a single writer, with each product's snapshots
+    in time order across calls: a snapshot older than its product's open
+    bucket would be pushed into it after the bucket that covers its time has
+    closed, so bucket time ranges would overlap. The close/append pair is
+    not atomic either; under concurrent writers the unique open_bucket index
+    rejects a second open bucket instead of silently splitting the history.
+    """
+    requests = bucket_updates(documents, bucket_size)
+    if not requests:
+        return 0
+    try:
+        db_manager.db[collection].bulk_write(requests, ordered=True)
+        return len(requests) // 2
+    except BulkWriteError as e:
+        logger.error(f"History bucket write error in {collection}: {e}")
+        # Updates before the first failed one were applied; appends sit at odd indexes
+        errors = e.details.get("writeErrors")
+        return errors[0]["index"] // 2 if errors else len(requests) // 2
+
+
+class BucketHistory:
+    """Reads product history and current state from the bucket layout."""
+
+    def __init__(self, db, collection: str = config.MONGO_HISTORY_COLLECTION):
+        self.collection = db[collection]
+
+    def history(self, migros_id: str) -> List[Dict]:
+        """All snapshots of a product, oldest first."""
+        buckets = self.collection.find(
+            {"migrosId": migros_id}, {"snapshots": 1, "_id": 0}
+        ).sort("last_scraped_at", 1)
+        snapshots = [s for bucket in buckets for s in bucket["snapshots"]]
+        snapshots.sort(key=lambda snapshot: snapshot["scraped_at"])
+        return snapshots
+
+    def current(self, migros_id: str) -> Optional[Dict]:
+        """The newest snapshot merged with the static fields of its bucket."""
+        bucket = self.collection.find_one(
+            {"migrosId": migros_id},
+            {"snapshots": {"$slice": -1}},
+            sort=[("last_scraped_at", -1)],
+        )
+        if bucket is None or not bucket.get("snapshots"):
+            return None
+        snapshot = bucket.pop("snapshots")[-1]
+        return {**bucket, **snapshot}
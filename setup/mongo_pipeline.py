@@ -0,0 +1,280 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from setup.category_cache import CategoryCache
+from setup.database_config import DatabaseConfig
+from setup.dataloader import DataLoader
+from setup.load_manifest import snapshot_file_name
+from setup.mongo_history import append_to_buckets
+from setup.mongodb_manager import MongoDBManager
+
+config = DatabaseConfig()
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class StageStats:
+    """Thread-safe document and timing counters for one pipeline stage.
+
+    busy is the time spent working, waiting the time spent blocked on a
+    queue: a stage that mostly waits is not the bottleneck.
+    """
+
+    def __init__(self, name: str, threads: int):
+        self.name = name
+        self.threads = threads
+        self.documents = 0
+        self.failed = 0
+        self.busy = 0.0
+        self.waiting = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, documents: int = 0, failed: int = 0, busy=0.0, waiting=0.0):
+        with self._lock:
+            self.documents += documents
+            self.failed += failed
+            self.busy += busy
+            self.waiting += waiting
+
+    def log(self, elapsed: float):
+        """Log the stage throughput over wall-clock time and per busy thread."""
+        rate = self.documents / elapsed if elapsed else 0.0
+        per_thread = self.documents / self.busy if self.busy else 0.0
+        logger.info(
+            f"{self.name} stage ({self.threads} threads): {self.documents} docs, "
+            f"{self.failed} failed, {rate:.0f} docs/s overall, "
+            f"{per_thread:.0f} docs/s per busy thread, "
+            f"busy {self.busy:.2f}s, blocked on queues {self.waiting:.2f}s"
+        )
+
+
+class MongoIngestPipeline:
+    """Producer/consumer MongoDB product loader.
+
+    The calling thread reads raw documents into a bounded queue, transform
+    threads turn them into product documents and feed a second bounded queue,
+    and insert threads drain it with unordered insert_many. Transformation
+    and inserts therefore overlap instead of alternating, and the bounded
+    queues keep memory flat when one side is slower. The transform is
+    CPU-bound Python and holds the GIL, so extra transform threads do not
+    transform in parallel; they only overlap it with reads and inserts.
+
+    With an upsert_key the insert threads upsert on those fields instead
+    (see upsert_batch). With a current_collection, the newest snapshot per
+    product is also kept there (see upsert_latest), and with a
+    history_collection every snapshot is also appended to the bucket layout
+    by a single history thread, in the order the batches were read (see
+    mongo_history); batches inserted out of order wait for their
+    predecessors there.
+    """
+
+    def __init__(
+        self,
+        db_manager: MongoDBManager,
+        categories: CategoryCache,
+        transform: Callable[[Dict, CategoryCache], Dict],
+        batch_size: int = config.BATCH_SIZE,
+        queue_size: int = config.MONGO_QUEUE_SIZE,
+        transform_threads: int = config.MONGO_TRANSFORM_THREADS,
+        insert_workers: int = config.MONGO_INSERT_WORKERS,
+        upsert_key: Optional[Sequence[str]] = None,
+        on_inserted: Optional[Callable[[List[str]], None]] = None,
+        current_collection: Optional[str] = None,
+        history_collection: Optional[str] = None,
+    ):
+        self.db_manager = db_manager
+        self.categories = categories
+        self.transform = transform
+        self.batch_size = batch_size
+        self.transform_threads = max(transform_threads, 1)
+        self.insert_workers = max(insert_workers, 1)
+        self.upsert_key = upsert_key
+        self.on_inserted = on_inserted
+        self.current_collection = current_collection
+        self.history_collection = history_collection
+        self.raw_batches = queue.Queue(queue_size)
+        self.product_batches = queue.Queue(queue_size)
+        self.history_batches = queue.Queue(queue_size)
+        self.transform_stats = StageStats("Transform", self.transform_threads)
+        self.insert_stats = StageStats("Insert", self.insert_workers)
+        self.history_stats = StageStats("History", 1)
+        self.errors = []
+
+    def run(self, documents: Iterable[Dict], collection: str) -> Dict[str, int]:
+        """Load all documents into the collection; returns the overall counts."""
+        start = time.perf_counter()
+        transformers = [
+            threading.Thread(target=self._transform_loop, daemon=True)
+            for _ in range(self.transform_threads)
+        ]
+        inserters = [
+            threading.Thread(target=self._insert_loop, args=(collection,), daemon=True)
+            for _ in range(self.insert_workers)
+        ]
+        historian = None
+        if self.history_collection:
+            historian = threading.Thread(target=self._history_loop, daemon=True)
+            historian.start()
+        for thread in transformers + inserters:
+            thread.start()
+
+        read = 0
+        try:
+            # Batches are numbered, so the history keeps the read order
+            batches = DataLoader.batched(documents, self.batch_size)
+            for sequence, batch in enumerate(batches):
+                read += len(batch)
+                self.raw_batches.put((sequence, batch))
+        finally:
+            for _ in transformers:
+                self.raw_batches.put(_END)
+            for thread in transformers:
+                thread.join()
+            for _ in inserters:
+                self.product_batches.put(_END)
+            for thread in inserters:
+                thread.join()
+            if historian:
+                self.history_batches.put(_END)
+                historian.join()
+
+        elapsed = time.perf_counter() - start
+        self.transform_stats.log(elapsed)
+        self.insert_stats.log(elapsed)
+        if historian:
+            self.history_stats.log(elapsed)
+        logger.info(
+            f"Pipelined load of {read} documents took {elapsed:.2f}s "
+            f"({self.insert_stats.documents / elapsed:.0f} docs/s end to end)"
+        )
+        if self.errors:
+            raise RuntimeError(f"Pipeline stage failed: {self.errors[0]}") from (
+                self.errors[0]
+            )
+        return {
+            "read": read,
+            "inserted": self.insert_stats.documents,
+            "failed": self.transform_stats.failed + self.insert_stats.failed,
+        }
+
+    def _transform_loop(self):
+        while True:
+            wait_start = time.perf_counter()
+            item = self.raw_batches.get()
+            waited = time.perf_counter() - wait_start
+            if item is _END:
+                self.transform_stats.add(waiting=waited)
+                return
+
+            sequence, batch = item
+
+            work_start = time.perf_counter()
+            products, files, failed = [], [], 0
+            for document in batch:
+                try:
+                    products.append(self.transform(document, self.categories))
+                    files.append(snapshot_file_name(document))
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Failed to process product: {e}")
+            busy = time.perf_counter() - work_start
+
+            # Passed on even when empty, so the history sees every sequence number
+            put_start = time.perf_counter()
+            self.product_batches.put((sequence, products, files))
+            waited += time.perf_counter() - put_start
+            self.transform_stats.add(len(products), failed, busy, waited)
+
+    def _insert_loop(self, collection: str):
+        while True:
+            wait_start = time.perf_counter()
+            item = self.product_batches.get()
+            waited = time.perf_counter() - wait_start
+            if item is _END:
+                self.insert_stats.add(waiting=waited)
+                return
+
+            sequence, products, files = item
+            work_start = time.perf_counter()
+            to_history = []
+            try:
+                if not products:
+                    inserted = 0
+                elif self.upsert_key:
+                    inserted = self.db_manager.upsert_batch(
+                        collection, products, self.upsert_key, self.batch_size
+                    )
+                else:
+                    inserted = self.db_manager.insert_batch(
+                        collection, products, self.batch_size
+                    )
+                if self.current_collection and products:
+                    self.db_manager.upsert_latest(
+                        self.current_collection,
+                        products,
+                        "migrosId",
+                        "scraped_at",
+                        self.batch_size,
+                    )
+                to_history = products
+                # Only report fully inserted batches, so partial failures are retried
+                if inserted < len(products):
+                    files = []
+                if self.on_inserted and files and not self.history_collection:
+                    self.on_inserted(files)
+            except Exception as e:
+                # Keep draining so the transform threads never block on a dead sink
+                inserted = 0
+                files = []
+                self.errors.append(e)
+                logger.error(f"Insert batch failed: {e}")
+            busy = time.perf_counter() - work_start
+            self.insert_stats.add(inserted, len(products) - inserted, busy, waited)
+            if self.history_collection:
+                self.history_batches.put((sequence, to_history, files))
+
+    def _history_loop(self):
+        """Append batches to the bucket history strictly in sequence order.
+
+        Batches that arrive early are held until every earlier one has been
+        appended; their files are reported to on_inserted only afterwards.
+        """
+        waiting_for = 0
+        held = {}
+        while True:
+            wait_start = time.perf_counter()
+            item = self.history_batches.get()
+            waited = time.perf_counter() - wait_start
+            if item is _END:
+                self.history_stats.add(waiting=waited)
+                return
+
+            sequence, products, files = item
+            held[sequence] = (products, files)
+            work_start = time.perf_counter()
+            appended = failed = 0
+            while waiting_for in held:
+                products, files = held.pop(waiting_for)
+                waiting_for += 1
+                try:
+                    if products:
+                        append_to_buckets(
+                            self.db_manager, self.history_collection, products
+                        )
+                    appended += len(products)
+                    if self.on_inserted and files:
+                        self.on_inserted(files)
+                except Exception as e:
+                    failed += len(products)
+                    self.errors.append(e)
+                    logger.error(f"History append failed: {e}")
+            busy = time.perf_counter() - work_start
+            self.history_stats.add(appended, failed, busy, waited)
@@ -2,15 +2,17 @@ import json
 import logging
 import os
 import re
+import time
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
-from pymongo import MongoClient
+from pymongo import IndexModel, MongoClient, ReplaceOne, UpdateOne
 from pymongo.errors import BulkWriteError, ConnectionFailure
 
 from setup.database_config import DatabaseConfig
 from setup.dataloader import DataLoader
+from setup.index_catalog import MONGO_INDEXES
 
 config = DatabaseConfig()
 
@@ -29,10 +31,17 @@ class MongoDBManager:
         self.client = None
         self.db = None
 
-    def connect(self):
-        """Establish connection to MongoDB."""
+    def connect(self, max_pool_size: int = None):
+        """Establish connection to MongoDB.
+
+        The client keeps a pool of up to max_pool_size connections (the
+        driver default if None), shared by every thread using it.
+        """
         try:
-            self.client = MongoClient(self.uri, serverSelectionTimeoutMS=5000)
+            options = {"maxPoolSize": max_pool_size} if max_pool_size else {}
+            self.client = MongoClient(
+                self.uri, serverSelectionTimeoutMS=5000, **options
+            )
             self.client.admin.command("ismaster")
             self.db = self.client[self.db_name]
             logger.info(f"Connected to MongoDB: {self.db_name}")
@@ -52,6 +61,74 @@ class MongoDBManager:
             result = self.db[collection].delete_many({})
             logger.info(f"Cleared {result.deleted_count} documents from {collection}")
 
+    def drop_indexes(self, collection: str, names: Optional[List[str]] = None):
+        """Drop secondary indexes, so a bulk load does not maintain them.
+
+        Without names every index except _id is dropped; otherwise only the
+        named indexes that exist.
+        """
+        if collection not in self.db.list_collection_names():
+            return
+        if names is None:
+            self.db[collection].drop_indexes()
+            logger.info(f"Dropped indexes on {collection}")
+            return
+        existing = self.db[collection].index_information()
+        for name in names:
+            if name in existing:
+                self.db[collection].drop_index(name)
+                logger.info(f"Dropped index {name} on {collection}")
+
+    def create_indexes(self, collection: str, indexes: List[IndexModel]) -> float:
+        """Build secondary indexes after a load; returns the elapsed seconds.
+
+        Existing indexes with the same specification are left as they are.
+        """
+        start = time.perf_counter()
+        for name in self.db[collection].create_indexes(indexes):
+            logger.info(f"Created index {name} on {collection}")
+        elapsed = time.perf_counter() - start
+        logger.info(f"Built {len(indexes)} indexes on {collection} in {elapsed:.2f}s")
+        return elapsed
+
+    def create_index_catalog(
+        self, catalog: Dict[str, List[IndexModel]] = None
+    ) -> float:
+        """Build every index of a catalog (MONGO_INDEXES by default)."""
+        catalog = MONGO_INDEXES if catalog is None else catalog
+        return sum(
+            self.create_indexes(collection, indexes)
+            for collection, indexes in catalog.items()
+        )
+
+    def drop_index_catalog(self, catalog: Dict[str, List[IndexModel]] = None):
+        """Drop the secondary indexes of a catalog, keeping the unique keys."""
+        catalog = MONGO_INDEXES if catalog is None else catalog
+        for collection, indexes in catalog.items():
+            self.drop_indexes(
+                collection,
+                [
+                    index.document["name"]
+                    for index in indexes
+                    if not index.document.get("unique")
+                ],
+            )
+
+    def collection_stats(self, collection: str) -> Dict[str, int]:
+        """Return document count, data, storage and index bytes of a collection.
+
+        storage_bytes is the compressed size on disk, data_bytes the
+        uncompressed size of the documents.
+        """
+        stats = self.db.command("collStats", collection)
+        return {
+            "documents": stats.get("count", 0),
+            "data_bytes": stats.get("size", 0),
+            "storage_bytes": stats.get("storageSize", 0),
+            "index_bytes": stats.get("totalIndexSize", 0),
+            "avg_document_bytes": stats.get("avgObjSize", 0),
+        }
+
     def insert_batch(
         self, collection: str, documents: List[Dict], batch_size: int = 1000
     ):
@@ -70,3 +147,111 @@ class MongoDBManager:
 
         logger.info(f"Total inserted into {collection}: {total_inserted}")
         return total_inserted
+
+    def upsert_batch(
+        self,
+        collection: str,
+        documents: List[Dict],
+        key_fields: Sequence[str],
+        batch_size: int = 1000,
+    ):
+        """Idempotently write documents with unordered ReplaceOne upserts.
+
+        Documents are matched on key_fields, which should be backed by a
+        unique index, so re-running a load over overlapping data replaces
+        instead of duplicating documents. Returns the number written.
+        """
+        total_written = 0
+        for i in range(0, len(documents), batch_size):
+            batch = documents[i : i + batch_size]
+            requests = [
+                ReplaceOne(
+                    {field: document.get(field) for field in key_fields},
+                    {k: v for k, v in document.items() if k != "_id"},
+                    upsert=True,
+                )
+                for document in batch
+            ]
+            try:
+                result = self.db[collection].bulk_write(requests, ordered=False)
+                written = result.upserted_count + result.matched_count
+                logger.info(
+                    f"Upserted batch {i//batch_size + 1}: {result.upserted_count} new, "
+                    f"{result.matched_count} replaced in {collection}"
+                )
+            except BulkWriteError as e:
+                written = e.details.get("nUpserted", 0) + e.details.get("nMatched", 0)
+                logger.error(f"Bulk upsert error in batch {i//batch_size + 1}: {e}")
+            total_written += written
+
+        logger.info(f"Total upserted into {collection}: {total_written}")
+        return total_written
+
+    def upsert_latest(
+        self,
+        collection: str,
+        documents: List[Dict],
+        key_field: str,
+        order_field: str,
+        batch_size: int = 1000,
+    ):
+        """Keep only the newest document per key_field, ordered by order_field.
+
+        Each document is written with a pipeline update whose $cond swaps it
+        in only if it is newer than the stored one, and $mergeObjects keeps
+        the stored _id. Batches may therefore arrive in any order, and
+        missing keys are upserted. key_field should have a unique index.
+        Returns the number of documents matched or inserted.
+        """
+        latest: Dict[Any, Dict] = {}
+        for document in documents:
+            key = document.get(key_field)
+            current = latest.get(key)
+            if current is None or document[order_field] > current[order_field]:
+                latest[key] = document
+
+        total_written = 0
+        documents = list(latest.values())
+        for i in range(0, len(documents), batch_size):
+            batch = documents[i : i + batch_size]
+            requests = []
+            for document in batch:
+                replacement = {k: v for k, v in document.items() if k != "_id"}
+                newer = {
+                    "$lt": [
+                        {"$ifNull": [f"${order_field}", None]},
+                        {"$literal": replacement[order_field]},
+                    ]
+                }
+                requests.append(
+                    UpdateOne(
+                        {key_field: replacement[key_field]},
+                        [
+                            {
+                                "$replaceWith": {
+                                    "$cond": [
+                                        newer,
+                                        {
+                                            "$mergeObjects": [
+                                                {"_id": "$_id"},
+                                                {"$literal": replacement},
+                                            ]
+                                        },
+                                        "$$ROOT",
+                                    ]
+                                }
+                            }
+                        ],
+                        upsert=True,
+                    )
+                )
+            try:
+                result = self.db[collection].bulk_write(requests, ordered=False)
+                written = result.upserted_count + result.matched_count
+            except BulkWriteError as e:
+                written = e.details.get("nUpserted", 0) + e.details.get("nMatched", 0)
+                logger.error(f"Latest-document upsert error in {collection}: {e}")
+            total_written += written
+
+        logger.info(f"Refreshed {total_written} documents in {collection}")
+        return total_written
@@ -1,12 +1,16 @@
 import logging
 import os
+import time
+from typing import Sequence
 
 import psycopg2
 from psycopg2 import sql
 from psycopg2.extensions import connection
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 
 from setup.database_config import DatabaseConfig
+from setup.index_catalog import POSTGRES_INDEXES, PostgresIndex
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -38,6 +42,27 @@ class PostgreSQLManager:
             self.logger.error(f"Database connection failed: {e}")
             raise
 
+    def create_pool(
+        self, dbname: str = None, minconn: int = 1, maxconn: int = None
+    ) -> ThreadedConnectionPool:
+        """Open a thread-safe pool of connections to the database.
+
+        The caller owns the pool and must closeall() it when done.
+        """
+        db_name = dbname or self.config.PG_DB_NAME
+        maxconn = maxconn or self.config.PG_POOL_SIZE
+        try:
+            pool = ThreadedConnectionPool(
+                minconn, max(minconn, maxconn), dbname=db_name, **self.connection_params
+            )
+            self.logger.info(
+                f"Opened PostgreSQL pool of up to {maxconn} connections: {db_name}"
+            )
+            return pool
+        except psycopg2.DatabaseError as e:
+            self.logger.error(f"Database connection failed: {e}")
+            raise
+
     def database_exists(self, dbname: str) -> bool:
         """Check if database exists."""
         try:
@@ -90,6 +115,73 @@ class PostgreSQLManager:
             self.logger.error(f"Error creating database: {e}")
             raise
 
+    def relation_sizes(self, dbname: str = None) -> dict:
+        """Return table, index and total bytes of every table in the public schema."""
+        with self.connect(dbname) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(
+                    """
+                    SELECT c.relname AS table_name,
+                           pg_table_size(c.oid) AS table_bytes,
+                           pg_indexes_size(c.oid) AS index_bytes,
+                           pg_total_relation_size(c.oid) AS total_bytes
+                    FROM pg_class c
+                    JOIN pg_namespace n ON n.oid = c.relnamespace
+                    WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p')
+                    ORDER BY c.relname
+                """
+                )
+                sizes = {row.pop("table_name"): dict(row) for row in cur.fetchall()}
+        conn.close()
+        return sizes
+
+    def create_indexes(
+        self, indexes: Sequence[PostgresIndex] = None, dbname: str = None
+    ) -> float:
+        """Build secondary indexes (the catalog by default); returns elapsed seconds.
+
+        Existing indexes are kept. Indexes whose extension is not installed on
+        the server are skipped with a warning instead of failing the load.
+        """
+        indexes = POSTGRES_INDEXES if indexes is None else indexes
+        start = time.perf_counter()
+        with self.connect(dbname) as conn:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("SELECT name FROM pg_available_extensions")
+                available = {row[0] for row in cur.fetchall()}
+                for extension in {i.extension for i in indexes if i.extension}:
+                    if extension in available:
+                        cur.execute(
+                            sql.SQL("CREATE EXTENSION IF NOT EXISTS {}").format(
+                                sql.Identifier(extension)
+                            )
+                        )
+                for index in indexes:
+                    if index.extension and index.extension not in available:
+                        self.logger.warning(
+                            f"Skipping index {index.name}: extension "
+                            f"{index.extension} is not available"
+                        )
+                        continue
+                    cur.execute(index.create_statement())
+                    self.logger.info(f"Created index {index.name} on {index.table}")
+        conn.close()
+        elapsed = time.perf_counter() - start
+        self.logger.info(f"Built {len(indexes)} indexes in {elapsed:.2f}s")
+        return elapsed
+
+    def drop_indexes(self, indexes: Sequence[PostgresIndex] = None, dbname: str = None):
+        """Drop secondary indexes (the catalog by default), if they exist."""
+        indexes = POSTGRES_INDEXES if indexes is None else indexes
+        with self.connect(dbname) as conn:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                for index in indexes:
+                    cur.execute(index.drop_statement())
+        conn.close()
+        self.logger.info(f"Dropped {len(indexes)} indexes")
+
     def execute_script(self, dbname: str, script_path: str):
         """Execute SQL script on specified database."""
         try:
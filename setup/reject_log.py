@@ -0,0 +1,55 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class RejectLog:
+    """Append-only JSON lines file quarantining snapshots that could not be loaded.
+
+    Each line records the snapshot file name, the stage that rejected it and
+    the error, so the offending files can be fixed and reloaded on their own.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def reject(self, file_name: str, stage: str, reason, **details):
+        """Append one rejected snapshot with the reason it failed."""
+        record = {
+            "file_name": file_name,
+            "stage": stage,
+            "reason": str(reason).strip(),
+            "rejected_at": datetime.now().isoformat(timespec="seconds"),
+            **details,
+        }
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            self.count += 1
+
+    def read(self) -> List[Dict]:
+        """Return all rejects recorded in the file so far."""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def report(self, context: str):
+        """Log how many snapshots were quarantined during this run."""
+        if self.count:
+            logger.warning(
+                f"{context}: {self.count} snapshots rejected, see {self.path}"
+            )
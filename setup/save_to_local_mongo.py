@@ -9,9 +9,18 @@ from typing import Any, Dict, List, Optional
 from pymongo import MongoClient
 from pymongo.errors import BulkWriteError, ConnectionFailure
 
+from setup.category_cache import CategoryCache
 from setup.database_config import DatabaseConfig
 from setup.dataloader import DataLoader
+from setup.index_catalog import MONGO_INDEXES
+from setup.load_manifest import (
+    MongoLoadManifest,
+    fingerprint_index,
+    pending_snapshots,
+)
+from setup.mongo_pipeline import MongoIngestPipeline
 from setup.mongodb_manager import MongoDBManager
+from setup.snapshot_index import SnapshotIndex
 
 config = DatabaseConfig()
 
@@ -20,6 +29,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# A product snapshot is identified by its product and scrape time, like the
+# PostgreSQL primary key; sync loads upsert on it.
+PRODUCT_KEY = ("migrosId", "scraped_at")
+
 
 class NutritionProcessor:
     """Handles nutrition data processing."""
@@ -150,7 +163,7 @@ class ProductProcessor:
     """Handles product document processing."""
 
     @staticmethod
-    def process_product(product_json: Dict, categories_lookup: Dict) -> Dict:
+    def process_product(product_json: Dict, category_cache: CategoryCache) -> Dict:
         """Process raw product JSON into MongoDB document."""
         try:
             mongo_doc = {
@@ -184,7 +197,7 @@ class ProductProcessor:
                 mongo_doc["offer"] = offer
 
             categories = ProductProcessor._process_categories(
-                product_json.get("breadcrumb", []), categories_lookup
+                product_json.get("breadcrumb", []), category_cache
             )
             mongo_doc["categories"] = categories
 
@@ -229,7 +242,7 @@ class ProductProcessor:
 
     @staticmethod
     def _process_categories(
-        breadcrumb: List[Dict], categories_lookup: Dict
+        breadcrumb: List[Dict], category_cache: CategoryCache
     ) -> List[Dict]:
         """Process category information from breadcrumb."""
         categories = []
@@ -241,9 +254,8 @@ class ProductProcessor:
             cat_slug = item.get("slugs", [])[-1] if item.get("slugs") else None
 
             if cat_id and cat_id not in seen_ids:
-                if cat_slug in categories_lookup:
-                    category_data = categories_lookup[cat_slug].copy()
-                else:
+                category_data = category_cache.mongo_category(cat_id, cat_slug)
+                if category_data is None:
                     category_data = {"id": cat_id, "name": cat_name, "slug": cat_slug}
 
                 categories.append(category_data)
@@ -256,90 +268,135 @@ class CategoryProcessor:
     """Handles category processing."""
 
     @staticmethod
-    def create_categories_lookup(category_documents: List[Dict]) -> Dict[str, Dict]:
-        """Create lookup dictionary for categories by slug."""
-        lookup = {}
-        for cat in category_documents:
-            slug = cat.get("slug")
-            if slug:
-                lookup[slug] = {
-                    "id": cat.get("id"),
-                    "name": cat.get("name"),
-                    "slug": slug,
-                }
-        return lookup
+    def create_categories_lookup(category_documents: List[Dict]) -> CategoryCache:
+        """Create the shared in-memory category lookup (by ID and slug)."""
+        return CategoryCache(category_documents)
+
+
+def insert_categories(
+    db_manager: MongoDBManager, category_documents: List[Dict]
+) -> CategoryCache:
+    """Insert category documents and return the category lookup for products."""
+    if not category_documents:
+        logger.warning(
+            "No categories loaded - products will have limited category data"
+        )
+        return CategoryCache([])
+
+    db_manager.insert_batch(
+        config.MONGO_CATEGORY_COLLECTION, category_documents, config.BATCH_SIZE
+    )
+    return CategoryProcessor.create_categories_lookup(category_documents)
 
 
 def create_mongo_db(
     limit_products: Optional[int] = None,
     limit_categories: Optional[int] = None,
     force_recreate: bool = True,
+    snapshot_index: Optional[SnapshotIndex] = None,
+    incremental: bool = False,
+    sync: bool = False,
+    bucket_history: bool = config.MONGO_BUCKET_HISTORY,
 ):
-    """Main function to load data into MongoDB."""
+    """Main function to load data into MongoDB.
+
+    Every load records the files it ingested in the load manifest collection
+    (a fresh load rebuilds it); with incremental=True the product collection
+    is kept and only snapshots missing from the manifest are ingested. With
+    sync=True the collection is kept too, and every snapshot is upserted on
+    (migrosId, scraped_at), so overlapping data is replaced, not duplicated.
+
+    Documents are transformed and inserted concurrently by
+    MongoIngestPipeline, which also keeps the newest snapshot per product in
+    the current collection. With bucket_history=True snapshots are also
+    appended to the bucket layout history collection (not in sync mode, as
+    appends are not idempotent). Product indexes are (re)built once after the
+    load instead of on every insert.
+    """
     db_manager = MongoDBManager(config.MONGO_DB_URI, config.MONGO_DB_NAME)
 
     try:
         db_manager.connect()
 
-        db_manager.clear_collections(
-            [config.MONGO_PRODUCT_COLLECTION, config.MONGO_CATEGORY_COLLECTION]
-        )
+        if incremental or sync:
+            db_manager.clear_collections([config.MONGO_CATEGORY_COLLECTION])
+            # Existing documents stay, so the unique key must exist up front
+            db_manager.create_index_catalog()
+        else:
+            db_manager.clear_collections(
+                [
+                    config.MONGO_PRODUCT_COLLECTION,
+                    config.MONGO_CURRENT_COLLECTION,
+                    config.MONGO_HISTORY_COLLECTION,
+                    config.MONGO_CATEGORY_COLLECTION,
+                    config.MONGO_MANIFEST_COLLECTION,
+                ]
+            )
+            db_manager.drop_indexes(config.MONGO_PRODUCT_COLLECTION)
+            # Collections updated in place during the load keep their keys
+            for collection in (
+                config.MONGO_CURRENT_COLLECTION,
+                config.MONGO_HISTORY_COLLECTION,
+            ):
+                db_manager.create_indexes(collection, MONGO_INDEXES[collection])
 
         logger.info("Loading categories...")
         category_documents = DataLoader.load_documents_from_folder(
             config.CATEGORIES_PATH
         )
-        categories_lookup = {}
+        categories = insert_categories(db_manager, category_documents)
 
-        if category_documents:
-            db_manager.insert_batch(
-                config.MONGO_CATEGORY_COLLECTION, category_documents, config.BATCH_SIZE
-            )
-            categories_lookup = CategoryProcessor.create_categories_lookup(
-                category_documents
+        logger.info("Loading and processing products...")
+        # The manifest fingerprints files on disk, so incremental runs read
+        # the folder even if a packed archive exists.
+        if snapshot_index is None:
+            snapshot_index = DataLoader.snapshot_index(
+                config.PRODUCTS_PATH, use_archive=not incremental
             )
-        else:
-            logger.warning(
-                "No categories loaded - products will have limited category data"
+        snapshot_index = snapshot_index.head(limit_products)
+
+        manifest = MongoLoadManifest(db_manager.db, config.MONGO_MANIFEST_COLLECTION)
+        # Every load records its files (a fresh load rebuilds the cleared
+        # manifest), so a later incremental run skips them
+        fingerprints = fingerprint_index(snapshot_index)
+        if incremental:
+            snapshot_index = pending_snapshots(
+                snapshot_index, fingerprints, manifest.fetch()
             )
 
-        logger.info("Loading and processing products...")
-        product_documents_raw = DataLoader.load_documents_from_folder(
-            config.PRODUCTS_PATH, limit=limit_products
+        product_documents_raw = DataLoader.iter_documents_from_index(
+            snapshot_index,
+            workers=config.LOADER_WORKERS,
+            chunk_size=config.LOADER_CHUNK_SIZE,
+            use_archive=not incremental,
         )
 
-        if not product_documents_raw:
-            logger.warning("No products to process")
-            return
+        pipeline = MongoIngestPipeline(
+            db_manager,
+            categories,
+            ProductProcessor.process_product,
+            upsert_key=PRODUCT_KEY if sync else None,
+            current_collection=config.MONGO_CURRENT_COLLECTION,
+            # Buckets are append-only, so re-synced snapshots would be duplicated
+            history_collection=(
+                config.MONGO_HISTORY_COLLECTION if bucket_history and not sync else None
+            ),
+            on_inserted=(
+                (lambda files: manifest.record(files, fingerprints))
+                if fingerprints
+                else None
+            ),
+        )
+        counts = pipeline.run(product_documents_raw, config.MONGO_PRODUCT_COLLECTION)
 
-        processed_products = []
-        failed_count = 0
+        db_manager.create_index_catalog()
 
-        for i, product_doc in enumerate(product_documents_raw):
-            try:
-                processed_doc = ProductProcessor.process_product(
-                    product_doc, categories_lookup
-                )
-                processed_products.append(processed_doc)
-
-                if len(processed_products) >= config.BATCH_SIZE:
-                    db_manager.insert_batch(
-                        config.MONGO_PRODUCT_COLLECTION,
-                        processed_products,
-                        config.BATCH_SIZE,
-                    )
-                    processed_products = []
-
-            except Exception as e:
-                failed_count += 1
-                logger.error(f"Failed to process product {i+1}: {e}")
-
-        if processed_products:
-            db_manager.insert_batch(
-                config.MONGO_PRODUCT_COLLECTION, processed_products, config.BATCH_SIZE
-            )
+        if counts["read"] == 0:
+            logger.warning("No products to process")
+            return
 
-        logger.info(f"Processing complete. Failed products: {failed_count}")
+        categories.report_missing("MongoDB product categories")
+        logger.info(f"Processing complete. Failed products: {counts['failed']}")
 
     except Exception as e:
         logger.error(f"Database operation failed: {e}")
@@ -3,150 +3,460 @@ import json
 import logging
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
 import psycopg2
 from psycopg2 import sql
 from psycopg2.extensions import connection, cursor
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 
+from models.product import Product
 from models.product_factory import ProductFactory
+from setup.bulk_copy import copy_rows, to_int
+from setup.category_cache import CategoryCache
+from setup.content_hash_cache import ContentHashCache
 from setup.database_config import DatabaseConfig
 from setup.dataloader import DataLoader
+from setup.deferred_schema import build_deferred_constraints, create_deferred_schema
+from setup.load_manifest import (
+    Fingerprint,
+    PostgresLoadManifest,
+    fingerprint_index,
+    pending_snapshots,
+    snapshot_file_name,
+)
+from setup.migrations import apply_migrations
 from setup.postgresql_manager import PostgreSQLManager
+from setup.reject_log import RejectLog
+from setup.snapshot_index import SnapshotIndex
+from setup.time_partitions import MonthlyPartitions, is_partitioned, list_partitions
 
 config = DatabaseConfig()
 logger = logging.getLogger(__name__)
 
+NUTRIENT_COLUMNS = (
+    "unit",
+    "quantity",
+    "kcal",
+    "kj",
+    "fat",
+    "saturates",
+    "carbohydrate",
+    "sugars",
+    "fibre",
+    "protein",
+    "salt",
+)
+OFFER_COLUMNS = (
+    "price",
+    "quantity",
+    "unit_price",
+    "promotion_price",
+    "promotion_unit_price",
+)
+PRODUCT_COLUMNS = (
+    "migros_id",
+    "name",
+    "brand",
+    "title",
+    "origin",
+    "description",
+    "ingredients",
+    "nutrient_id",
+    "offer_id",
+    "gtins",
+    "scraped_at",
+)
+
+
+@dataclass
+class PreparedProduct:
+    """A snapshot transformed for the SQL schema, ready to be stored."""
+
+    product: Product
+    category_ids: List[int]
+    file_name: str
+
 
 class ProductProcessor:
     """Handles product processing and database insertion."""
 
-    def __init__(self, db_manager: PostgreSQLManager, product_factory: ProductFactory):
+    def __init__(
+        self,
+        db_manager: PostgreSQLManager,
+        product_factory: ProductFactory,
+        category_cache: Optional[CategoryCache] = None,
+        reject_log: Optional[RejectLog] = None,
+        partitions: Optional[MonthlyPartitions] = None,
+    ):
         self.db_manager = db_manager
         self.product_factory = product_factory
+        self.category_cache = category_cache
+        self.reject_log = reject_log or RejectLog(config.REJECT_FILE)
+        # Offer and nutrient rows are shared by all products with equal content
+        self.content_cache = ContentHashCache()
+        # Set for the partitioned schema, whose monthly partitions are created on demand
+        self.partitions = partitions
 
     def process_products(
-        self, documents: List[Dict], dbname: str, batch_size: int = 100
+        self,
+        documents: Iterable[Dict],
+        dbname: str,
+        batch_size: int = 100,
+        fingerprints: Optional[Dict[str, Fingerprint]] = None,
+        bulk: bool = False,
     ):
-        """Process products in batches with proper transaction handling."""
-        if not documents:
-            logger.warning("No documents to process")
-            return 0, 0
+        """Process products in batches with proper transaction handling.
+
+        Accepts any iterable, so documents can be streamed straight from
+        DataLoader without holding the whole corpus in memory. When file
+        fingerprints are given, successfully stored snapshots are recorded
+        in the load manifest within the same transaction as their batch.
+        With bulk=True, batches are written with COPY instead of row inserts.
+        Documents that fail are quarantined in the reject file.
+        """
+        prepared = (self.prepare_product(document) for document in documents)
+        return self.store_products(prepared, dbname, batch_size, fingerprints, bulk)
+
+    def prepare_product(self, document: Dict) -> Optional[PreparedProduct]:
+        """Transform a raw product document; returns None if it cannot be built."""
+        try:
+            product_name = document.get("name", "Unknown")
+            date_added = document.get("dateAdded", "Unknown")
+
+            logger.debug(f"Processing: {product_name} (scraped: {date_added})")
+
+            product = self.product_factory.build_product_from_json(document)
+
+            category_ids = []
+            for breadcrumb in document.get("breadcrumb", []):
+                category_id = breadcrumb.get("id")
+                if not category_id:
+                    logger.warning(f"Breadcrumb without ID in {product.name}")
+                    continue
+                category_ids.append(category_id)
+
+            return PreparedProduct(product, category_ids, snapshot_file_name(document))
+
+        except Exception as e:
+            logger.error(
+                f"Error processing product '{document.get('name', 'Unknown')}': {e}"
+            )
+            self.reject_log.reject(
+                snapshot_file_name(document),
+                "transform",
+                e,
+                migros_id=document.get("migrosId"),
+            )
+            return None
+
+    def store_products(
+        self,
+        prepared_products: Iterable[Optional[PreparedProduct]],
+        dbname: str,
+        batch_size: int = 100,
+        fingerprints: Optional[Dict[str, Fingerprint]] = None,
+        bulk: bool = False,
+    ):
+        """Store prepared products in batches, one transaction per batch.
 
+        None entries stand for documents that failed to transform and are
+        counted as failed. A batch that fails to commit is bisected until the
+        bad products are isolated, so only those are rejected.
+        """
         total_processed = 0
         total_failed = 0
+        start_time = time.perf_counter()
 
         try:
             with self.db_manager.connect(dbname) as conn:
                 conn.autocommit = False
-                for i in range(0, len(documents), batch_size):
-                    batch = documents[i : i + batch_size]
-                    processed, failed = self._process_product_batch(
-                        conn, batch, i, batch_size
+                if self.category_cache is None:
+                    self.category_cache = CategoryCache.from_postgres(conn)
+                for batch_num, batch in enumerate(
+                    DataLoader.batched(prepared_products, batch_size), start=1
+                ):
+                    prepared = [p for p in batch if p is not None]
+                    if self.partitions:
+                        self.partitions.ensure(p.product.scraped_at for p in prepared)
+                    processed, failed = self._store_batch_isolated(
+                        conn, prepared, batch_num, fingerprints, bulk
                     )
                     total_processed += processed
-                    total_failed += failed
+                    total_failed += failed + len(batch) - len(prepared)
 
         except Exception as e:
             logger.error(f"Critical error during product processing: {e}")
             raise
 
+        self.category_cache.report_missing("PostgreSQL product links")
+        self.reject_log.report("PostgreSQL product load")
+        lookups = self.content_cache.hits + self.content_cache.misses
+        if lookups:
+            logger.info(
+                f"Shared offer/nutrient rows: {len(self.content_cache)} distinct, "
+                f"{self.content_cache.hits / lookups:.0%} of lookups reused a row"
+            )
+
+        if total_processed == 0 and total_failed == 0:
+            logger.warning("No documents to process")
+            return 0, 0
+
+        elapsed = time.perf_counter() - start_time
         logger.info(
-            f"Processing complete - Success: {total_processed}, Failed: {total_failed}"
+            f"Processing complete - Success: {total_processed}, Failed: {total_failed} "
+            f"in {elapsed:.2f}s ({total_processed / elapsed:.0f} products/s)"
         )
         return total_processed, total_failed
 
-    def _process_product_batch(
-        self, conn, batch: List[Dict], batch_index: int, batch_size: int
+    def _store_batch_isolated(
+        self,
+        conn,
+        batch: List[PreparedProduct],
+        batch_num: int,
+        fingerprints: Optional[Dict[str, Fingerprint]] = None,
+        bulk: bool = False,
     ):
-        """Process a single batch of products."""
-        batch_num = batch_index // batch_size + 1
-        batch_processed = 0
-        batch_failed = 0
+        """Commit a batch, bisecting it on failure to isolate the bad products.
+
+        One failing statement aborts the whole transaction, so a failed batch
+        is rolled back and retried as two halves until the failure is narrowed
+        down to single products, which are written to the reject file. Good
+        products still commit in (large) batches.
+        """
+        if not batch:
+            return 0, 0
 
+        write = self._copy_product_batch if bulk else self._process_product_batch
         try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                for document in batch:
-                    success = self._process_single_product(document, cur)
-                    if success:
-                        batch_processed += 1
-                    else:
-                        batch_failed += 1
-
-                # Commit the entire batch
-                conn.commit()
+            write(conn, batch, fingerprints)
+            conn.commit()
+            self.content_cache.commit()
+            return len(batch), 0
 
         except Exception as e:
             conn.rollback()
-            logger.error(f"Batch {batch_num} failed, rolling back: {e}")
-            return 0, len(batch)
-
-        return batch_processed, batch_failed
-
-    def _process_single_product(self, document: Dict, cur) -> bool:
-        """Process a single product document."""
-        try:
-            product_name = document.get("name", "Unknown")
-            date_added = document.get("dateAdded", "Unknown")
-
-            logger.debug(f"Processing: {product_name} (scraped: {date_added})")
-
-            # Create product record
-            product = self.product_factory.create_product_from_json(document, cur)
+            self.content_cache.rollback()
+            if len(batch) == 1:
+                product = batch[0].product
+                logger.error(f"Rejecting product '{product.name}': {e}")
+                self.reject_log.reject(
+                    batch[0].file_name,
+                    "postgres",
+                    e,
+                    migros_id=product.migros_id,
+                    scraped_at=product.scraped_at,
+                )
+                return 0, 1
 
-            # Process category relationships
-            self._process_product_categories(document, product, cur)
+            logger.warning(
+                f"Batch {batch_num} failed ({len(batch)} products), bisecting: {e}"
+            )
+            middle = len(batch) // 2
+            left = self._store_batch_isolated(
+                conn, batch[:middle], batch_num, fingerprints, bulk
+            )
+            right = self._store_batch_isolated(
+                conn, batch[middle:], batch_num, fingerprints, bulk
+            )
+            return left[0] + right[0], left[1] + right[1]
 
-            return True
+    def _process_product_batch(
+        self,
+        conn,
+        batch: List[PreparedProduct],
+        fingerprints: Optional[Dict[str, Fingerprint]] = None,
+    ):
+        """Insert a batch row by row; raises on the first failing product.
+
+        Shared offer and nutrient rows are upserted first, in content_hash
+        order as on the COPY path, so parallel loaders cannot deadlock on them.
+        """
+        with conn.cursor() as cur:
+            self._assign_batch_shared_ids(cur, [p.product for p in batch])
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            for prepared in batch:
+                self._store_product(prepared, cur)
+            self._refresh_current(cur, [p.product for p in batch])
+
+            if fingerprints:
+                PostgresLoadManifest.record(
+                    cur, [p.file_name for p in batch], fingerprints
+                )
 
-        except Exception as e:
-            logger.error(
-                f"Error processing product '{document.get('name', 'Unknown')}': {e}"
+    def _copy_product_batch(
+        self,
+        conn,
+        batch: List[PreparedProduct],
+        fingerprints: Optional[Dict[str, Fingerprint]] = None,
+    ):
+        """Write a whole batch with COPY.
+
+        Offer and nutrient rows are content-addressed: rows already known to
+        the cache are referenced, the rest are upserted on content_hash in one
+        statement per table, so product rows can be copied with their IDs.
+        """
+        products = [p.product for p in batch]
+
+        with conn.cursor() as cur:
+            self._assign_batch_shared_ids(cur, products)
+            copy_rows(
+                cur, "product", PRODUCT_COLUMNS, (_product_row(p) for p in products)
             )
-            return False
+            copy_rows(
+                cur,
+                "product_category",
+                ("product_id", "scraped_at", "category_id"),
+                self._category_link_rows(batch),
+            )
+            self._refresh_current(cur, products)
 
-    def _process_product_categories(self, document: Dict, product, cur):
-        """Process category relationships for a product."""
-        breadcrumbs = document.get("breadcrumb", [])
+            if fingerprints:
+                PostgresLoadManifest.record(
+                    cur, [p.file_name for p in batch], fingerprints
+                )
 
-        for breadcrumb in breadcrumbs:
-            category_id = breadcrumb.get("id")
-            if not category_id:
-                logger.warning(f"Breadcrumb without ID in {product.name}")
-                continue
+    def _assign_batch_shared_ids(self, cur, products: List[Product]):
+        """Set the offer and nutrient IDs of a batch, writing only unseen content."""
+        self._assign_shared_ids(
+            cur,
+            "nutrients",
+            NUTRIENT_COLUMNS,
+            [p.nutrition for p in products if p.nutrition],
+            lambda n: (
+                n.unit,
+                to_int(n.quantity),
+                to_int(n.kcal),
+                to_int(n.kJ),
+                n.fat,
+                n.saturates,
+                n.carbohydrate,
+                n.sugars,
+                n.fibre,
+                n.protein,
+                n.salt,
+            ),
+        )
+        self._assign_shared_ids(
+            cur,
+            "offer",
+            OFFER_COLUMNS,
+            [p.offer for p in products if p.offer],
+            lambda o: (
+                o.price,
+                o.quantity,
+                o.unit_price,
+                o.promotion_price,
+                o.promotion_unit_price,
+            ),
+        )
 
+    def _assign_shared_ids(self, cur, table: str, columns, items: List, values):
+        """Set the IDs of offer or nutrient objects, writing only unseen content."""
+        new_items: Dict[str, List] = {}
+        for item in items:
+            content_hash = item.content_hash()
+            item.id = self.content_cache.get(table, content_hash)
+            if item.id is None:
+                new_items.setdefault(content_hash, []).append(item)
+        if not new_items:
+            return
+
+        statement = sql.SQL(
+            "INSERT INTO {} ({}, content_hash) VALUES %s "
+            "ON CONFLICT (content_hash) DO UPDATE "
+            "SET content_hash = EXCLUDED.content_hash "
+            "RETURNING content_hash, id"
+        ).format(
+            sql.Identifier(table), sql.SQL(", ").join(map(sql.Identifier, columns))
+        )
+        # Sorted, so concurrent loaders lock conflicting hashes in the same order
+        rows = [
+            (*values(same[0]), content_hash)
+            for content_hash, same in sorted(new_items.items())
+        ]
+        returned = execute_values(
+            cur, statement.as_string(cur), rows, page_size=len(rows), fetch=True
+        )
+        for content_hash, row_id in returned:
+            self.content_cache.stage(table, content_hash, row_id)
+            for item in new_items[content_hash]:
+                item.id = row_id
+
+    def _refresh_current(self, cur, products: List[Product]):
+        """Upsert the newest snapshot of each product into product_current.
+
+        Rows are only replaced by a newer scraped_at, so batches may arrive in
+        any order. Runs in the batch transaction, so it commits or rolls back
+        with the snapshots themselves.
+        """
+        latest: Dict[str, Product] = {}
+        for product in products:
+            current = latest.get(product.migros_id)
+            if current is None or product.scraped_at > current.scraped_at:
+                latest[product.migros_id] = product
+        if not latest:
+            return
+
+        statement = sql.SQL(
+            "INSERT INTO product_current ({}) VALUES %s "
+            "ON CONFLICT (migros_id) DO UPDATE SET {} "
+            "WHERE product_current.scraped_at < EXCLUDED.scraped_at"
+        ).format(
+            sql.SQL(", ").join(map(sql.Identifier, PRODUCT_COLUMNS)),
+            sql.SQL(", ").join(
+                sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(column))
+                for column in PRODUCT_COLUMNS
+                if column != "migros_id"
+            ),
+        )
+        # Sorted, so concurrent loaders lock conflicting products in the same order
+        rows = [_product_row(latest[migros_id]) for migros_id in sorted(latest)]
+        execute_values(cur, statement.as_string(cur), rows, page_size=len(rows))
+
+    def _category_link_rows(self, prepared: List[PreparedProduct]):
+        """Yield unique product_category rows for known categories."""
+        seen = set()
+        for p in prepared:
+            for category_id in p.category_ids:
+                category_id = self.category_cache.resolve_id(category_id)
+                if category_id is None:
+                    continue
+                row = (p.product.migros_id, p.product.scraped_at, category_id)
+                if row not in seen:
+                    seen.add(row)
+                    yield row
+
+    def _store_product(self, prepared: PreparedProduct, cur):
+        """Insert a prepared product and its category links; errors propagate.
+
+        Its offer and nutrient IDs are assigned beforehand, for the whole batch.
+        """
+        product = prepared.product
+        product.save_to_db(cur)
+
+        for category_id in prepared.category_ids:
             self._link_product_to_category(product, category_id, cur)
 
     def _link_product_to_category(self, product, category_id: int, cur):
         """Create link between product and category."""
-        try:
-            # Check if category exists first (optional but safer)
-            cur.execute("SELECT 1 FROM category WHERE id = %s", (category_id,))
-            if not cur.fetchone():
-                logger.warning(
-                    f"Category {category_id} not found, skipping link for product {product.migros_id}"
-                )
-                return False
-
-            # Insert relationship
-            cur.execute(
-                """
-                INSERT INTO product_category (product_id, scraped_at, category_id)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (product_id, scraped_at, category_id) DO NOTHING
-            """,
-                (product.migros_id, product.scraped_at, category_id),
-            )
+        category_id = self.category_cache.resolve_id(category_id)
+        if category_id is None:
+            return False
 
-            return True
+        cur.execute(
+            """
+            INSERT INTO product_category (product_id, scraped_at, category_id)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (product_id, scraped_at, category_id) DO NOTHING
+        """,
+            (product.migros_id, product.scraped_at, category_id),
+        )
 
-        except Exception as e:
-            logger.warning(
-                f"Failed to link product {product.id} to category {category_id}: {e}"
-            )
-            return False
+        return True
 
     def process_categories(
         self, documents: List[Dict], dbname: str, batch_size: int = 100
@@ -230,10 +540,150 @@ class ProductProcessor:
             return False
 
 
+def _product_row(product: Product) -> tuple:
+    """A product as a row of PRODUCT_COLUMNS, once its offer and nutrients are stored."""
+    return (
+        product.migros_id,
+        product.name,
+        product.brand,
+        product.title,
+        product.origin,
+        product.description,
+        product.ingredients,
+        product.nutrition.id if product.nutrition else None,
+        product.offer.id if product.offer else None,
+        product.gtins,
+        product.scraped_at,
+    )
+
+
+@dataclass
+class PartitionTask:
+    """The share of a parallel load handled by one worker process."""
+
+    worker: int
+    index: SnapshotIndex
+    dbname: str
+    batch_size: int
+    fingerprints: Optional[Dict[str, Fingerprint]]
+    bulk: bool
+    use_archive: bool
+    partitioned: bool = False
+
+
+def _load_partition(task: PartitionTask) -> Dict:
+    """Worker entry point: load one partition over its own connection."""
+    start_time = time.perf_counter()
+    db_manager = PostgreSQLManager(config)
+    processor = ProductProcessor(
+        db_manager,
+        ProductFactory(),
+        partitions=(
+            MonthlyPartitions(db_manager, task.dbname) if task.partitioned else None
+        ),
+    )
+    documents = DataLoader.iter_documents_from_index(
+        task.index, use_archive=task.use_archive
+    )
+    processed, failed = processor.process_products(
+        documents, task.dbname, task.batch_size, task.fingerprints, task.bulk
+    )
+    return {
+        "worker": task.worker,
+        "processed": processed,
+        "failed": failed,
+        "elapsed": time.perf_counter() - start_time,
+    }
+
+
+def load_products_parallel(
+    snapshot_index: SnapshotIndex,
+    dbname: str,
+    workers: int,
+    batch_size: int = 100,
+    fingerprints: Optional[Dict[str, Fingerprint]] = None,
+    bulk: bool = False,
+    use_archive: bool = True,
+    partitioned: bool = False,
+) -> List[Dict]:
+    """Load products with one process and connection per migrosId partition.
+
+    Each worker parses, transforms and stores its own partition. Since every
+    snapshot of a product lands in the same partition, no two workers ever
+    write the same product or product_category rows. Categories must already
+    be loaded; each worker validates links against its own cache of them.
+    Returns the per-worker statistics.
+    """
+    start_time = time.perf_counter()
+    tasks = []
+    unfingerprinted = 0
+    for worker, partition in enumerate(snapshot_index.partition(workers)):
+        partition_fingerprints = None
+        if fingerprints is not None:
+            # Files gone from disk have no fingerprint and are not recorded
+            partition_fingerprints = {}
+            for path in partition.paths():
+                file_name = os.path.basename(path)
+                fingerprint = fingerprints.get(file_name)
+                if fingerprint is None:
+                    unfingerprinted += 1
+                else:
+                    partition_fingerprints[file_name] = fingerprint
+        tasks.append(
+            PartitionTask(
+                worker,
+                partition,
+                dbname,
+                batch_size,
+                partition_fingerprints,
+                bulk,
+                use_archive,
+                partitioned,
+            )
+        )
+
+    if unfingerprinted:
+        logger.warning(
+            f"{unfingerprinted} snapshots have no file on disk and will not be "
+            "recorded in the load manifest"
+        )
+    logger.info(
+        f"Loading {len(snapshot_index)} snapshots with {workers} workers "
+        f"(partition sizes: {[len(task.index) for task in tasks]})"
+    )
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        stats = list(executor.map(_load_partition, tasks))
+
+    for stat in stats:
+        rate = stat["processed"] / stat["elapsed"] if stat["elapsed"] else 0.0
+        logger.info(
+            f"Worker {stat['worker']}: {stat['processed']} products "
+            f"({stat['failed']} failed) in {stat['elapsed']:.2f}s ({rate:.0f}/s)"
+        )
+    elapsed = time.perf_counter() - start_time
+    total = sum(stat["processed"] for stat in stats)
+    logger.info(
+        f"Parallel load complete - {total} products in {elapsed:.2f}s "
+        f"({total / elapsed:.0f} products/s with {workers} workers)"
+    )
+    return stats
+
+
 def initialize_database(
-    db_manager: PostgreSQLManager, target_db: str, force_recreate: bool = True
+    db_manager: PostgreSQLManager,
+    target_db: str,
+    force_recreate: bool = True,
+    deferred: bool = False,
+    unlogged: bool = False,
+    partitioned: bool = False,
 ):
-    """Initialize the database with proper checks."""
+    """Initialize the database with proper checks.
+
+    With deferred=True the tables are created without keys and indexes (and
+    UNLOGGED if requested); build_deferred_constraints() adds them after the
+    load. With partitioned=True product and product_category are range
+    partitioned by month of scraped_at.
+    """
     try:
         if db_manager.database_exists(target_db):
             if force_recreate:
@@ -245,27 +695,83 @@ def initialize_database(
             logger.info(f"Creating new database: {target_db}")
             db_manager.create_database(target_db, drop_if_exists=False)
 
-        db_manager.execute_script(target_db, config.SQL_INIT_SCRIPT)
+        if deferred:
+            create_deferred_schema(db_manager, target_db, unlogged)
+        elif partitioned:
+            db_manager.execute_script(target_db, config.SQL_PARTITIONED_SCRIPT)
+        else:
+            db_manager.execute_script(target_db, config.SQL_INIT_SCRIPT)
+        apply_migrations(db_manager, target_db)
 
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
         raise
 
 
+def log_relation_sizes(db_manager: PostgreSQLManager, dbname: str):
+    """Log the table and index size of every table."""
+    for table, sizes in db_manager.relation_sizes(dbname).items():
+        logger.info(
+            f"{table}: {sizes['table_bytes'] / 2**20:.1f} MiB table, "
+            f"{sizes['index_bytes'] / 2**20:.1f} MiB indexes"
+        )
+
+
 def create_sql_db(
     limit_products: Optional[int] = None,
     limit_categories: Optional[int] = None,
     force_recreate: bool = True,
+    snapshot_index: Optional[SnapshotIndex] = None,
+    incremental: bool = False,
+    bulk_load: bool = config.PG_BULK_LOAD,
+    defer_constraints: bool = config.PG_DEFER_CONSTRAINTS,
+    unlogged: bool = config.PG_UNLOGGED_LOAD,
+    parallel_workers: int = config.PG_LOAD_WORKERS,
+    partitioned: bool = config.PG_PARTITIONED,
 ):
-    """Main function to create and populate SQL database."""
+    """Main function to create and populate SQL database.
+
+    Every load records the files it ingested in the load manifest; with
+    incremental=True the existing database is kept and only snapshots
+    missing from the manifest are ingested. With bulk_load=True products
+    are written with COPY instead of row-by-row inserts. Fresh bulk loads
+    with defer_constraints=True build their keys after the data is in; the
+    secondary indexes of the index catalog are always built after the load.
+    With parallel_workers > 1 products are loaded by that many processes,
+    partitioned by migrosId. With partitioned=True a fresh database gets the
+    monthly scraped_at partitioned schema, and partitions are created as the
+    load reaches new months (an existing partitioned database is detected).
+    """
     logger.info("Starting SQL database creation process")
+    start_time = time.perf_counter()
+    # Row inserts rely on the unique indexes for ON CONFLICT, and an existing
+    # schema already has its keys, so only fresh bulk loads can defer them.
+    # Partitioned tables cannot be UNLOGGED, so they always keep their keys.
+    deferred = (
+        defer_constraints
+        and bulk_load
+        and force_recreate
+        and not incremental
+        and not partitioned
+    )
 
     db_manager = PostgreSQLManager(config)
     product_factory = ProductFactory()
     processor = ProductProcessor(db_manager, product_factory)
 
     try:
-        initialize_database(db_manager, config.PG_DB_NAME, force_recreate)
+        initialize_database(
+            db_manager,
+            config.PG_DB_NAME,
+            force_recreate and not incremental,
+            deferred=deferred,
+            unlogged=deferred and unlogged,
+            partitioned=partitioned,
+        )
+        # An existing database keeps its schema, whichever was requested
+        partitioned = is_partitioned(db_manager, config.PG_DB_NAME)
+        if partitioned:
+            processor.partitions = MonthlyPartitions(db_manager, config.PG_DB_NAME)
 
         logger.info("Loading and processing categories...")
         category_documents = DataLoader.load_documents_from_folder(
@@ -276,22 +782,68 @@ def create_sql_db(
             processor.process_categories(
                 category_documents, config.PG_DB_NAME, config.BATCH_SIZE
             )
+            processor.category_cache = CategoryCache(category_documents)
         else:
             logger.warning("No categories to process")
 
         logger.info("Loading and processing products...")
-        product_documents = DataLoader.load_documents_from_folder(
-            config.PRODUCTS_PATH, limit=limit_products
-        )
-
-        if product_documents:
-            processor.process_products(
-                product_documents, config.PG_DB_NAME, config.BATCH_SIZE
+        # The manifest fingerprints files on disk, so incremental runs read
+        # the folder even if a packed archive exists.
+        if snapshot_index is None:
+            snapshot_index = DataLoader.snapshot_index(
+                config.PRODUCTS_PATH, use_archive=not incremental
+            )
+        snapshot_index = snapshot_index.head(limit_products)
+
+        # Every load records its files, so a later incremental run skips them
+        fingerprints = fingerprint_index(snapshot_index)
+        if incremental:
+            with db_manager.connect(config.PG_DB_NAME) as conn:
+                loaded = PostgresLoadManifest.fetch(conn)
+            snapshot_index = pending_snapshots(snapshot_index, fingerprints, loaded)
+
+        if parallel_workers > 1:
+            load_products_parallel(
+                snapshot_index,
+                config.PG_DB_NAME,
+                parallel_workers,
+                config.BATCH_SIZE,
+                fingerprints=fingerprints,
+                bulk=bulk_load,
+                use_archive=not incremental,
+                partitioned=partitioned,
             )
         else:
-            logger.warning("No products to process")
+            product_documents = DataLoader.iter_documents_from_index(
+                snapshot_index,
+                workers=config.LOADER_WORKERS,
+                chunk_size=config.LOADER_CHUNK_SIZE,
+                use_archive=not incremental,
+            )
+            processor.process_products(
+                product_documents,
+                config.PG_DB_NAME,
+                config.BATCH_SIZE,
+                fingerprints=fingerprints,
+                bulk=bulk_load,
+            )
 
-        logger.info("SQL database creation completed successfully")
+        if deferred:
+            build_deferred_constraints(db_manager, config.PG_DB_NAME, unlogged=unlogged)
+        db_manager.create_indexes(dbname=config.PG_DB_NAME)
+        if partitioned:
+            logger.info(
+                "product partitions: "
+                f"{', '.join(list_partitions(db_manager, config.PG_DB_NAME, 'product'))}"
+            )
+
+        elapsed = time.perf_counter() - start_time
+        log_relation_sizes(db_manager, config.PG_DB_NAME)
+        logger.info(
+            f"SQL database creation completed successfully in {elapsed:.2f}s "
+            f"({'deferred' if deferred else 'immediate'} constraints)"
+        )
+        return elapsed
 
     except Exception as e:
         logger.error(f"SQL database creation failed: {e}")
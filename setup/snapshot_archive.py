@@ -0,0 +1,260 @@
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from setup.database_config import DatabaseConfig
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+ARCHIVE_MAGIC = b"DDISNAP1"
+ARCHIVE_SUFFIX = ".pack"
+INDEX_SUFFIX = ".idx"
+STATE_SUFFIX = ".state"  # folder state at the last pack, see archive_is_stale
+RECORD_HEADER = struct.Struct(">I")
+
+ArchiveKey = Tuple[str, str]
+
+
+def archive_path_for(folder_path: str) -> str:
+    """Return the conventional archive path for a data folder."""
+    return folder_path.rstrip("/\\") + ARCHIVE_SUFFIX
+
+
+def archive_is_stale(folder_path: str, archive_path: str) -> bool:
+    """Whether the folder may hold snapshots that are not in the archive.
+
+    Packing records the folder's modification time and JSON file count
+    (skipped invalid files included). While the folder time is unchanged,
+    that single stat decides; after a change the names are counted, without
+    a stat per file, and only a folder with more files than when packed is
+    stale, so deleting packed files keeps the archive in use. An archive
+    without a recorded state is stale.
+    """
+    if not os.path.isdir(folder_path):
+        return False
+    try:
+        with open(archive_path + STATE_SUFFIX, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return True
+    if os.stat(folder_path).st_mtime_ns == state["folder_mtime_ns"]:
+        return False
+    with os.scandir(folder_path) as entries:
+        files = sum(1 for entry in entries if entry.name.endswith(".json"))
+    return files > state["files"]
+
+
+def record_key(document: Dict) -> ArchiveKey:
+    """Build the index key for a document: (migrosId, dateAdded).
+
+    Category documents have no migrosId/dateAdded and are keyed by id.
+    """
+    identifier = document.get("migrosId") or document.get("id")
+    return str(identifier), document.get("dateAdded") or ""
+
+
+class SnapshotArchive:
+    """Append-only archive of length-prefixed JSON records with an offset index.
+
+    The archive file starts with ARCHIVE_MAGIC followed by records of the
+    form <uint32 big-endian length><UTF-8 JSON>. The sidecar index file holds
+    one JSON line per record: [migrosId, dateAdded, offset, length].
+    Reading goes through mmap for both sequential and random access.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self._file = None
+        self._mmap = None
+        self._index: Dict[ArchiveKey, Tuple[int, int]] = {}
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def open(self):
+        """Map the archive into memory and load its offset index."""
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+            self.close()
+            raise ValueError(f"Not a snapshot archive: {self.path}")
+        self._index = self._read_index(self.index_path)
+
+    def close(self):
+        """Release the memory map and file handle."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def keys(self) -> List[ArchiveKey]:
+        """Return all (migrosId, dateAdded) keys in archive order."""
+        return list(self._index)
+
+    def get(self, migros_id: str, date_added: str = "") -> Optional[Dict]:
+        """Random access to a single record by key."""
+        location = self._index.get((str(migros_id), date_added))
+        if location is None:
+            return None
+        offset, length = location
+        return self._decode(offset + RECORD_HEADER.size, length)
+
+    def iter_documents(self, limit: Optional[int] = None) -> Iterator[Dict]:
+        """Stream records sequentially from the memory map.
+
+        Iteration follows the index, which lists records in append order,
+        so a record whose index line was never written is not yielded.
+        """
+        for count, (offset, length) in enumerate(self._index.values()):
+            if limit and count >= limit:
+                break
+            yield self._decode(offset + RECORD_HEADER.size, length)
+
+    def _decode(self, start: int, length: int) -> Dict:
+        """Decode a JSON record from the memory map."""
+        return json.loads(self._mmap[start : start + length])
+
+    @staticmethod
+    def _read_index(index_path: str) -> Dict[ArchiveKey, Tuple[int, int]]:
+        """Read the sidecar index file into a key -> (offset, length) map."""
+        index = {}
+        if not os.path.exists(index_path):
+            return index
+        with open(index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    migros_id, date_added, offset, length = json.loads(line)
+                    index[(migros_id, date_added)] = (offset, length)
+        return index
+
+    @classmethod
+    def pack_folder(cls, folder_path: str, archive_path: Optional[str] = None) -> int:
+        """Append all JSON files of a folder to its archive.
+
+        Records whose key is already indexed are skipped, so re-packing a
+        folder only appends new snapshots. Returns the number appended.
+        """
+        archive_path = archive_path or archive_path_for(folder_path)
+        index_path = archive_path + INDEX_SUFFIX
+        existing = cls._read_index(index_path)
+
+        if not os.path.exists(archive_path):
+            with open(archive_path, "wb") as f:
+                f.write(ARCHIVE_MAGIC)
+
+        # Taken before listing, so files added while packing make it stale
+        folder_mtime_ns = os.stat(folder_path).st_mtime_ns
+        filenames = sorted(f for f in os.listdir(folder_path) if f.endswith(".json"))
+        appended = 0
+
+        with open(archive_path, "ab") as archive, open(
+            index_path, "a", encoding="utf-8"
+        ) as index:
+            for filename in filenames:
+                with open(os.path.join(folder_path, filename), "rb") as f:
+                    payload = f.read()
+                try:
+                    document = json.loads(payload)
+                except json.JSONDecodeError as e:
+                    logger.error(f"Invalid JSON in {filename}, not packed: {e}")
+                    continue
+                if not isinstance(document, dict):
+                    logger.warning(f"Invalid document format in {filename}")
+                    continue
+
+                key = record_key(document)
+                if key in existing:
+                    continue
+
+                offset = archive.tell()
+                archive.write(RECORD_HEADER.pack(len(payload)))
+                archive.write(payload)
+                index.write(json.dumps([*key, offset, len(payload)]) + "\n")
+                existing[key] = (offset, len(payload))
+                appended += 1
+
+        # Skipped (invalid or duplicate) files count too, see archive_is_stale
+        with open(archive_path + STATE_SUFFIX, "w", encoding="utf-8") as f:
+            json.dump({"files": len(filenames), "folder_mtime_ns": folder_mtime_ns}, f)
+        logger.info(
+            f"Packed {appended} new records from {folder_path} into {archive_path}"
+        )
+        return appended
+
+
+def benchmark(folder_path: str, limit: Optional[int] = None, lookups: int = 1000):
+    """Compare loading through the folder layout against the archive."""
+    from setup.dataloader import DataLoader
+
+    start = time.perf_counter()
+    folder_count = sum(
+        1
+        for _ in DataLoader.iter_documents_from_folder(
+            folder_path, limit, use_archive=False
+        )
+    )
+    folder_time = time.perf_counter() - start
+
+    archive_path = archive_path_for(folder_path)
+    start = time.perf_counter()
+    with SnapshotArchive(archive_path) as archive:
+        archive_count = sum(1 for _ in archive.iter_documents(limit))
+        archive_time = time.perf_counter() - start
+
+        keys = archive.keys()[:lookups]
+        start = time.perf_counter()
+        for key in keys:
+            archive.get(*key)
+        lookup_time = time.perf_counter() - start
+
+    print(f"Folder:  {folder_count} documents in {folder_time:.3f}s")
+    print(f"Archive: {archive_count} documents in {archive_time:.3f}s")
+    if archive_time > 0:
+        print(f"Speedup: {folder_time / archive_time:.2f}x")
+    if keys:
+        print(
+            f"Random access: {len(keys)} lookups, "
+            f"{lookup_time / len(keys) * 1e6:.1f}µs per lookup"
+        )
+
+
+def main():
+    config = DatabaseConfig()
+    parser = argparse.ArgumentParser(description="Pack snapshot folders")
+    parser.add_argument("command", choices=["pack", "benchmark"])
+    parser.add_argument(
+        "--folder",
+        action="append",
+        help="Folder to pack/benchmark (default: products and categories)",
+    )
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    folders = args.folder or [config.PRODUCTS_PATH, config.CATEGORIES_PATH]
+    for folder in folders:
+        if args.command == "pack":
+            SnapshotArchive.pack_folder(folder)
+        else:
+            benchmark(folder, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import logging
+import os
+import random
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+Timestamp = Union[str, datetime]
+
+
+@dataclass(frozen=True)
+class SnapshotEntry:
+    """A snapshot file described purely by its name: <migrosId>-<dateAdded>.json."""
+
+    migros_id: str
+    scraped_at: str
+    path: str
+
+    @classmethod
+    def from_filename(cls, folder_path: str, filename: str) -> "SnapshotEntry":
+        """Parse an entry from a file name without opening the file.
+
+        Files without a timestamp (e.g. categories, <id>.json) get an empty
+        scraped_at.
+        """
+        stem = filename[: -len(".json")]
+        migros_id, _, scraped_at = stem.partition("-")
+        return cls(migros_id, scraped_at, os.path.join(folder_path, filename))
+
+
+class SnapshotIndex:
+    """Sorted, filterable index of snapshot files built from file names only.
+
+    Every filter returns a new index, so filters can be chained, e.g.
+    SnapshotIndex.from_folder(path).between("2024-10-01").latest_only().
+    archive_path is set on indexes built from a current packed archive and
+    kept by every filter, so loaders read the snapshots from it.
+    """
+
+    def __init__(
+        self,
+        folder_path: str,
+        entries: Iterable[SnapshotEntry],
+        archive_path: Optional[str] = None,
+    ):
+        self.folder_path = folder_path
+        self.archive_path = archive_path
+        self.entries: List[SnapshotEntry] = sorted(
+            entries, key=lambda e: (e.migros_id, e.scraped_at)
+        )
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[SnapshotEntry]:
+        return iter(self.entries)
+
+    @classmethod
+    def from_folder(cls, folder_path: str) -> "SnapshotIndex":
+        """Build the index with a single os.scandir pass."""
+        if not os.path.exists(folder_path):
+            logger.error(f"Folder does not exist: {folder_path}")
+            return cls(folder_path, [])
+
+        with os.scandir(folder_path) as it:
+            entries = [
+                SnapshotEntry.from_filename(folder_path, entry.name)
+                for entry in it
+                if entry.name.endswith(".json") and entry.is_file()
+            ]
+
+        if not entries:
+            logger.warning(f"No JSON files found in {folder_path}")
+        return cls(folder_path, entries)
+
+    @classmethod
+    def from_keys(
+        cls,
+        folder_path: str,
+        keys: Iterable[Tuple[str, str]],
+        archive_path: Optional[str] = None,
+    ) -> "SnapshotIndex":
+        """Build the index from (migrosId, dateAdded) keys, e.g. an archive index."""
+        entries = []
+        for migros_id, scraped_at in keys:
+            filename = (
+                f"{migros_id}-{scraped_at}.json" if scraped_at else f"{migros_id}.json"
+            )
+            entries.append(
+                SnapshotEntry(
+                    migros_id, scraped_at, os.path.join(folder_path, filename)
+                )
+            )
+        return cls(folder_path, entries, archive_path)
+
+    def _derive(self, entries: Iterable[SnapshotEntry]) -> "SnapshotIndex":
+        """A new index over a subset of the entries, with the same source."""
+        return SnapshotIndex(self.folder_path, entries, self.archive_path)
+
+    def product_ids(self) -> List[str]:
+        """Return the sorted distinct product IDs in the index."""
+        return sorted({entry.migros_id for entry in self.entries})
+
+    def paths(self) -> List[str]:
+        """Return file paths in index order."""
+        return [entry.path for entry in self.entries]
+
+    def head(self, limit: Optional[int]) -> "SnapshotIndex":
+        """Keep the first `limit` snapshots (deterministic, unlike os.listdir)."""
+        if not limit or limit <= 0:
+            return self
+        return self._derive(self.entries[:limit])
+
+    def for_products(self, product_ids: Iterable[str]) -> "SnapshotIndex":
+        """Keep only snapshots of the given product IDs."""
+        wanted = {str(product_id) for product_id in product_ids}
+        return self._derive(e for e in self.entries if e.migros_id in wanted)
+
+    def between(
+        self, start: Optional[Timestamp] = None, end: Optional[Timestamp] = None
+    ) -> "SnapshotIndex":
+        """Keep snapshots with start <= scraped_at < end (either bound optional)."""
+        start = _as_iso(start)
+        end = _as_iso(end)
+        return self._derive(
+            e
+            for e in self.entries
+            if (start is None or e.scraped_at >= start)
+            and (end is None or e.scraped_at < end)
+        )
+
+    def latest_only(self) -> "SnapshotIndex":
+        """Keep only the newest snapshot per product."""
+        latest = {}
+        for entry in self.entries:
+            latest[entry.migros_id] = entry  # entries are sorted by scraped_at
+        return self._derive(latest.values())
+
+    def sample_products(self, n: int, seed: int = 0) -> "SnapshotIndex":
+        """Keep all snapshots of a reproducible random sample of n products."""
+        product_ids = self.product_ids()
+        if n >= len(product_ids):
+            return self
+        sampled = random.Random(seed).sample(product_ids, n)
+        return self.for_products(sampled)
+
+    def partition(self, n: int) -> List["SnapshotIndex"]:
+        """Split into n disjoint indexes by a stable hash (CRC32) of migrosId.
+
+        All snapshots of a product land in the same partition, on every run
+        and in every process (unlike the salted built-in hash()).
+        """
+        buckets: List[List[SnapshotEntry]] = [[] for _ in range(max(n, 1))]
+        for entry in self.entries:
+            bucket = zlib.crc32(entry.migros_id.encode("utf-8")) % len(buckets)
+            buckets[bucket].append(entry)
+        return [self._derive(bucket) for bucket in buckets]
+
+
+def _as_iso(value: Optional[Timestamp]) -> Optional[str]:
+    """Normalise a timestamp bound to the ISO format used in file names."""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None).isoformat()
+    return value
@@ -1,30 +1,32 @@
-CREATE TABLE nutrients (
+CREATE TABLE IF NOT EXISTS nutrients (
     id BIGSERIAL PRIMARY KEY,
     unit VARCHAR(15),
     quantity INT,
     kcal INT,
     kJ INT,
-    fat VARCHAR(50),
-    saturates VARCHAR(50),
-    carbohydrate VARCHAR(50),
-    sugars VARCHAR(50),
-    fibre VARCHAR(50),
-    protein VARCHAR(50),
-    salt VARCHAR(50)
+    fat NUMERIC,
+    saturates NUMERIC,
+    carbohydrate NUMERIC,
+    sugars NUMERIC,
+    fibre NUMERIC,
+    protein NUMERIC,
+    salt NUMERIC,
+    content_hash UUID NOT NULL UNIQUE
 );
 
 
-CREATE TABLE offer (
+CREATE TABLE IF NOT EXISTS offer (
     id BIGSERIAL PRIMARY KEY,
     price DECIMAL(10, 2),
     quantity VARCHAR(50),
     unit_price DECIMAL(10, 2),
     promotion_price DECIMAL(10, 2),
-    promotion_unit_price DECIMAL(10, 2)
+    promotion_unit_price DECIMAL(10, 2),
+    content_hash UUID NOT NULL UNIQUE
 );
 
 
-CREATE TABLE category (
+CREATE TABLE IF NOT EXISTS category (
     id BIGSERIAL PRIMARY KEY,
     name VARCHAR(100) NOT NULL,
     path VARCHAR(222),
@@ -32,7 +34,7 @@ CREATE TABLE category (
 );
 
 
-CREATE TABLE product (
+CREATE TABLE IF NOT EXISTS product (
     migros_id VARCHAR(30) NOT NULL,
     name VARCHAR(255) NOT NULL,
     brand VARCHAR(255),
@@ -50,7 +52,7 @@ CREATE TABLE product (
 );
 
 
-CREATE TABLE product_category ( 
+CREATE TABLE IF NOT EXISTS product_category (
     product_id VARCHAR(30),
     scraped_at TIMESTAMP,
     category_id INT,
@@ -58,3 +60,34 @@ CREATE TABLE product_category (
     FOREIGN KEY (product_id, scraped_at) REFERENCES product(migros_id, scraped_at),
     FOREIGN KEY (category_id) REFERENCES category(id)
 );
+
+
+-- Newest snapshot of every product, kept up to date by the loader, so
+-- current-state lookups do not have to search the history
+CREATE TABLE IF NOT EXISTS product_current (
+    migros_id VARCHAR(30) PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    brand VARCHAR(255),
+    title VARCHAR(255),
+    origin VARCHAR(255),
+    description TEXT,
+    ingredients TEXT,
+    nutrient_id INT,
+    offer_id INT,
+    gtins TEXT,
+    scraped_at TIMESTAMP NOT NULL
+);
+
+
+CREATE TABLE IF NOT EXISTS load_manifest (
+    file_name VARCHAR(100) PRIMARY KEY,
+    file_size BIGINT NOT NULL,
+    file_mtime_ns BIGINT NOT NULL,
+    loaded_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name VARCHAR(100) PRIMARY KEY,
+    applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,92 @@
+-- Bare tables for bulk loads: primary and foreign keys are added by
+-- post_load.sql once the data is in, secondary indexes from the index catalog.
+-- category, load_manifest, the product_current key and the content_hash keys
+-- of nutrients and offer are kept, as the loader upserts on them.
+
+CREATE TABLE IF NOT EXISTS nutrients (
+    id BIGSERIAL,
+    unit VARCHAR(15),
+    quantity INT,
+    kcal INT,
+    kJ INT,
+    fat NUMERIC,
+    saturates NUMERIC,
+    carbohydrate NUMERIC,
+    sugars NUMERIC,
+    fibre NUMERIC,
+    protein NUMERIC,
+    salt NUMERIC,
+    content_hash UUID NOT NULL UNIQUE
+);
+
+
+CREATE TABLE IF NOT EXISTS offer (
+    id BIGSERIAL,
+    price DECIMAL(10, 2),
+    quantity VARCHAR(50),
+    unit_price DECIMAL(10, 2),
+    promotion_price DECIMAL(10, 2),
+    promotion_unit_price DECIMAL(10, 2),
+    content_hash UUID NOT NULL UNIQUE
+);
+
+
+CREATE TABLE IF NOT EXISTS category (
+    id BIGSERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    path VARCHAR(222),
+    slug VARCHAR(100)
+);
+
+
+CREATE TABLE IF NOT EXISTS product (
+    migros_id VARCHAR(30) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    brand VARCHAR(255),
+    title VARCHAR(255),
+    origin VARCHAR(255),
+    description TEXT,
+    ingredients TEXT,
+    nutrient_id INT,
+    offer_id INT,
+    gtins TEXT,
+    scraped_at TIMESTAMP
+);
+
+
+CREATE TABLE IF NOT EXISTS product_category (
+    product_id VARCHAR(30),
+    scraped_at TIMESTAMP,
+    category_id INT
+);
+
+
+-- Newest snapshot of every product, kept up to date by the loader, so
+-- current-state lookups do not have to search the history
+CREATE TABLE IF NOT EXISTS product_current (
+    migros_id VARCHAR(30) PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    brand VARCHAR(255),
+    title VARCHAR(255),
+    origin VARCHAR(255),
+    description TEXT,
+    ingredients TEXT,
+    nutrient_id INT,
+    offer_id INT,
+    gtins TEXT,
+    scraped_at TIMESTAMP NOT NULL
+);
+
+
+CREATE TABLE IF NOT EXISTS load_manifest (
+    file_name VARCHAR(100) PRIMARY KEY,
+    file_size BIGINT NOT NULL,
+    file_mtime_ns BIGINT NOT NULL,
+    loaded_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name VARCHAR(100) PRIMARY KEY,
+    applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
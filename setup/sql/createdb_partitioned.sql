@@ -0,0 +1,98 @@
+-- Variant of createdb.sql with the snapshot history range partitioned by
+-- month of scraped_at. The monthly partitions are created by the loader
+-- (setup/time_partitions.py) as snapshots of a new month arrive, so
+-- time-bounded queries only scan the months they ask for.
+
+CREATE TABLE IF NOT EXISTS nutrients (
+    id BIGSERIAL PRIMARY KEY,
+    unit VARCHAR(15),
+    quantity INT,
+    kcal INT,
+    kJ INT,
+    fat NUMERIC,
+    saturates NUMERIC,
+    carbohydrate NUMERIC,
+    sugars NUMERIC,
+    fibre NUMERIC,
+    protein NUMERIC,
+    salt NUMERIC,
+    content_hash UUID NOT NULL UNIQUE
+);
+
+
+CREATE TABLE IF NOT EXISTS offer (
+    id BIGSERIAL PRIMARY KEY,
+    price DECIMAL(10, 2),
+    quantity VARCHAR(50),
+    unit_price DECIMAL(10, 2),
+    promotion_price DECIMAL(10, 2),
+    promotion_unit_price DECIMAL(10, 2),
+    content_hash UUID NOT NULL UNIQUE
+);
+
+
+CREATE TABLE IF NOT EXISTS category (
+    id BIGSERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    path VARCHAR(222),
+    slug VARCHAR(100)
+);
+
+
+CREATE TABLE IF NOT EXISTS product (
+    migros_id VARCHAR(30) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    brand VARCHAR(255),
+    title VARCHAR(255),
+    origin VARCHAR(255),
+    description TEXT,
+    ingredients TEXT,
+    nutrient_id INT,
+    offer_id INT,
+    gtins TEXT,
+    scraped_at TIMESTAMP,
+    CONSTRAINT pk_product PRIMARY KEY (migros_id, scraped_at),
+    FOREIGN KEY (nutrient_id) REFERENCES nutrients(id),
+    FOREIGN KEY (offer_id) REFERENCES offer(id)
+) PARTITION BY RANGE (scraped_at);
+
+
+CREATE TABLE IF NOT EXISTS product_category (
+    product_id VARCHAR(30),
+    scraped_at TIMESTAMP,
+    category_id INT,
+    PRIMARY KEY (product_id, scraped_at, category_id),
+    FOREIGN KEY (product_id, scraped_at) REFERENCES product(migros_id, scraped_at),
+    FOREIGN KEY (category_id) REFERENCES category(id)
+) PARTITION BY RANGE (scraped_at);
+
+
+-- Newest snapshot of every product, kept up to date by the loader, so
+-- current-state lookups do not have to search the history
+CREATE TABLE IF NOT EXISTS product_current (
+    migros_id VARCHAR(30) PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    brand VARCHAR(255),
+    title VARCHAR(255),
+    origin VARCHAR(255),
+    description TEXT,
+    ingredients TEXT,
+    nutrient_id INT,
+    offer_id INT,
+    gtins TEXT,
+    scraped_at TIMESTAMP NOT NULL
+);
+
+
+CREATE TABLE IF NOT EXISTS load_manifest (
+    file_name VARCHAR(100) PRIMARY KEY,
+    file_size BIGINT NOT NULL,
+    file_mtime_ns BIGINT NOT NULL,
+    loaded_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name VARCHAR(100) PRIMARY KEY,
+    applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
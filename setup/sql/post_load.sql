@@ -0,0 +1,18 @@
+-- Keys deferred by createdb_deferred.sql, built in one pass after the bulk
+-- load. The result matches the schema of createdb.sql; secondary indexes
+-- come from setup/index_catalog.py.
+SET maintenance_work_mem = '256MB';
+
+ALTER TABLE nutrients ADD PRIMARY KEY (id);
+
+ALTER TABLE offer ADD PRIMARY KEY (id);
+
+ALTER TABLE product
+    ADD CONSTRAINT pk_product PRIMARY KEY (migros_id, scraped_at),
+    ADD FOREIGN KEY (nutrient_id) REFERENCES nutrients(id),
+    ADD FOREIGN KEY (offer_id) REFERENCES offer(id);
+
+ALTER TABLE product_category
+    ADD PRIMARY KEY (product_id, scraped_at, category_id),
+    ADD FOREIGN KEY (product_id, scraped_at) REFERENCES product(migros_id, scraped_at),
+    ADD FOREIGN KEY (category_id) REFERENCES category(id);
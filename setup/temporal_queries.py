@@ -0,0 +1,142 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from psycopg2.extras import RealDictCursor
+
+# A snapshot with its offer, as returned by the PostgreSQL as-of queries
+SNAPSHOT_COLUMNS = """
+    p.migros_id, p.name, p.brand, p.title, p.origin, p.description,
+    p.ingredients, p.nutrient_id, p.offer_id, p.gtins, p.scraped_at,
+    o.price, o.unit_price, o.promotion_price
+"""
+
+
+class PostgresAsOf:
+    """Point-in-time lookups: the newest snapshot scraped at or before a time.
+
+    Every lookup is a backward scan of the (migros_id, scraped_at) primary
+    key that stops at the first row, so its cost does not grow with the
+    history kept.
+    """
+
+    @staticmethod
+    def product(conn, migros_id: str, as_of: datetime) -> Optional[Dict]:
+        """The product as it was at as_of, or None if it was not scraped yet."""
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                f"""
+                SELECT {SNAPSHOT_COLUMNS}
+                FROM product p
+                LEFT JOIN offer o ON p.offer_id = o.id
+                WHERE p.migros_id = %s AND p.scraped_at <= %s
+                ORDER BY p.scraped_at DESC
+                LIMIT 1
+                """,
+                (migros_id, as_of),
+            )
+            return cur.fetchone()
+
+    @staticmethod
+    def products(conn, migros_ids: Sequence[str], as_of: datetime) -> Dict[str, Dict]:
+        """Bulk variant in one round trip, keyed by migros_id.
+
+        Products not scraped yet at as_of are left out.
+        """
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                f"""
+                SELECT {SNAPSHOT_COLUMNS}
+                FROM unnest(%s::varchar[]) AS ids(migros_id)
+                CROSS JOIN LATERAL (
+                    SELECT * FROM product
+                    WHERE product.migros_id = ids.migros_id
+                    AND product.scraped_at <= %s
+                    ORDER BY product.scraped_at DESC
+                    LIMIT 1
+                ) p
+                LEFT JOIN offer o ON p.offer_id = o.id
+                """,
+                (list(migros_ids), as_of),
+            )
+            return {row["migros_id"]: row for row in cur.fetchall()}
+
+    @staticmethod
+    def category(conn, category_id: int, as_of: datetime) -> List[Dict]:
+        """Products whose snapshot at as_of was linked to the category."""
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                f"""
+                SELECT {SNAPSHOT_COLUMNS}
+                FROM (
+                    SELECT DISTINCT product_id FROM product_category
+                    WHERE category_id = %(category_id)s
+                    AND scraped_at <= %(as_of)s
+                ) ids
+                CROSS JOIN LATERAL (
+                    SELECT * FROM product
+                    WHERE product.migros_id = ids.product_id
+                    AND product.scraped_at <= %(as_of)s
+                    ORDER BY product.scraped_at DESC
+                    LIMIT 1
+                ) p
+                JOIN product_category pc ON (
+                    pc.product_id = p.migros_id
+                    AND pc.scraped_at = p.scraped_at
+                    AND pc.category_id = %(category_id)s
+                )
+                LEFT JOIN offer o ON p.offer_id = o.id
+                ORDER BY p.migros_id
+                """,
+                {"category_id": category_id, "as_of": as_of},
+            )
+            return cur.fetchall()
+
+
+class MongoAsOf:
+    """Point-in-time lookups over a MongoDB product snapshot collection.
+
+    Served by the (migrosId, scraped_at desc) product_key index.
+    """
+
+    def __init__(self, db, collection: str):
+        self.collection = db[collection]
+
+    def product(self, migros_id: str, as_of: datetime) -> Optional[Dict]:
+        """The product as it was at as_of, or None if it was not scraped yet."""
+        return self.collection.find_one(
+            {"migrosId": migros_id, "scraped_at": {"$lte": as_of}},
+            sort=[("scraped_at", -1)],
+        )
+
+    def products(self, migros_ids: Sequence[str], as_of: datetime) -> Dict[str, Dict]:
+        """Bulk variant in one aggregation, keyed by migrosId."""
+        pipeline = [
+            {
+                "$match": {
+                    "migrosId": {"$in": list(migros_ids)},
+                    "scraped_at": {"$lte": as_of},
+                }
+            },
+            # Sorted like the index, so $first reads one entry per product
+            {"$sort": {"migrosId": 1, "scraped_at": -1}},
+            {"$group": {"_id": "$migrosId", "snapshot": {"$first": "$$ROOT"}}},
+        ]
+        return {
+            result["_id"]: result["snapshot"]
+            for result in self.collection.aggregate(pipeline)
+        }
+
+    def category(self, category_id: int, as_of: datetime) -> List[Dict]:
+        """Products whose snapshot at as_of was linked to the category."""
+        candidates = self.collection.distinct(
+            "migrosId", {"categories.id": category_id, "scraped_at": {"$lte": as_of}}
+        )
+        snapshots = self.products(candidates, as_of)
+        return [
+            snapshots[migros_id]
+            for migros_id in sorted(snapshots)
+            if any(
+                category.get("id") == category_id
+                for category in snapshots[migros_id].get("categories", [])
+            )
+        ]
@@ -0,0 +1,110 @@
+import logging
+from datetime import datetime
+from typing import Iterable, List, Set
+
+from psycopg2 import sql
+
+from setup.postgresql_manager import PostgreSQLManager
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Range partitioned by scraped_at in createdb_partitioned.sql
+PARTITIONED_TABLES = ("product", "product_category")
+
+
+def month_start(timestamp: datetime) -> datetime:
+    """First instant of the month a snapshot falls into."""
+    return timestamp.replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0, tzinfo=None
+    )
+
+
+def next_month(month: datetime) -> datetime:
+    if month.month == 12:
+        return month.replace(year=month.year + 1, month=1)
+    return month.replace(month=month.month + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+class MonthlyPartitions:
+    """Creates the monthly scraped_at partitions a load needs, once per month.
+
+    Partitions are created over their own connection and committed before
+    the batch that needs them, so a rolled back batch never takes a
+    partition with it and the batch transaction never holds the parent lock.
+    """
+
+    def __init__(self, db_manager: PostgreSQLManager, dbname: str):
+        self.db_manager = db_manager
+        self.dbname = dbname
+        self.months: Set[datetime] = set()
+
+    def ensure(self, timestamps: Iterable[datetime]) -> List[datetime]:
+        """Create missing partitions for the timestamps; returns the new months."""
+        months = {month_start(t) for t in timestamps if t is not None} - self.months
+        if not months:
+            return []
+
+        with self.db_manager.connect(self.dbname) as conn:
+            with conn.cursor() as cur:
+                # Parallel loaders may need the same month at the same time
+                cur.execute(
+                    "SELECT pg_advisory_xact_lock(hashtext('scraped_at_partitions'))"
+                )
+                for month in sorted(months):
+                    for table in PARTITIONED_TABLES:
+                        cur.execute(
+                            sql.SQL(
+                                "CREATE TABLE IF NOT EXISTS {} PARTITION OF {} "
+                                "FOR VALUES FROM (%s) TO (%s)"
+                            ).format(
+                                sql.Identifier(partition_name(table, month)),
+                                sql.Identifier(table),
+                            ),
+                            (month, next_month(month)),
+                        )
+        conn.close()
+
+        self.months |= months
+        logger.info(
+            f"Ensured scraped_at partitions for "
+            f"{', '.join(f'{month:%Y-%m}' for month in sorted(months))}"
+        )
+        return sorted(months)
+
+
+def is_partitioned(db_manager: PostgreSQLManager, dbname: str) -> bool:
+    """Whether the database was created with the partitioned schema."""
+    with db_manager.connect(dbname) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT relkind FROM pg_class WHERE oid = to_regclass('product')"
+            )
+            row = cur.fetchone()
+    conn.close()
+    return row is not None and row[0] == "p"
+
+
+def list_partitions(db_manager: PostgreSQLManager, dbname: str, table: str):
+    """Names of the partitions attached to a table, oldest first."""
+    with db_manager.connect(dbname) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = %s::regclass
+                ORDER BY c.relname
+                """,
+                (table,),
+            )
+            names = [row[0] for row in cur.fetchall()]
+    conn.close()
+    return names
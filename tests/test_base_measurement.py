@@ -0,0 +1,78 @@
+from measurements.performance_tests import SimpleCountTest
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakePool:
+    def __init__(self):
+        self.connection = FakeConnection()
+        self.returned = []
+        self.closed = False
+
+    def getconn(self):
+        return self.connection
+
+    def putconn(self, conn, close=False):
+        self.returned.append((conn, close))
+
+    def closeall(self):
+        self.closed = True
+
+
+def test_postgres_connection_is_borrowed_and_returned():
+    measurement = SimpleCountTest()
+    pool = measurement.postgres_pool = FakePool()
+
+    with measurement.postgres_connection() as conn:
+        assert conn is pool.connection
+
+    assert conn.rollbacks == 1
+    assert pool.returned == [(conn, False)]
+
+    measurement.close_connections()
+    assert pool.closed
+    assert measurement.postgres_pool is None
+
+
+def test_open_connections_keeps_open_connections():
+    measurement = SimpleCountTest()
+    pool = measurement.postgres_pool = FakePool()
+    measurement.mongo_manager.db = {"products": None}
+
+    measurement.open_connections()
+
+    assert measurement.postgres_pool is pool
+    assert measurement.mongo_db == {"products": None}
+
+
+class FakeCategories:
+    def __init__(self, names):
+        self.names = names
+
+    def distinct(self, key, query):
+        pattern = query[key]
+        assert pattern["$options"] == "i"
+        return [name for name in self.names if pattern["$regex"] in name.lower()]
+
+
+class FakeMongoDatabase:
+    def __init__(self, categories):
+        self.categories = categories
+
+
+def test_mongo_category_filter_matches_exact_category_names():
+    measurement = SimpleCountTest()
+    measurement.mongo_manager.db = FakeMongoDatabase(
+        FakeCategories(["Dairy & eggs", "Non-dairy drinks", "Snacks"])
+    )
+
+    query = measurement.mongo_category_filter("dairy")
+
+    assert query == {"categories.name": {"$in": ["Dairy & eggs", "Non-dairy drinks"]}}
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from setup.bulk_copy import format_copy_value, to_int
+
+
+def test_format_copy_value_escapes_text_format():
+    assert format_copy_value(None) == "\\N"
+    assert format_copy_value("a\tb\nc\\d\r") == "a\\tb\\nc\\\\d\\r"
+    assert format_copy_value(0.17) == "0.17"
+    assert format_copy_value(True) == "t"
+    assert format_copy_value(datetime(2024, 9, 26, 12, 21, 23)) == "2024-09-26 12:21:23"
+
+
+def test_to_int_rounds_like_an_insert_cast():
+    assert to_int(567.0) == 567
+    assert to_int(2.5) == 3
+    assert to_int(-2.5) == -3
+    assert to_int(None) is None
+    assert to_int(100) == 100
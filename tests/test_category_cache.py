@@ -0,0 +1,34 @@
+from setup.category_cache import CategoryCache
+
+CATEGORIES = [
+    {"id": 10034619, "name": "CoffeeB", "slug": "coffeeb", "path": "/DS/CoffeeB"},
+    {"id": 7494736, "name": "Chocolate", "slug": "chocolate", "path": "/DS/Choc"},
+]
+
+
+def test_resolve_id_normalizes_breadcrumb_strings():
+    cache = CategoryCache(CATEGORIES)
+    assert cache.resolve_id("7494736") == 7494736
+    assert "10034619" in cache
+    assert cache.resolve_id("123") is None
+
+
+def test_mongo_category_prefers_slug_then_id():
+    cache = CategoryCache(CATEGORIES)
+    assert cache.mongo_category("0", "coffeeb")["id"] == 10034619
+    assert cache.mongo_category("7494736", "renamed")["slug"] == "chocolate"
+    assert cache.mongo_category("999", "unknown") is None
+
+
+def test_missing_categories_are_reported_once(caplog):
+    cache = CategoryCache(CATEGORIES)
+    for _ in range(3):
+        cache.resolve_id("999")
+    cache.resolve_id("998")
+
+    cache.report_missing("test")
+    assert "4 links to 2 unknown categories" in caplog.text
+
+    caplog.clear()
+    cache.report_missing("test")
+    assert caplog.text == ""
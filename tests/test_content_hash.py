@@ -0,0 +1,46 @@
+from decimal import Decimal
+
+from models.content_hash import content_hash, rounded
+from models.nutrition import Nutrition
+from models.offer import Offer
+from setup.content_hash_cache import ContentHashCache
+
+
+def test_numbers_hash_by_value():
+    assert content_hash(7.2, 100.0, "400g") == content_hash(
+        Decimal("7.20"), 100, "400g"
+    )
+    assert content_hash("12.0", None) == content_hash(12.0, None)
+    assert content_hash(7.2) != content_hash(7.21)
+    assert content_hash(None) != content_hash("")
+
+
+def test_rounded_matches_numeric_columns():
+    assert rounded(1.805, 2) == Decimal("1.81")
+    assert rounded(2.5, 0) == Decimal("3")
+    assert rounded(7.2, 2) == 7.2
+    assert rounded(None, 2) is None
+
+
+def test_loaded_and_stored_rows_hash_alike():
+    loaded = Offer(price=7.2, quantity="400g", unit_price=7.2 * 100 / 400)
+    stored = Offer(price=Decimal("7.20"), quantity="400g", unit_price=Decimal("1.80"))
+    assert loaded.content_hash() == stored.content_hash()
+
+    loaded = Nutrition(unit="g", quantity=100, kcal=567.4, kJ=2372.0, fat=35.0)
+    stored = Nutrition(unit="g", quantity=100, kcal=567, kJ=2372, fat="35.0")
+    assert loaded.content_hash() == stored.content_hash()
+
+
+def test_cache_only_keeps_committed_ids():
+    cache = ContentHashCache()
+    cache.stage("offer", "a", 1)
+    assert cache.get("offer", "a") == 1
+    cache.rollback()
+    assert cache.get("offer", "a") is None
+
+    cache.stage("offer", "a", 2)
+    cache.commit()
+    assert cache.get("offer", "a") == 2
+    assert cache.get("nutrients", "a") is None
+    assert len(cache) == 1
@@ -0,0 +1,144 @@
+import json
+import os
+import types
+
+import pytest
+
+from setup.dataloader import DataLoader
+from setup.snapshot_archive import (
+    SnapshotArchive,
+    archive_is_stale,
+    archive_path_for,
+)
+from setup.snapshot_index import SnapshotIndex
+
+
+@pytest.fixture
+def product_folder(tmp_path):
+    """Fixture to create a folder with a few product snapshot files."""
+    snapshots = [
+        ("100100300000", "2024-09-16T15:15:05"),
+        ("100100300000", "2024-09-26T12:21:23"),
+        ("100124900000", "2024-10-05T19:23:58"),
+    ]
+    for migros_id, date_added in snapshots:
+        document = {"migrosId": migros_id, "dateAdded": date_added}
+        path = tmp_path / f"{migros_id}-{date_added}.json"
+        path.write_text(json.dumps(document), encoding="utf-8")
+
+    # Invalid files that must be skipped
+    (tmp_path / "broken-2024-10-01T00:00:00.json").write_text("{", encoding="utf-8")
+    (tmp_path / "list-2024-10-01T00:00:00.json").write_text("[]", encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+    return tmp_path
+
+
+def test_iter_documents_is_lazy(product_folder):
+    documents = DataLoader.iter_documents_from_folder(str(product_folder))
+    assert isinstance(documents, types.GeneratorType)
+    assert len(list(documents)) == 3
+
+
+def test_load_documents_matches_iterator(product_folder):
+    loaded = DataLoader.load_documents_from_folder(str(product_folder))
+    streamed = list(DataLoader.iter_documents_from_folder(str(product_folder)))
+    assert sorted(d["dateAdded"] for d in loaded) == sorted(
+        d["dateAdded"] for d in streamed
+    )
+
+
+def test_iter_batches_respects_batch_size(product_folder):
+    batches = list(DataLoader.iter_batches_from_folder(str(product_folder), 2))
+    assert [len(batch) for batch in batches] == [2, 1]
+
+
+def test_missing_folder_yields_nothing(tmp_path):
+    assert list(DataLoader.iter_documents_from_folder(str(tmp_path / "nope"))) == []
+
+
+def test_parallel_loading_preserves_order(product_folder):
+    sequential = list(DataLoader.iter_documents_from_folder(str(product_folder)))
+    parallel = list(
+        DataLoader.iter_documents_from_folder(
+            str(product_folder), workers=2, chunk_size=1
+        )
+    )
+    assert parallel == sequential
+
+
+def test_archive_roundtrip_and_random_access(product_folder, tmp_path):
+    archive_path = str(tmp_path / "product.pack")
+    assert SnapshotArchive.pack_folder(str(product_folder), archive_path) == 3
+    # Re-packing only appends new records
+    assert SnapshotArchive.pack_folder(str(product_folder), archive_path) == 0
+
+    with SnapshotArchive(archive_path) as archive:
+        assert len(archive) == 3
+        snapshot = archive.get("100100300000", "2024-09-26T12:21:23")
+        assert snapshot["dateAdded"] == "2024-09-26T12:21:23"
+        assert archive.get("missing") is None
+        assert len(list(archive.iter_documents(limit=2))) == 2
+
+
+def test_loader_prefers_archive_when_present(product_folder, tmp_path):
+    folder = str(product_folder)
+    SnapshotArchive.pack_folder(folder, archive_path_for(folder))
+    for path in product_folder.glob("*.json"):
+        path.unlink()
+
+    documents = list(DataLoader.iter_documents_from_folder(folder))
+    assert len(documents) == 3
+    assert list(DataLoader.iter_documents_from_folder(folder, use_archive=False)) == []
+
+
+def test_stale_archive_falls_back_to_folder(product_folder):
+    folder = str(product_folder)
+    archive_path = archive_path_for(folder)
+    os.utime(folder, (0, 0))  # so the added file surely changes the folder time
+    SnapshotArchive.pack_folder(folder, archive_path)
+    # The invalid files were not packed, but do not make the archive stale
+    assert not archive_is_stale(folder, archive_path)
+    assert DataLoader.snapshot_index(folder).archive_path == archive_path
+
+    added = product_folder / "100124900000-2024-10-06T08:00:00.json"
+    added.write_text(
+        json.dumps({"migrosId": "100124900000", "dateAdded": "2024-10-06T08:00:00"}),
+        encoding="utf-8",
+    )
+    assert archive_is_stale(folder, archive_path)
+
+    documents = list(DataLoader.iter_documents_from_folder(folder))
+    assert len(documents) == 4
+    index = DataLoader.snapshot_index(folder)
+    assert index.archive_path is None
+    assert len(index) == 6  # the folder index lists the invalid files too
+
+
+def test_index_from_archive_reads_archive_without_rechecking(product_folder):
+    folder = str(product_folder)
+    SnapshotArchive.pack_folder(folder, archive_path_for(folder))
+    index = DataLoader.snapshot_index(folder).latest_only()
+    for path in product_folder.glob("*.json"):
+        path.unlink()
+    for i in range(6):  # makes the archive stale, but the index already chose it
+        (product_folder / f"new-{i}.json").write_text("{}", encoding="utf-8")
+
+    documents = list(DataLoader.iter_documents_from_index(index))
+    assert {d["dateAdded"] for d in documents} == {
+        "2024-09-26T12:21:23",
+        "2024-10-05T19:23:58",
+    }
+
+
+def test_iter_documents_from_index_only_opens_selected(product_folder):
+    index = SnapshotIndex.from_folder(str(product_folder)).latest_only()
+    documents = list(DataLoader.iter_documents_from_index(index))
+    # The broken files each form their own "product" and are selected too
+    assert {d["dateAdded"] for d in documents} == {
+        "2024-09-26T12:21:23",
+        "2024-10-05T19:23:58",
+    }
+
+    subset = index.for_products(["100124900000"])
+    documents = list(DataLoader.iter_documents_from_index(subset))
+    assert [d["migrosId"] for d in documents] == ["100124900000"]
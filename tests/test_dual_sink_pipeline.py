@@ -0,0 +1,51 @@
+from setup import dual_sink_pipeline
+from setup.dual_sink_pipeline import DualSinkPipeline
+from setup.reject_log import RejectLog
+
+
+class FakeCollection:
+    def __init__(self):
+        self.requests = []
+
+    def bulk_write(self, requests, ordered=True):
+        self.requests.extend(requests)
+
+
+class FakeMongoDBManager:
+    def __init__(self):
+        self.manifest = FakeCollection()
+        self.db = {dual_sink_pipeline.config.MONGO_MANIFEST_COLLECTION: self.manifest}
+
+    def insert_batch(self, collection, documents, batch_size):
+        return len(documents)
+
+    def upsert_latest(self, *args):
+        pass
+
+
+def test_mongo_transform_failure_is_rejected_and_counted(tmp_path, monkeypatch):
+    monkeypatch.setattr(dual_sink_pipeline.config, "MONGO_BUCKET_HISTORY", False)
+    pipeline = DualSinkPipeline()
+    pipeline.reject_log = RejectLog(str(tmp_path / "rejects.jsonl"))
+    pipeline.mongo_manager = FakeMongoDBManager()
+    pipeline.fingerprints = {"1-a.json": (1, 1), "2-b.json": (2, 2)}
+
+    def process_product(document, categories):
+        if document["migrosId"] == "2":
+            raise ValueError("bad offer")
+        return {"migrosId": document["migrosId"]}
+
+    monkeypatch.setattr(
+        dual_sink_pipeline.MongoProductProcessor, "process_product", process_product
+    )
+    batch = [
+        {"migrosId": "1", "dateAdded": "a"},
+        {"migrosId": "2", "dateAdded": "b"},
+    ]
+
+    assert pipeline._write_mongo(iter([batch])) == (1, 1)
+    [reject] = pipeline.reject_log.read()
+    assert (reject["file_name"], reject["stage"]) == ("2-b.json", "mongo_transform")
+    # Only the stored snapshot is recorded in the manifest
+    [record] = pipeline.mongo_manager.manifest.requests
+    assert record._filter == {"_id": "1-a.json"}
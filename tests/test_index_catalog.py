@@ -0,0 +1,40 @@
+from setup.index_catalog import MONGO_INDEXES, POSTGRES_INDEXES
+from setup.mongodb_manager import MongoDBManager
+
+
+class FakeCollection:
+    def __init__(self, names):
+        self.names = set(names)
+        self.dropped = []
+
+    def index_information(self):
+        return {name: {} for name in self.names | {"_id_"}}
+
+    def drop_index(self, name):
+        self.dropped.append(name)
+        self.names.discard(name)
+
+
+class FakeDatabase(dict):
+    def list_collection_names(self):
+        return list(self)
+
+
+def test_catalog_names_are_unique():
+    names = [index.name for index in POSTGRES_INDEXES] + [
+        index.document["name"]
+        for indexes in MONGO_INDEXES.values()
+        for index in indexes
+    ]
+    assert len(names) == len(set(names))
+
+
+def test_drop_index_catalog_keeps_unique_keys():
+    manager = MongoDBManager("mongodb://unused", "productdb")
+    products = FakeCollection(["product_key", "category_id", "price_protein"])
+    manager.db = FakeDatabase(products=products)
+
+    manager.drop_index_catalog()
+
+    assert sorted(products.dropped) == ["category_id", "price_protein"]
+    assert products.names == {"product_key"}
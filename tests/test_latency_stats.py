@@ -0,0 +1,100 @@
+import pytest
+
+from measurements.base_measurement import BaseMeasurement, MeasurementResult
+from measurements.latency_stats import mann_whitney_u, percentile, summarize
+
+
+def test_percentile_interpolates():
+    samples = [0.4, 0.1, 0.3, 0.2]
+    assert percentile(samples, 50) == pytest.approx(0.25)
+    assert percentile(samples, 0) == 0.1
+    assert percentile(samples, 100) == 0.4
+
+
+def test_summarize():
+    stats = summarize([1.0, 2.0, 3.0])
+    assert stats["min"] == 1.0
+    assert stats["p50"] == 2.0
+    assert stats["stdev"] == pytest.approx(1.0)
+    assert summarize([]) == {}
+
+
+def test_mann_whitney_exact_small_samples():
+    # 1 of the 20 orderings is this extreme on each side
+    assert mann_whitney_u([1, 2, 3], [4, 5, 6]) == pytest.approx(0.1)
+    assert mann_whitney_u([1, 2, 3], [1, 2, 3]) == pytest.approx(1.0)
+
+
+def test_winner_requires_significant_difference():
+    separated = MeasurementResult(
+        "test",
+        0.01,
+        0.02,
+        None,
+        None,
+        mongodb_samples=[0.010 + i / 1000 for i in range(8)],
+        postgresql_samples=[0.020 + i / 1000 for i in range(8)],
+    )
+    assert separated.winner == "MongoDB"
+
+    overlapping = MeasurementResult(
+        "test",
+        0.011,
+        0.012,
+        None,
+        None,
+        mongodb_samples=[0.010, 0.013, 0.011],
+        postgresql_samples=[0.012, 0.010, 0.014],
+    )
+    assert overlapping.winner == "Inconclusive"
+
+
+def test_winner_follows_ranks_not_means():
+    # MongoDB is faster on 9 of 10 runs; one outlier drags its mean above
+    skewed = MeasurementResult(
+        "test",
+        0.0109,
+        0.002,
+        None,
+        None,
+        mongodb_samples=[0.001] * 9 + [0.1],
+        postgresql_samples=[0.002] * 10,
+    )
+    assert skewed.mongodb_time > skewed.postgresql_time
+    assert skewed.p_value < 0.05
+    assert skewed.winner == "MongoDB"
+
+
+class FlakyMeasurement(BaseMeasurement):
+    def __init__(self, failing_runs):
+        super().__init__()
+        self.failing_runs = failing_runs
+        self.runs = 0
+
+    def prepare(self):
+        pass
+
+    def run_mongodb_test(self):
+        self.runs += 1
+        if self.runs in self.failing_runs:
+            raise RuntimeError(f"run {self.runs} failed")
+        return self.runs
+
+    def run_postgresql_test(self):
+        raise RuntimeError("unreachable")
+
+
+def test_sample_keeps_partial_samples_and_counts_errors():
+    measurement = FlakyMeasurement(failing_runs={3, 5})
+    result, samples, error, errors = measurement._sample(
+        "MongoDB", measurement.run_mongodb_test, iterations=5, warmup=1
+    )
+    assert result == 2  # first timed run, after the warmup
+    assert len(samples) == 3
+    assert (error, errors) == ("run 5 failed", 2)
+
+    # a test failing on its first attempt is not retried
+    result, samples, error, errors = measurement._sample(
+        "PostgreSQL", measurement.run_postgresql_test, iterations=5, warmup=1
+    )
+    assert (result, samples, error, errors) == (None, [], "unreachable", 5)
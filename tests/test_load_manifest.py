@@ -0,0 +1,111 @@
+import os
+import shutil
+
+import psycopg2
+import pytest
+
+from setup import save_to_local_sql
+from setup.load_manifest import (
+    PostgresLoadManifest,
+    fingerprint_index,
+    pending_snapshots,
+    snapshot_file_name,
+)
+from setup.postgresql_manager import PostgreSQLManager
+from setup.snapshot_index import SnapshotIndex
+
+
+def test_snapshot_file_name():
+    document = {"migrosId": "100100300000", "dateAdded": "2024-09-16T15:15:05"}
+    assert snapshot_file_name(document) == "100100300000-2024-09-16T15:15:05.json"
+
+
+def test_pending_snapshots_skips_ingested_files(tmp_path):
+    for name in [
+        "100100300000-2024-09-16T15:15:05.json",
+        "100100300000-2024-09-26T12:21:23.json",
+        "100124900000-2024-10-05T19:23:58.json",
+    ]:
+        (tmp_path / name).write_text("{}", encoding="utf-8")
+
+    index = SnapshotIndex.from_folder(str(tmp_path))
+    fingerprints = fingerprint_index(index)
+    loaded = {
+        "100100300000-2024-09-16T15:15:05.json": fingerprints[
+            "100100300000-2024-09-16T15:15:05.json"
+        ],
+        # Changed since ingestion: reported, not re-ingested
+        "100100300000-2024-09-26T12:21:23.json": (0, 0),
+    }
+
+    pending = pending_snapshots(index, fingerprints, loaded)
+    assert [os.path.basename(p) for p in pending.paths()] == [
+        "100124900000-2024-10-05T19:23:58.json"
+    ]
+
+
+def test_pending_snapshots_skips_files_deleted_after_indexing(tmp_path):
+    for name in [
+        "100100300000-2024-09-16T15:15:05.json",
+        "100124900000-2024-10-05T19:23:58.json",
+    ]:
+        (tmp_path / name).write_text("{}", encoding="utf-8")
+    index = SnapshotIndex.from_folder(str(tmp_path))
+    (tmp_path / "100100300000-2024-09-16T15:15:05.json").unlink()
+
+    pending = pending_snapshots(index, fingerprint_index(index), {})
+    assert [os.path.basename(p) for p in pending.paths()] == [
+        "100124900000-2024-10-05T19:23:58.json"
+    ]
+
+
+def _postgres_available(config):
+    try:
+        psycopg2.connect(
+            dbname=config.PG_DEFAULT_DB_NAME,
+            user=config.PG_DB_USER,
+            password=config.PG_DB_PASSWORD,
+            host=config.PG_DB_HOST,
+            port=config.PG_DB_PORT,
+            connect_timeout=2,
+        ).close()
+        return True
+    except psycopg2.OperationalError:
+        return False
+
+
+@pytest.mark.parametrize("bulk_load", [False, True])
+def test_full_load_then_incremental_load_ingests_nothing(
+    tmp_path, monkeypatch, bulk_load
+):
+    config = save_to_local_sql.config
+    if not _postgres_available(config):
+        pytest.skip("PostgreSQL is not available")
+
+    products = tmp_path / "product"
+    shutil.copytree(os.path.join(os.path.dirname(__file__), "data"), products)
+    (tmp_path / "categorie").mkdir()
+    monkeypatch.setattr(config, "PG_DB_NAME", "test_load_manifest")
+    monkeypatch.setattr(config, "PRODUCTS_PATH", str(products))
+    monkeypatch.setattr(config, "CATEGORIES_PATH", str(tmp_path / "categorie"))
+    monkeypatch.setattr(config, "REJECT_FILE", str(tmp_path / "rejects.jsonl"))
+    options = dict(bulk_load=bulk_load, parallel_workers=1, partitioned=False)
+
+    save_to_local_sql.create_sql_db(**options)
+    save_to_local_sql.create_sql_db(incremental=True, **options)
+
+    db_manager = PostgreSQLManager(config)
+    try:
+        with db_manager.connect(config.PG_DB_NAME) as conn:
+            assert len(PostgresLoadManifest.fetch(conn)) == 2
+            with conn.cursor() as cur:
+                cur.execute("SELECT COUNT(*) FROM product")
+                assert cur.fetchone()[0] == 2
+        conn.close()
+        assert not (tmp_path / "rejects.jsonl").exists()
+    finally:
+        conn = db_manager.connect(config.PG_DEFAULT_DB_NAME)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("DROP DATABASE IF EXISTS test_load_manifest")
+        conn.close()
@@ -0,0 +1,50 @@
+import pytest
+
+from measurements.base_measurement import BaseMeasurement
+from measurements.load_tests import LoadResult, _quotas, run_load
+
+
+class FlakyTest(BaseMeasurement):
+    """Every third PostgreSQL request fails; no database is contacted."""
+
+    def open_connections(self):
+        self.calls = 0
+
+    def close_connections(self):
+        pass
+
+    def run_mongodb_test(self):
+        return None
+
+    def run_postgresql_test(self):
+        self.calls += 1
+        if self.calls % 3 == 0:
+            raise RuntimeError("timeout")
+
+
+def test_quotas_spread_requests_over_workers():
+    assert _quotas(10, 4) == [3, 3, 2, 2]
+    assert _quotas(None, 2) == [None, None]
+
+
+def test_run_load_counts_requests_and_errors():
+    # One worker: the warmup call is 1, then calls 2..7 of which 3 and 6 fail
+    result = run_load(FlakyTest, "PostgreSQL", 1, requests=6)
+
+    assert result.requests == 6
+    assert result.errors == 2
+    assert result.error_rate == pytest.approx(1 / 3)
+    assert result.last_error == "timeout"
+    assert result.qps > 0
+
+
+def test_run_load_requires_a_stop_condition():
+    with pytest.raises(ValueError):
+        run_load(FlakyTest, "PostgreSQL", 1)
+
+
+def test_load_result_without_requests():
+    result = LoadResult("test", "MongoDB", "thread", 4, elapsed=0.0)
+    assert result.qps == 0.0
+    assert result.error_rate == 0.0
+    assert result.stats == {}
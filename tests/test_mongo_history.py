@@ -0,0 +1,189 @@
+import functools
+import random
+import threading
+import time
+
+import setup.mongo_pipeline
+from setup.category_cache import CategoryCache
+from setup.mongo_history import BucketHistory, append_to_buckets, bucket_updates
+from setup.mongo_pipeline import MongoIngestPipeline
+
+
+def snapshot(migros_id, scraped_at, price):
+    return {
+        "_id": f"{migros_id}-{scraped_at}",
+        "migrosId": migros_id,
+        "name": "Milk",
+        "scraped_at": scraped_at,
+        "offer": {"price": price},
+    }
+
+
+def test_bucket_updates_close_full_bucket_then_append_to_open_one():
+    documents = [snapshot("1", t, float(t)) for t in (3, 1, 2)] + [snapshot("2", 1, 9)]
+
+    requests = bucket_updates(documents, bucket_size=2)
+
+    closes, appends = requests[::2], requests[1::2]
+    assert [r._filter for r in closes] == [
+        {"migrosId": "1", "open": True, "snapshot_count": {"$gt": 0}},
+        {"migrosId": "1", "open": True, "snapshot_count": {"$gt": 1}},
+        {"migrosId": "2", "open": True, "snapshot_count": {"$gt": 1}},
+    ]
+    assert all(r._doc == {"$set": {"open": False}} for r in closes)
+    assert not any(r._upsert for r in closes)
+    assert [r._filter for r in appends] == [
+        {"migrosId": "1", "open": True},
+        {"migrosId": "1", "open": True},
+        {"migrosId": "2", "open": True},
+    ]
+    first = appends[0]._doc
+    assert first["$push"]["snapshots"] == {
+        "$each": [
+            {"scraped_at": 1, "offer": {"price": 1.0}},
+            {"scraped_at": 2, "offer": {"price": 2.0}},
+        ],
+        "$sort": {"scraped_at": 1},
+    }
+    assert first["$inc"] == {"snapshot_count": 2}
+    assert first["$min"] == {"first_scraped_at": 1}
+    assert first["$max"] == {"last_scraped_at": 2}
+    assert first["$set"] == {"name": "Milk"}
+    assert all(r._upsert for r in appends)
+
+
+class FakeCollection:
+    def __init__(self, bucket):
+        self.bucket = bucket
+
+    def find_one(self, query, projection, sort):
+        return dict(self.bucket)
+
+
+def test_current_merges_newest_snapshot_with_static_fields():
+    bucket = {
+        "migrosId": "1",
+        "name": "Milk",
+        "snapshots": [{"scraped_at": 3, "offer": {"price": 3.0}}],
+    }
+    history = BucketHistory({"product_history": FakeCollection(bucket)})
+
+    assert history.current("1") == {
+        "migrosId": "1",
+        "name": "Milk",
+        "scraped_at": 3,
+        "offer": {"price": 3.0},
+    }
+
+
+class FakeBucketCollection:
+    """Applies the bucket updates in memory, as MongoDB would."""
+
+    def __init__(self):
+        self.buckets = []
+
+    def _matches(self, bucket, query):
+        for field, condition in query.items():
+            if isinstance(condition, dict):
+                if not bucket.get(field, 0) > condition["$gt"]:
+                    return False
+            elif bucket.get(field) != condition:
+                return False
+        return True
+
+    def bulk_write(self, requests, ordered):
+        for request in requests:
+            query, update = request._filter, request._doc
+            bucket = next((b for b in self.buckets if self._matches(b, query)), None)
+            if bucket is None:
+                if not request._upsert:
+                    continue
+                bucket = dict(query)
+                self.buckets.append(bucket)
+            bucket.update(update.get("$set", {}))
+            for field, amount in update.get("$inc", {}).items():
+                bucket[field] = bucket.get(field, 0) + amount
+            for field, value in update.get("$min", {}).items():
+                bucket[field] = min(bucket.get(field, value), value)
+            for field, value in update.get("$max", {}).items():
+                bucket[field] = max(bucket.get(field, value), value)
+            for field, push in update.get("$push", {}).items():
+                values = bucket.get(field, []) + push["$each"]
+                bucket[field] = sorted(values, key=lambda v: v["scraped_at"])
+
+    def find_one(self, query, projection, sort):
+        buckets = [b for b in self.buckets if self._matches(b, query)]
+        if not buckets:
+            return None
+        bucket = dict(max(buckets, key=lambda b: b["last_scraped_at"]))
+        bucket["snapshots"] = bucket["snapshots"][-1:]
+        return bucket
+
+
+class FakeBucketManager:
+    def __init__(self):
+        self.db = {"product_history": FakeBucketCollection()}
+
+
+def test_current_reflects_a_rename_inside_one_bucket():
+    manager = FakeBucketManager()
+    append_to_buckets(manager, "product_history", [snapshot("1", 1, 2.0)], 5)
+    renamed = dict(snapshot("1", 2, 2.5), name="Whole milk")
+    append_to_buckets(manager, "product_history", [renamed], 5)
+
+    assert len(manager.db["product_history"].buckets) == 1
+    current = BucketHistory(manager.db).current("1")
+    assert current["name"] == "Whole milk"
+    assert current["offer"] == {"price": 2.5}
+
+
+class SlowInsertManager(FakeBucketManager):
+    """Inserts take random time, so insert threads finish out of order."""
+
+    def __init__(self):
+        super().__init__()
+        self.random = random.Random(0)
+        self.lock = threading.Lock()
+
+    def insert_batch(self, collection, documents, batch_size=1000):
+        with self.lock:
+            delay = self.random.uniform(0, 0.01)
+        time.sleep(delay)
+        return len(documents)
+
+
+def test_pipeline_appends_history_in_read_order(monkeypatch):
+    monkeypatch.setattr(
+        setup.mongo_pipeline,
+        "append_to_buckets",
+        functools.partial(append_to_buckets, bucket_size=3),
+    )
+    manager = SlowInsertManager()
+    documents = [snapshot(str(p), t, float(t)) for p in range(3) for t in range(20)]
+    documents.sort(key=lambda document: document["scraped_at"])
+
+    pipeline = MongoIngestPipeline(
+        manager,
+        CategoryCache([]),
+        lambda document, categories: document,
+        batch_size=4,
+        queue_size=2,
+        insert_workers=3,
+        history_collection="product_history",
+    )
+    pipeline.run(iter(documents), "products")
+
+    buckets = manager.db["product_history"].buckets
+    assert sum(b["snapshot_count"] for b in buckets) == len(documents)
+    for migros_id in ("0", "1", "2"):
+        ranges = sorted(
+            (b["first_scraped_at"], b["last_scraped_at"])
+            for b in buckets
+            if b["migrosId"] == migros_id
+        )
+        # Bucket time ranges never overlap
+        assert all(
+            previous[1] < following[0]
+            for previous, following in zip(ranges, ranges[1:])
+        )
+    assert all(b["snapshot_count"] <= 3 for b in buckets)
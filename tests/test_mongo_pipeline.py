@@ -0,0 +1,56 @@
+import copy
+import threading
+
+from setup.category_cache import CategoryCache
+from setup.dataloader import DataLoader
+from setup.mongo_pipeline import MongoIngestPipeline
+from setup.save_to_local_mongo import ProductProcessor
+
+
+class FakeMongoManager:
+    """Collects inserted documents instead of talking to MongoDB."""
+
+    def __init__(self):
+        self.inserted = []
+        self.lock = threading.Lock()
+
+    def insert_batch(self, collection, documents, batch_size=1000):
+        with self.lock:
+            self.inserted.extend(documents)
+        return len(documents)
+
+
+def _documents(copies):
+    originals = DataLoader.load_documents_from_folder("tests/data/")
+    documents = []
+    for i in range(copies):
+        for original in originals:
+            document = copy.deepcopy(original)
+            document["migrosId"] = f"{original['migrosId']}{i}"
+            documents.append(document)
+    return documents
+
+
+def test_pipeline_inserts_every_transformed_document():
+    manager = FakeMongoManager()
+    recorded = []
+    documents = _documents(25)
+    broken = dict(documents[3], dateAdded=12345)  # not a string, cannot be parsed
+    documents[3] = broken
+
+    pipeline = MongoIngestPipeline(
+        manager,
+        CategoryCache([]),
+        ProductProcessor.process_product,
+        batch_size=7,
+        queue_size=2,
+        transform_threads=3,
+        insert_workers=2,
+        on_inserted=recorded.extend,
+    )
+    counts = pipeline.run(iter(documents), "products")
+
+    assert counts == {"read": 50, "inserted": 49, "failed": 1}
+    expected = {d["migrosId"] for d in documents if d is not broken}
+    assert {d["migrosId"] for d in manager.inserted} == expected
+    assert len(recorded) == 49
@@ -0,0 +1,66 @@
+from pymongo import ReplaceOne
+from pymongo.results import BulkWriteResult
+
+from setup.mongodb_manager import MongoDBManager
+
+
+class FakeCollection:
+    def __init__(self):
+        self.calls = []
+
+    def bulk_write(self, requests, ordered=True):
+        self.calls.append((requests, ordered))
+        return BulkWriteResult(
+            {"nUpserted": len(requests) - 1, "nMatched": 1, "upserted": []}, True
+        )
+
+
+def test_upsert_batch_replaces_on_key_unordered():
+    manager = MongoDBManager("mongodb://unused", "productdb")
+    collection = FakeCollection()
+    manager.db = {"products": collection}
+    documents = [
+        {"_id": "old", "migrosId": "1", "scraped_at": "t1", "name": "a"},
+        {"migrosId": "2", "scraped_at": "t2", "name": "b"},
+        {"migrosId": "3", "scraped_at": "t3", "name": "c"},
+    ]
+
+    written = manager.upsert_batch(
+        "products", documents, ("migrosId", "scraped_at"), batch_size=2
+    )
+
+    assert written == 3
+    assert [ordered for _, ordered in collection.calls] == [False, False]
+    first = collection.calls[0][0][0]
+    assert first == ReplaceOne(
+        {"migrosId": "1", "scraped_at": "t1"},
+        {"migrosId": "1", "scraped_at": "t1", "name": "a"},
+        upsert=True,
+    )
+
+
+def test_upsert_latest_sends_newest_document_per_key():
+    manager = MongoDBManager("mongodb://unused", "productdb")
+    collection = FakeCollection()
+    manager.db = {"products_current": collection}
+    documents = [
+        {"_id": "a", "migrosId": "1", "scraped_at": 2, "name": "new"},
+        {"_id": "b", "migrosId": "1", "scraped_at": 1, "name": "old"},
+        {"_id": "c", "migrosId": "2", "scraped_at": 1, "name": "other"},
+    ]
+
+    manager.upsert_latest(
+        "products_current", documents, "migrosId", "scraped_at", batch_size=10
+    )
+
+    ((requests, ordered),) = collection.calls
+    assert not ordered
+    assert [request._filter for request in requests] == [
+        {"migrosId": "1"},
+        {"migrosId": "2"},
+    ]
+    stage = requests[0]._doc[0]["$replaceWith"]["$cond"]
+    assert stage[1]["$mergeObjects"][1] == {
+        "$literal": {"migrosId": "1", "scraped_at": 2, "name": "new"}
+    }
+    assert stage[2] == "$$ROOT"
@@ -0,0 +1,22 @@
+import logging
+
+from measurements.query_tests import AsOfProductTest, _per_database
+
+
+def test_targets_come_from_each_database(caplog):
+    measurement = AsOfProductTest()
+
+    def lookup(measurement, database):
+        if database == "MongoDB":
+            raise ConnectionError("no MongoDB")
+        return "100100300000"
+
+    assert _per_database(measurement, lookup) == {
+        "MongoDB": None,
+        "PostgreSQL": "100100300000",
+    }
+
+    with caplog.at_level(logging.WARNING):
+        targets = _per_database(measurement, lambda _, database: database)
+    assert targets == {"MongoDB": "MongoDB", "PostgreSQL": "PostgreSQL"}
+    assert "different loads" in caplog.text
@@ -0,0 +1,66 @@
+from models.product import Product
+from setup.reject_log import RejectLog
+from setup.save_to_local_sql import PreparedProduct, ProductProcessor
+
+
+class FakeConnection:
+    """Records committed products; a batch containing a bad product fails."""
+
+    def __init__(self):
+        self.pending = []
+        self.committed = []
+        self.commits = 0
+
+    def commit(self):
+        self.committed.extend(self.pending)
+        self.pending = []
+        self.commits += 1
+
+    def rollback(self):
+        self.pending = []
+
+
+class FakeProcessor(ProductProcessor):
+    def __init__(self, bad_ids, reject_log):
+        super().__init__(None, None, reject_log=reject_log)
+        self.bad_ids = bad_ids
+
+    def _process_product_batch(self, conn, batch, fingerprints=None):
+        for prepared in batch:
+            if prepared.product.migros_id in self.bad_ids:
+                raise ValueError(f"bad product {prepared.product.migros_id}")
+            conn.pending.append(prepared.product.migros_id)
+
+
+def _prepared(migros_id):
+    product = Product(migros_id=migros_id, name=f"p{migros_id}")
+    return PreparedProduct(product, [], f"{migros_id}-2024.json")
+
+
+def test_bisection_commits_good_products_and_rejects_bad_ones(tmp_path):
+    reject_log = RejectLog(str(tmp_path / "rejects.jsonl"))
+    processor = FakeProcessor({"3", "12"}, reject_log)
+    conn = FakeConnection()
+    batch = [_prepared(str(i)) for i in range(16)]
+
+    processed, failed = processor._store_batch_isolated(conn, batch, 1)
+
+    assert (processed, failed) == (14, 2)
+    assert sorted(conn.committed, key=int) == [
+        str(i) for i in range(16) if i not in (3, 12)
+    ]
+    rejects = reject_log.read()
+    assert [r["file_name"] for r in rejects] == ["3-2024.json", "12-2024.json"]
+    assert rejects[0]["stage"] == "postgres"
+    assert rejects[0]["reason"] == "bad product 3"
+
+
+def test_clean_batch_commits_once(tmp_path):
+    reject_log = RejectLog(str(tmp_path / "rejects.jsonl"))
+    processor = FakeProcessor(set(), reject_log)
+    conn = FakeConnection()
+
+    processor._store_batch_isolated(conn, [_prepared(str(i)) for i in range(8)], 1)
+
+    assert conn.commits == 1
+    assert reject_log.read() == []
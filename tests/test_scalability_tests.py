@@ -0,0 +1,56 @@
+import math
+
+import pytest
+
+from measurements.base_measurement import MeasurementResult
+from measurements.scalability_tests import ScalabilityTest, growth_exponent
+
+
+def test_growth_exponent_of_power_laws():
+    sizes = [1000, 5000, 10000, 20000]
+    assert growth_exponent(sizes, [0.5] * 4) == pytest.approx(0.0)
+    assert growth_exponent(sizes, [s * 1e-6 for s in sizes]) == pytest.approx(1.0)
+    assert growth_exponent(sizes, [s**2 * 1e-9 for s in sizes]) == pytest.approx(2.0)
+
+
+def test_growth_exponent_skips_missing_points():
+    assert growth_exponent([1, 10, 100], [1.0, None, 100.0]) == pytest.approx(1.0)
+    assert math.isnan(growth_exponent([1, 10], [1.0, None]))
+
+
+def result(name, mongodb_samples, postgresql_samples):
+    return MeasurementResult(
+        name,
+        0.0,
+        0.0,
+        None,
+        None,
+        mongodb_samples=mongodb_samples,
+        postgresql_samples=postgresql_samples,
+    )
+
+
+def test_report_builds_series_per_test_and_database():
+    steps = [
+        {"snapshots": 10, "mongodb_load_seconds": 1.0, "postgresql_load_seconds": 2.0},
+        {
+            "snapshots": 100,
+            "mongodb_load_seconds": 10.0,
+            "postgresql_load_seconds": None,
+        },
+    ]
+    results_by_step = [
+        [result("CountTest", [0.01], [0.001])],
+        [result("CountTest", [1.0], [0.001])],
+    ]
+
+    report = ScalabilityTest.report(steps, results_by_step)
+
+    assert report["load"]["MongoDB"]["growth_exponent"] == pytest.approx(1.0)
+    assert report["load"]["PostgreSQL"]["growth_exponent"] is None
+    count = report["tests"]["CountTest"]
+    assert count["MongoDB"]["values"] == [0.01, 1.0]
+    assert count["MongoDB"]["growth_exponent"] == pytest.approx(2.0)
+    assert count["MongoDB"]["super_linear"]
+    assert count["PostgreSQL"]["growth_exponent"] == pytest.approx(0.0)
+    assert not count["PostgreSQL"]["super_linear"]
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pytest
+
+from setup.snapshot_index import SnapshotEntry, SnapshotIndex
+
+
+@pytest.fixture
+def snapshot_folder(tmp_path):
+    """Fixture to create empty snapshot files; the index never opens them."""
+    names = [
+        "200000000000-2024-10-01T12:00:00.json",
+        "100100300000-2024-09-26T12:21:23.json",
+        "100100300000-2024-09-16T15:15:05.json",
+        "100100300000-2024-10-01T12:22:07.json",
+        "100124900000-2024-10-05T19:23:58.json",
+        "readme.txt",
+    ]
+    for name in names:
+        (tmp_path / name).write_text("", encoding="utf-8")
+    return tmp_path
+
+
+def test_entry_from_filename():
+    entry = SnapshotEntry.from_filename("data", "100100300000-2024-09-16T15:15:05.json")
+    assert entry.migros_id == "100100300000"
+    assert entry.scraped_at == "2024-09-16T15:15:05"
+
+    category = SnapshotEntry.from_filename("data", "10034619.json")
+    assert category.migros_id == "10034619"
+    assert category.scraped_at == ""
+
+
+def test_index_is_sorted_and_head_is_deterministic(snapshot_folder):
+    index = SnapshotIndex.from_folder(str(snapshot_folder))
+    assert len(index) == 5
+    assert [e.scraped_at for e in index.head(2)] == [
+        "2024-09-16T15:15:05",
+        "2024-09-26T12:21:23",
+    ]
+
+
+def test_filters(snapshot_folder):
+    index = SnapshotIndex.from_folder(str(snapshot_folder))
+
+    assert len(index.for_products({"100100300000"})) == 3
+    assert len(index.between("2024-10-01", "2024-10-05")) == 2
+    assert len(index.between(start=datetime(2024, 10, 1))) == 3
+
+    latest = index.latest_only()
+    assert len(latest) == 3
+    assert [e.scraped_at for e in latest.for_products(["100100300000"])] == [
+        "2024-10-01T12:22:07"
+    ]
+
+
+def test_sample_products_is_reproducible(snapshot_folder):
+    index = SnapshotIndex.from_folder(str(snapshot_folder))
+    first = index.sample_products(2, seed=42).product_ids()
+    second = index.sample_products(2, seed=42).product_ids()
+    assert first == second
+    assert len(first) == 2
+
+
+def test_partition_keeps_products_together(snapshot_folder):
+    index = SnapshotIndex.from_folder(str(snapshot_folder))
+
+    partitions = index.partition(2)
+
+    assert sum(len(p) for p in partitions) == len(index)
+    assert sorted(e.path for p in partitions for e in p) == sorted(index.paths())
+    owners = {}
+    for number, partition in enumerate(partitions):
+        for entry in partition:
+            assert owners.setdefault(entry.migros_id, number) == number
+    assert [p.paths() for p in index.partition(2)] == [p.paths() for p in partitions]
@@ -0,0 +1,58 @@
+from measurements.storage_tests import StorageTest, _totals
+from setup.mongodb_manager import MongoDBManager
+
+STATS = {
+    "products": {
+        "count": 100,
+        "size": 90000,
+        "storageSize": 30000,
+        "totalIndexSize": 10000,
+        "avgObjSize": 900,
+    },
+    "categories": {"count": 10, "size": 2000, "storageSize": 2000},
+}
+
+
+class FakeDatabase:
+    def command(self, name, collection):
+        assert name == "collStats"
+        return STATS[collection]
+
+    def list_collection_names(self):
+        return list(STATS)
+
+
+class FakeMongoDBManager(MongoDBManager):
+    def connect(self, max_pool_size=None):
+        self.db = FakeDatabase()
+
+    def disconnect(self):
+        pass
+
+
+def test_totals_per_snapshot_and_index_overhead():
+    assert _totals(4, 300, 100) == {
+        "snapshots": 4,
+        "storage_bytes": 300,
+        "index_bytes": 100,
+        "total_bytes": 400,
+        "bytes_per_snapshot": 100,
+        "storage_bytes_per_snapshot": 75,
+        "index_overhead": 0.333,
+    }
+    assert _totals(0, 0, 0)["bytes_per_snapshot"] is None
+
+
+def test_mongodb_storage_sums_collections():
+    storage = StorageTest()
+    storage.mongo_manager = FakeMongoDBManager("mongodb://unused", "productdb")
+
+    report = storage.mongodb_storage()
+
+    assert report["collections"]["products"]["avg_document_bytes"] == 900
+    assert report["collections"]["categories"]["index_bytes"] == 0
+    totals = report["totals"]
+    assert totals["snapshots"] == 100
+    assert totals["total_bytes"] == 42000
+    assert totals["bytes_per_snapshot"] == 420
+    assert totals["index_overhead"] == 0.312
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from setup.temporal_queries import MongoAsOf
+
+
+class FakeCollection:
+    def __init__(self, snapshots):
+        self.snapshots = snapshots
+        self.pipelines = []
+
+    def distinct(self, field, query):
+        return sorted(self.snapshots)
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return [{"_id": key, "snapshot": doc} for key, doc in self.snapshots.items()]
+
+
+def test_category_as_of_keeps_products_still_in_category():
+    as_of = datetime(2024, 9, 30)
+    collection = FakeCollection(
+        {
+            "1": {"migrosId": "1", "categories": [{"id": 7}]},
+            "2": {"migrosId": "2", "categories": [{"id": 8}]},
+        }
+    )
+    as_of_queries = MongoAsOf({"products": collection}, "products")
+
+    products = as_of_queries.category(7, as_of)
+
+    assert [p["migrosId"] for p in products] == ["1"]
+    match = collection.pipelines[0][0]["$match"]
+    assert match == {"migrosId": {"$in": ["1", "2"]}, "scraped_at": {"$lte": as_of}}
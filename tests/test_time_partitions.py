@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from setup.time_partitions import month_start, next_month, partition_name
+
+
+def test_month_bounds():
+    start = month_start(datetime(2024, 9, 16, 15, 15, 5))
+    assert start == datetime(2024, 9, 1)
+    assert next_month(start) == datetime(2024, 10, 1)
+    assert next_month(datetime(2024, 12, 1)) == datetime(2025, 1, 1)
+
+
+def test_partition_name():
+    assert partition_name("product", datetime(2024, 9, 1)) == "product_2024_09"